@@ -14,7 +14,8 @@
     except for "game_over", for which we use a binary semaphore (i.e. value = 0 if game not over, 1 otherwise).
 
     *Note that in this redesign, the prey coordinates are tracked within the `Game` class as well.*
-    This is updated with logic in the `Game` class, and read by the `Gui` class to update the Tkinter widgets.
+    The game state and rules are owned by a headless `Engine` (see `engine.py`), whose results are published
+    by the `Game` class, and read by the `Gui` class to update the Tkinter widgets.
 
     Note that the `Gui` class read access has been designed to have non-blocking semaphore and blocking mutex acquisition for all data fields.
     If a certain mutex from the dict cannot be acquired (i.e. data being written to when context-switch occurs), it is momentarily skipped in favor of updating the other `Tkinter` widgets.
@@ -22,35 +23,63 @@
     This is done through scheduling an update every 100ms to behave similarly as in the original program design (i.e. with the `Tk.after(...)` method). Since the game has a speed of 150 ms,
     these "full" semaphores eliminate the need to update the widget unless needed.
 
+    With the --process option, the game instead runs in its own process (i.e. without sharing the GIL with the gui),
+    and publishes its frames into a ring buffer in shared memory (see `sharedboard.py`), which the gui renders
+    without copying them. The arrow keys are passed back to the game process through the same buffer.
+
     **IMPORTANT** Tkinter is intended to be single-threaded and we cannot perform Gui updates outside of the main thread. This is problematic since the `Tk.mainloop()` method is blocking
     as long as the gui instance is running. (See The Python Software Foundation. (n.d.). Tkinter - Python interface to TCL/TK. Python Documentation. https://docs.python.org/3/library/tkinter.html#threading-model)
     More is described in the supplementary .pdf report.
 """
 
+import argparse
 import threading
+from multiprocessing import Process
 
 from tkinter import Tk, Canvas, Button
 import random, time
+from collections import deque
+
+from controllers import AutopilotController
+from delta import DeltaEncoder
+from engine import Engine, WINDOW_WIDTH, WINDOW_HEIGHT, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH, MIN_COLUMNS, MIN_ROWS
+from inputs import InputRing
+from instrumentation import StatsDumper, instrument
+from metrics import Histogram
+from profiler import Profiler, noLap
+from replay import SEED_LIMIT, ReplayWriter
+from renderer import CellRenderer, SegmentRenderer, preyRectangle, snakePoints
+from scheduler import POLICIES, Scheduler
+from sharedboard import SharedBoard
+from snapshot import SnapshotBuffer
+from wakeup import Notifier
+
+#some constants for our GUI (the board dimensions are those of the game)
+BACKGROUND_COLOUR = "black" # you may change this colour if you wish
+ICON_COLOUR = "blue"        # you may change this colour if you wish
 
 class Gui():
     """
         This class takes care of the game's graphic user interface (gui)
         creation and termination.
     """
-    def __init__(self):
+    def __init__(self, game: "Game", cells: bool = False):
         """
-            The initializer instantiates the main window and
+            The initializer instantiates the main window (with the
+            dimensions of the board of the game, which may be a `RemoteGame`) and
             creates the starting icons for the snake and the prey,
             and displays the initial gamer score.
+            If cells is true, the snake is drawn with per-cell items (see `CellRenderer`) instead of a polyline.
         """
         #some GUI constants
         scoreTextXLocation = 60
         scoreTextYLocation = 15
         textColour = "white"
+        self.game = game
         #instantiate and create gui
         self.root = Tk()
-        self.canvas = Canvas(self.root, width = WINDOW_WIDTH,
-            height = WINDOW_HEIGHT, bg = BACKGROUND_COLOUR)
+        self.canvas = Canvas(self.root, width = game.width,
+            height = game.height, bg = BACKGROUND_COLOUR)
         self.canvas.pack()
         #create starting game icons for snake and the prey
         self.snakeIcon = self.canvas.create_line(
@@ -64,6 +93,20 @@ class Gui():
         #binding the arrow keys to be able to control the snake
         for key in ("Left", "Right", "Up", "Down"):
             self.root.bind(f"<Key-{key}>", game.whenAnArrowKeyIsPressed)
+        #draw the snake from the delta messages of the game (if any), or with per-cell items
+        if cells:
+            self.renderer = CellRenderer(self.canvas, self.preyIcon, self.score,
+                ICON_COLOUR, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH)
+        else:
+            self.renderer = SegmentRenderer(self.canvas, self.preyIcon, self.score,
+                ICON_COLOUR, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH) if game.encoder is not None else None
+        #update whenever the game notifies the gui (if any), instead of polling
+        self.latency = Histogram("move to canvas")
+        self.lastFrame = None # Last Frame Drawn (Snapshot Mode)
+        #time the phases of every update if the game is profiled
+        self.lap = game.profiler.timer("gui").lap if game.profiler is not None else noLap
+        if game.notifier is not None:
+            game.notifier.attach(self.root, self.update)
         self.update()
 
     def update(self) -> None:
@@ -71,20 +114,63 @@ class Gui():
             This method handles the state by trying to retrieve
             data from the game and accordingly taking the corresponding
             action. These include : game_over, move, prey, score.
-            Before exiting, this method schedules to call itself after a short delay.
+            Before exiting, this method schedules to call itself after a short delay,
+            unless it is called by the notifier of the game.
 
             For general gameplay, non-blocking semaphore acquisition is used to determine whether the
             gui should be updated. In order for these to occur, it must be confirmed that the game is not over.
+            In delta mode, the snake, prey and score are all updated from the delta messages of the game.
+            In snapshot mode, they are all updated from the latest frame published by the game (if it is new),
+            without acquiring any lock or semaphore.
+            The cell coordinates of the game are converted to pixels for the canvas.
+            The latency from the move() of the game to the canvas update of the snake is recorded.
+            If the game is profiled, each of these updates is timed.
         '''
+        game = self.game
+        def updateDeltas() -> None:
+            if game.full["move"].acquire(blocking = False): # Consume New Value
+                game.locks["move"].acquire() # Critical Section (Start)
+                deltas, game.deltas = game.deltas, []
+                moveTime = game.moveTime
+                game.locks["move"].release() # Critical Section (End)
+                for delta in deltas:
+                    self.renderer.apply(delta)
+                self.latency.record(time.perf_counter() - moveTime)
+        def updateFrame() -> bool:
+            frame = game.snapshots.latest(self.lastFrame.seq if self.lastFrame else 0) # Consume New Frame (If Any)
+            if frame is None:
+                return False
+            if self.renderer is not None:
+                self.renderer.draw(frame.snakeCoordinates)
+                if not game.snapshots.isCurrent(frame): # Overwritten While Read (Shared Board Only)
+                    self.renderer.invalidate() # Redrawn From the Next Frame
+                    return False
+            else:
+                points = snakePoints(frame.snakeCoordinates, SNAKE_ICON_WIDTH)
+                if not game.snapshots.isCurrent(frame): # Overwritten While Read (Shared Board Only)
+                    return False
+                self.canvas.coords(self.snakeIcon, *points)
+            if self.lastFrame is None or frame.preyCoordinates != self.lastFrame.preyCoordinates:
+                self.canvas.coords(self.preyIcon, *preyRectangle(frame.preyCoordinates, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH))
+            if self.lastFrame is None or frame.score != self.lastFrame.score:
+                self.canvas.itemconfigure(self.score, text=f"Your Score: {frame.score}")
+            self.latency.record(time.perf_counter() - frame.time)
+            self.lastFrame = frame
+            return frame.gameOver
         def updateSnake() -> None:
             if game.full["move"].acquire(blocking = False): # Consume New Value
                 game.locks["move"].acquire() # Critical Section (Start)
-                self.canvas.coords(self.snakeIcon, *[coord for point in game.snakeCoordinates for coord in point])
+                if self.renderer is not None:
+                    self.renderer.draw(game.snakeCoordinates)
+                else:
+                    self.canvas.coords(self.snakeIcon, *snakePoints(game.snakeCoordinates, SNAKE_ICON_WIDTH))
+                moveTime = game.moveTime
                 game.locks["move"].release() # Critical Section (End)
+                self.latency.record(time.perf_counter() - moveTime)
         def updatePrey() -> None:
             if game.full["prey"].acquire(blocking = False): # Consume New Value
                 game.locks["prey"].acquire() # Critical Section (Start)
-                self.canvas.coords(self.preyIcon, *game.preyCoordinates)
+                self.canvas.coords(self.preyIcon, *preyRectangle(game.preyCoordinates, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH))
                 game.locks["prey"].release() # Critical Section (End)
         def updateScore() -> None:
             if game.full["score"].acquire(blocking = False): # Consume New Value
@@ -92,12 +178,25 @@ class Gui():
                 self.canvas.itemconfigure(self.score, text=f"Your Score: {game.score}")
                 game.locks["score"].release() # Critical Section (End)
 
-        updateSnake()
-        updatePrey()
-        updateScore()
-        if game.full["game_over"].acquire(blocking = False): # Consume New Value (i.e. Game Over)
-            self.gameOver()
+        self.lap() # Start of the Update
+        if game.snapshots is not None:
+            gameOver = updateFrame()
+            self.lap("frame")
         else:
+            if game.encoder is not None:
+                updateDeltas()
+                self.lap("deltas")
+            else:
+                updateSnake()
+                self.lap("snake")
+                updatePrey()
+                self.lap("prey")
+                updateScore()
+                self.lap("score")
+            gameOver = game.full["game_over"].acquire(blocking = False) # Consume New Value (i.e. Game Over)
+        if gameOver:
+            self.gameOver()
+        elif game.notifier is None:
             self.root.after(100, self.update) # Call Function Every 100 ms
 
     def gameOver(self) -> None:
@@ -113,12 +212,25 @@ class Gui():
 class Game():
     '''
         This class implements most of the game functionalities.
+        The game state and rules are delegated to a headless `Engine`,
+        while this class publishes the shared data fields for the gui.
     '''
-    def __init__(self):
+    def __init__(self, encoder: DeltaEncoder = None, notifier: Notifier = None, snapshots: SnapshotBuffer = None,
+                 seed: int = None, recordPath: str = None, autopilot: AutopilotController = None,
+                 profiler: Profiler = None, width: int = WINDOW_WIDTH, height: int = WINDOW_HEIGHT):
         """
            This initializer sets the locks and full semaphores for the producer-consumer synchronization problem.
-           It also sets the initial snake coordinate list, movement,
-           direction, and arranges for the first prey to be created.
+           It also creates the engine (on a board of width x height pixels), which sets the initial snake
+           coordinate list, movement, direction, and the first prey.
+           If an encoder is provided, the game also appends a delta message to the
+           self.deltas data field (protected by the "move" lock) every tick.
+           If a notifier is provided, the gui is notified after every move.
+           If a snapshot buffer is provided, the game instead publishes one frame
+           of the whole state per tick into it, without any locks or semaphores.
+           If a record path is provided, the session is recorded into a replay file,
+           which requires the seed of the prey generator.
+           If an autopilot is provided, it presses the arrow keys before every move.
+           If a profiler is provided, the phases of every move (and of the engine) are timed.
         """
         self.locks = {
             "move": threading.Lock(),
@@ -133,26 +245,59 @@ class Game():
             "score": threading.Semaphore(value = 0),
         }
 
-        #starting length and location of the snake
-        #note that it is a list of tuples, each being an
-        # (x, y) tuple. Initially its size is 5 tuples.
+        self.width = width
+        self.height = height
+        self.engine = Engine(width, height,
+                             SNAKE_ICON_WIDTH, PREY_ICON_WIDTH, seed)
+        self.recorder = ReplayWriter(recordPath, self.engine, seed) if recordPath else None
+        self.autopilot = autopilot
+        self.profiler = profiler
+        self.lap = profiler.timer("move").lap if profiler is not None else noLap
+        if profiler is not None:
+            profiler.profileEngine(self.engine)
+        self.encoder = encoder
+        self.notifier = notifier
+        self.snapshots = snapshots
+        self.deltas = []
+        self.moveTime = time.perf_counter()
+        if self.encoder is not None:
+            self.deltas.append(self.encoder.encode(self.engine)) # Keyframe
+            self.full["move"].release() # Produce Value
         self.score: int = 0
-        self.snakeCoordinates = [(495, 55), (485, 55), (475, 55),
-                                 (465, 55), (455, 55)]
-        #initial direction of the snake
+        #initial direction of the snake, and the arrow keys pressed since the last move
         self.direction = "Left"
+        self.inputs = InputRing()
+        self.inputLatency = Histogram("key to move")
         self.gameNotOver = True
 
-        self.createNewPrey() # Generate First Prey
+        self.preyCoordinates = self.engine.preyCoordinates
+        if self.encoder is None:
+            self.publishPrey() # Publish First Prey (Carried by the Keyframe in Delta Mode)
+        if self.snapshots is not None:
+            self.publishSnapshot() # Publish First Frame
 
-    def superloop(self) -> None:
+    @property
+    def snakeCoordinates(self) -> deque:
+        """
+            The snake coordinates (from tail to head) owned by the engine.
+            Reading them must be protected by the "move" lock.
+        """
+        return self.engine.snakeCoordinates
+
+    def superloop(self, scheduler: Scheduler = None) -> None:
         """
             This method implements a main loop
             of the game. It constantly generates "move"
             tasks to cause the constant movement of the snake.
             Use the SPEED constant to set how often the move tasks
             are generated.
+            If a scheduler is provided, the moves are instead generated
+            on its drift-free fixed timestep.
         """
+        if scheduler is not None:
+            scheduler.run(self.move, lambda: self.gameNotOver)
+            return
+
         SPEED = 0.15     #speed of snake updates (sec)
         while self.gameNotOver:
             #complete the method implementation below
@@ -163,160 +308,278 @@ class Game():
         """
             This method is bound to the arrow keys
             and is called when one of those is clicked.
-            It sets the movement direction based on
-            the key that was pressed by the gamer.
-            Use as is.
+            It queues the key that was pressed by the gamer
+            (with the time it was pressed), which sets the
+            movement direction at the start of a later move
+            (see `applyInput()`), so that no key press is lost.
         """
-        currentDirection = self.direction
-        #ignore invalid keys
-        if (currentDirection == "Left" and e.keysym == "Right" or
-            currentDirection == "Right" and e.keysym == "Left" or
-            currentDirection == "Up" and e.keysym == "Down" or
-            currentDirection == "Down" and e.keysym == "Up"):
-            return
-        self.direction = e.keysym
+        self.inputs.push(e.keysym)
+
+    def applyInput(self) -> float:
+        """
+            This method sets the movement direction from the first pending
+            key press which changes it without reversing the snake (if any),
+            and returns the time it was pressed (or None).
+        """
+        event = self.inputs.pop(self.direction)
+        if event is None:
+            return None
+        self.direction = event[0]
+        return event[1]
+
+    def steer(self) -> None:
+        """
+            This method lets the autopilot (if any) plan the next move,
+            and sets the movement direction of its move (which a key
+            pressed by the gamer in the meantime still overrides).
+        """
+        if self.autopilot is not None:
+            direction = self.autopilot(self.engine)
+            if direction is not None:
+                self.direction = direction
 
     def move(self) -> None:
         """
             This method implements what is needed to be done
             for the movement of the snake.
-            It generates a new snake coordinate.
+            It steps the engine in the current direction, which updates
+            the snake coordinates in place.
             If based on this new movement, the prey has been
-            captured, it updates the score and also creates a new prey.
-            It also calls a corresponding method to check if
-            the game should be over.
-            The snake coordinates list (representing its length
-            and position) should be correctly updated.
+            captured, it publishes the new prey and updated score
+            (unless in delta mode, in which the delta message carries them).
+            If the game is over, it releases the binary semaphore for the gui.
+            The gui is then notified outside of any critical section, since
+            the notification waits for the gui thread.
+            In snapshot mode, it publishes a single frame instead.
+            If an autopilot is provided, it steers the snake first.
+            The first pending key press which changes the direction is then applied,
+            and the latency from the key press to this move is recorded.
+            If a profiler is provided, each of these phases is timed.
         """
-        def isCaptured(snakeCoordinates: tuple, preyCoordinates: list) -> bool:
-            captureCoordinates = (
-                snakeCoordinates[0] - SNAKE_ICON_WIDTH // 2, # x0
-                snakeCoordinates[1] - SNAKE_ICON_WIDTH // 2, # y0
-                snakeCoordinates[0] + SNAKE_ICON_WIDTH // 2, # x1
-                snakeCoordinates[1] + SNAKE_ICON_WIDTH // 2 # y1
-            )
-
-            isCaptured: bool = False
-            # Checks if Snake Coordinates are in Prey Coordinates (instance where Prey could be much larger than Snake)
-            if (captureCoordinates[0] <= preyCoordinates[2] and captureCoordinates[1] <= preyCoordinates[3]) and (captureCoordinates[0] >= preyCoordinates[0] and captureCoordinates[1] >= preyCoordinates[1]): # Snake Point 0 "inside" Prey
-                isCaptured = True
-            elif (captureCoordinates[2] >= preyCoordinates[0] and captureCoordinates[3] >= preyCoordinates[1]) and (captureCoordinates[2] <= preyCoordinates[2] and captureCoordinates[3] <= preyCoordinates[3]): # Snake Point 1 "inside" Prey
-                isCaptured = True
-            # Checks if Prey Coordinates are in Snake Coordinates (instance where Snake could be much larger than Prey)
-            elif (preyCoordinates[2] >= captureCoordinates[0] and preyCoordinates[3] >= captureCoordinates[1]) and (preyCoordinates[2] <= captureCoordinates[2] and preyCoordinates[3] <= captureCoordinates[3]): # Prey Point 0 "inside" Snake
-                isCaptured = True
-            elif (preyCoordinates[0] <= captureCoordinates[2] and preyCoordinates[1] <= captureCoordinates[3]) and (preyCoordinates[0] >= captureCoordinates[0] and preyCoordinates[1] >= captureCoordinates[1]): # Prey Point 1 "inside" Snake
-                isCaptured = True
-            return isCaptured
-
-        def moveSnake(isPreyCaptured: bool, newCoordinates: tuple) -> None:
-            self.locks["move"].acquire() # Critical Section (Start)
-            if isPreyCaptured:
-                self.snakeCoordinates = [*self.snakeCoordinates, newCoordinates] # Append New Snake Head
-            else:
-                self.snakeCoordinates = [*self.snakeCoordinates[1:], newCoordinates] # Move Snake
-            self.locks["move"].release() # Critical Section (End)
-            self.full["move"].release() # Produce Value
-
         def incrementScore() -> None:
             self.locks["score"].acquire() # Critical Section (Start)
-            self.score += 1
+            self.score = self.engine.score
             self.locks["score"].release() # Critical Section (End)
             self.full["score"].release() # Produce Value
 
-        NewSnakeCoordinates = self.calculateNewCoordinates()
-
-        self.isGameOver(NewSnakeCoordinates)
-
-        preyCaptured = isCaptured(NewSnakeCoordinates, preyCoordinates = gui.canvas.coords(gui.preyIcon))
-        moveSnake(isPreyCaptured = preyCaptured, newCoordinates = NewSnakeCoordinates)
+        self.lap() # Start of the Tick
+        self.steer()
+        pressedAt = self.applyInput()
+        self.lap("plan")
+        if self.snapshots is not None:
+            self.gameNotOver = self.engine.step(self.direction)
+            self.recordInput(pressedAt)
+            self.lap("step")
+            self.recordMove()
+            self.lap("record")
+            self.publishSnapshot()
+            self.lap("publish")
+            if self.notifier is not None:
+                self.notifier.notify()
+            self.lap("notify")
+            return
 
-        if preyCaptured:
-            self.createNewPrey()
+        self.locks["move"].acquire() # Critical Section (Start)
+        self.lap("lock")
+        self.gameNotOver = self.engine.step(self.direction)
+        self.recordInput(pressedAt)
+        self.lap("step")
+        if self.encoder is not None:
+            self.deltas.append(self.encoder.encode(self.engine))
+        self.moveTime = time.perf_counter()
+        self.locks["move"].release() # Critical Section (End)
+        self.full["move"].release() # Produce Value
+        self.lap("publish")
+        self.recordMove()
+        self.lap("record")
+
+        if self.engine.preyCaptured and self.encoder is None:
+            self.publishPrey()
             incrementScore()
+        if not self.gameNotOver:
+            self.full["game_over"].release() # Produce Value (i.e. Game Over)
+        self.lap("publishEvents")
+        if self.notifier is not None:
+            self.notifier.notify()
+        self.lap("notify")
 
-    def calculateNewCoordinates(self) -> tuple:
+    def recordInput(self, pressedAt: float) -> None:
         """
-            This method calculates and returns the new
-            coordinates to be added to the snake
-            coordinates list based on the movement
-            direction and the current coordinate of
-            head of the snake.
-            It is used by the move() method.
+            This method records the latency from the key press applied by the last move (if any) to the move.
         """
+        if pressedAt is not None:
+            self.inputLatency.record(time.perf_counter() - pressedAt)
 
-        lastX, lastY = self.snakeCoordinates[-1] # Read Head Coordinate for Processing (Don't Need Critical Section)
-
-        #complete the method implementation below
-        if self.direction == "Left":
-            lastX -= SNAKE_ICON_WIDTH
-        elif self.direction == "Right":
-            lastX += SNAKE_ICON_WIDTH
-        elif self.direction == "Up":
-            lastY -= SNAKE_ICON_WIDTH
-        else:
-            lastY += SNAKE_ICON_WIDTH
-        return (lastX, lastY)
-
-    def isGameOver(self, snakeCoordinates: tuple) -> None:
+    def publishPrey(self) -> None:
         """
-            This method checks if the game is over by
-            checking if now the snake has passed any wall
-            or if it has bit itself.
-            If that is the case, it updates the gameNotOver
-            field and releases the binary semaphore for the gui.
+            This method updates the self.preyCoordinates data field with
+            the cell coordinates of the prey created by the engine.
+            This is used by the gui to represent the new prey.
         """
-        x, y = snakeCoordinates
-        #complete the method implementation below
+        self.locks["prey"].acquire() # Critical Section (Start)
+        self.preyCoordinates = self.engine.preyCoordinates
+        self.locks["prey"].release() # Critical Section (End)
+        self.full["prey"].release() # Produce Value
 
-        x_collision: bool = (x <= 0) or (x >= WINDOW_WIDTH)
-        y_collision: bool = (y <= 0) or (y >= WINDOW_HEIGHT)
+    def recordMove(self) -> None:
+        """
+            This method records the last move of the engine into the replay file (if any),
+            and closes it when the game is over.
+        """
+        if self.recorder is not None:
+            self.recorder.record(self.engine)
+            if not self.gameNotOver:
+                self.recorder.close(self.engine)
 
-        if (x_collision) or (y_collision) or ((x, y) in self.snakeCoordinates[:-1]):
-            self.gameNotOver = False
-            self.full["game_over"].release() # Produce Value (i.e. Game Over)
-        return
+    def publishSnapshot(self) -> None:
+        """
+            This method publishes an immutable frame of the snake coordinates, prey, score
+            and game over status of the current tick, so the gui always reads a consistent state.
+        """
+        self.score = self.engine.score
+        self.preyCoordinates = self.engine.preyCoordinates
+        self.snapshots.publish(tuple(self.engine.snakeCoordinates), self.preyCoordinates,
+            self.score, not self.gameNotOver, time.perf_counter())
 
-    def createNewPrey(self) -> None:
+class RemoteGame():
+    '''
+        This class stands for a game running in another process (see `runProcessGame()`), as seen by the gui.
+    '''
+    def __init__(self, board: SharedBoard, profiler: Profiler = None,
+                 width: int = WINDOW_WIDTH, height: int = WINDOW_HEIGHT):
         """
-            This methods picks an x and a y randomly as the coordinate
-            of the new prey and uses that to calculate the
-            coordinates (x - 5, y - 5, x + 5, y + 5). [you need to replace 5 with a constant]
-            It then updates the self.preyCoordinates data field with the calculated
-            rectangle coordinates as its value. This is used by the
-            gui to represent the new prey.
-            To make playing the game easier, set the x and y to be THRESHOLD
-            away from the walls.
+            This initializer takes the shared board which the game process publishes its frames into,
+            and the dimensions of the window (whose cells are those of the board).
         """
-        THRESHOLD = 15
+        self.width = width
+        self.height = height
+        self.snapshots = board
+        self.encoder = None
+        self.notifier = None
+        self.profiler = profiler
 
-        generatedCoordinates: tuple = (
-            random.randint(THRESHOLD, WINDOW_WIDTH - THRESHOLD),  # Generate X Coordinate Threshold Away From Walls
-            random.randint(THRESHOLD, WINDOW_HEIGHT - THRESHOLD)  # Generate X Coordinate Threshold Away From Walls
-        )
+    def whenAnArrowKeyIsPressed(self, e) -> None:
+        """
+            This method is bound to the arrow keys, and passes them on to the game process.
+        """
+        self.snapshots.pressKey(e.keysym, time.perf_counter())
 
-        self.locks["prey"].acquire() # Critical Section (Start)
-        self.preyCoordinates = (
-            generatedCoordinates[0] - PREY_ICON_WIDTH // 2, # x0
-            generatedCoordinates[1] - PREY_ICON_WIDTH // 2, # y0
-            generatedCoordinates[0] + PREY_ICON_WIDTH // 2, # x1
-            generatedCoordinates[1] + PREY_ICON_WIDTH // 2 # y1
-        )
-        self.locks["prey"].release() # Critical Section (End)
-        self.full["prey"].release() # Produce Value
+def runProcessGame(boardName: str, seed: int, args: argparse.Namespace) -> None:
+    """
+        This function runs the game in its own process, publishing its frames into the shared board of the
+        given name (whose dimensions are those of the game), and applying the arrow keys which the gui process
+        stores into it before every move.
+    """
+    board = SharedBoard.attach(boardName)
+    autopilot = AutopilotController(seed, args.autopilot) if args.autopilot is not None else None
+    profiler = Profiler(args.profile) if args.profile else None
+    game = Game(snapshots = board, seed = seed, recordPath = args.record, autopilot = autopilot, profiler = profiler,
+                width = board.columns * SNAKE_ICON_WIDTH, height = board.rows * SNAKE_ICON_WIDTH)
+
+    move = game.move
+    def moveWithKeys() -> None:
+        for direction, pressedAt in board.pressedKeys():
+            game.inputs.push(direction, pressedAt)
+        move()
+    game.move = moveWithKeys # Read the Keys of the Gui Process Before Every Move
+
+    scheduler = Scheduler(args.speed, args.scheduler) if args.scheduler else None
+    game.superloop(scheduler)
+    keysDropped = board.keysDropped + game.inputs.dropped # Dropped by the Key Ring of Either Process
+    board.close()
+
+    if profiler is not None:
+        profiler.dump()
+    if args.metrics:
+        print(f"{game.inputLatency} ({keysDropped} key presses dropped)")
+        if scheduler is not None:
+            print(scheduler.lateness)
+        if autopilot is not None:
+            print(f"{autopilot.latency} ({autopilot.overBudget} ticks over budget, {autopilot.cutShort} plans cut short)")
 
 if __name__ == "__main__":
-    #some constants for our GUI
-    WINDOW_WIDTH = 500
-    WINDOW_HEIGHT = 300
-    SNAKE_ICON_WIDTH = 15
-    PREY_ICON_WIDTH = 10 # add the specified constant PREY_ICON_WIDTH here
-
-    BACKGROUND_COLOUR = "black" # you may change this colour if you wish
-    ICON_COLOUR = "blue"        # you may change this colour if you wish
-
-    game = Game() # instantiate the game object
-    gui = Gui() # instantiate the game user interface
-
-    threading.Thread(target = game.superloop, daemon = True).start() # start a thread with the superloop of the game
-    gui.root.mainloop() # start the GUI's own event loop
\ No newline at end of file
+    parser = argparse.ArgumentParser(description = "Play the snake game (shared memory IPC model).")
+    parser.add_argument("--scheduler", choices = POLICIES, default = None,
+        help = "run the superloop on a fixed timestep with the given missed tick policy")
+    parser.add_argument("--speed", type = float, default = 0.15, help = "period of the scheduler (sec)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--delta", action = "store_true", help = "publish delta render messages instead of the whole snake")
+    mode.add_argument("--snapshot", action = "store_true", help = "publish one immutable frame per tick instead of the locked data fields")
+    mode.add_argument("--process", action = "store_true",
+        help = "run the game in its own process, publishing one frame per tick into shared memory")
+    parser.add_argument("--keyframes", type = int, default = 100, help = "number of ticks between delta keyframes")
+    parser.add_argument("--cells", action = "store_true",
+        help = "draw the snake with a pool of per-cell canvas items, only moving the cells which changed")
+    parser.add_argument("--width", type = int, default = WINDOW_WIDTH, help = "width of the board (pixels)")
+    parser.add_argument("--height", type = int, default = WINDOW_HEIGHT, help = "height of the board (pixels)")
+    parser.add_argument("--wakeup", action = "store_true", help = "notify the gui of new data instead of polling the semaphores")
+    parser.add_argument("--instrument", type = float, default = None, metavar = "INTERVAL",
+        help = "instrument the locks and semaphores, dumping their statistics every INTERVAL seconds (0 for on exit only)")
+    parser.add_argument("--seed", type = int, default = None, help = "seed of the prey generator")
+    parser.add_argument("--record", default = None, metavar = "PATH", help = "record the session into a replay file")
+    parser.add_argument("--autopilot", type = float, nargs = "?", const = 1000, default = None, metavar = "BUDGET",
+        help = "let the autopilot play, with the given planning budget per tick (us, default : 1000)")
+    parser.add_argument("--profile", default = None, metavar = "PATH",
+        help = "time the phases of every tick, appending their histograms as JSON lines on exit (and on SIGUSR1)")
+    parser.add_argument("--metrics", action = "store_true", help = "print the collected metrics on exit")
+    args = parser.parse_args()
+    if args.width // SNAKE_ICON_WIDTH < MIN_COLUMNS or args.height // SNAKE_ICON_WIDTH < MIN_ROWS:
+        parser.error(f"the board must be at least {MIN_COLUMNS * SNAKE_ICON_WIDTH}x{MIN_ROWS * SNAKE_ICON_WIDTH} pixels")
+    if args.record and args.seed is not None and abs(args.seed) >= SEED_LIMIT:
+        parser.error("--seed must be less than 2**64 in magnitude to be recorded")
+    if args.process and (args.wakeup or args.instrument is not None):
+        parser.error("--wakeup and --instrument synchronize threads, so they cannot be used with --process")
+
+    notifier = Notifier() if args.wakeup else None
+
+    seed = args.seed if args.seed is not None or not args.record else random.randrange(2 ** 63)
+    autopilot = AutopilotController(seed, args.autopilot) if args.autopilot is not None and not args.process else None
+    profiler = Profiler(args.profile) if args.profile else None
+    if profiler is not None:
+        profiler.dumpOnSignal()
+
+    if args.process:
+        board = SharedBoard.create(args.width // SNAKE_ICON_WIDTH, args.height // SNAKE_ICON_WIDTH)
+        gameProcess = Process(target = runProcessGame, daemon = True,
+            args = (board.name, seed, args))
+        game = RemoteGame(board, profiler, args.width, args.height) # the gui reads the frames of the game process
+    else:
+        game = Game(DeltaEncoder(args.keyframes) if args.delta else None, notifier,
+            SnapshotBuffer() if args.snapshot else None, seed, args.record, autopilot, profiler,
+            args.width, args.height) # instantiate the game object
+    if args.instrument is not None:
+        instrument(game) # wrap the locks and semaphores before any thread uses them
+        dumper = StatsDumper(game, args.instrument)
+        if args.instrument > 0:
+            dumper.start()
+    gui = Gui(game, args.cells) # instantiate the game user interface
+
+    scheduler = Scheduler(args.speed, args.scheduler) if args.scheduler and not args.process else None
+
+    if args.process:
+        gameProcess.start() # start a process with the superloop of the game
+    else:
+        threading.Thread(target = game.superloop, args = (scheduler,), daemon = True).start() # start a thread with the superloop of the game
+    gui.root.mainloop() # start the GUI's own event loop
+
+    if args.process:
+        if gameProcess.is_alive():
+            gameProcess.terminate() # window closed before the game was over (its replay file is truncated)
+        gameProcess.join()
+        board.unlink()
+    elif game.recorder is not None and game.gameNotOver:
+        game.recorder.close(game.engine) # window closed before the game was over
+
+    if profiler is not None:
+        profiler.dump()
+
+    if args.instrument is not None:
+        dumper.dump()
+    if args.metrics:
+        print(gui.latency)
+        if not args.process: # printed by the game process otherwise
+            print(f"{game.inputLatency} ({game.inputs.dropped} key presses dropped)")
+        if scheduler is not None:
+            print(scheduler.lateness)
+        if autopilot is not None:
+            print(f"{autopilot.latency} ({autopilot.overBudget} ticks over budget, {autopilot.cutShort} plans cut short)")
\ No newline at end of file
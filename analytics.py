@@ -0,0 +1,317 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This program computes aggregate statistics over the logs of many games, in a single streaming pass.
+
+    Two kinds of logs are read :
+        Result files (JSON lines, see `tournament.py`), one line per game, which give its score, ticks and death cause.
+        Replay files (see `replay.py`), whose session is re-simulated, which also give the cell of the head on every tick.
+    The aggregates are the distribution of the scores, the death causes (i.e. "wall" or "self" as determined by
+    `Engine.isGameOver()`, "full", or "timeout" for a game which was stopped), the distribution of the ticks per prey
+    of each game, and a heatmap of the head positions per board size.
+
+    The result files are read in chunks of bytes by a pipeline of generators (chunks -> lines -> records -> aggregate),
+    so that the memory used is fixed (i.e. counters bounded by the board size) whatever the number of games.
+    A large file is split into byte ranges which are aggregated separately (by a process pool with --processes)
+    and merged, since the aggregates of disjoint sets of games add up.
+
+    The aggregate of every file is cached along with the offset of its last complete line : since result files are
+    only appended to, a re-run only reads the lines added since then (and a replay file is only re-simulated if it changed).
+        python analytics.py greedy.jsonl autopilot.jsonl session.replay --processes 4 --heatmap
+"""
+
+import argparse
+import hashlib, json, os, time
+from collections import Counter
+from multiprocessing import Pool
+
+from replay import MAGIC, ReplayPlayer
+
+CHUNK_SIZE = 1 << 20 # Bytes Read at Once From a Result File
+SPLIT_SIZE = 64 << 20 # Bytes of a Result File Aggregated by a Single Task
+FINGERPRINT_SIZE = 4096 # Leading Bytes Which Identify a Result File Across Runs
+HEAT_SHADES = " .:-=+*#%@"
+
+class GameStats():
+    '''
+        This class implements the mergeable aggregates of a set of games.
+    '''
+    def __init__(self):
+        """
+            This initializer creates the empty aggregates.
+        """
+        self.games = 0
+        self.totalScore = 0
+        self.totalTicks = 0
+        self.scores = Counter() # Score -> Games
+        self.deathCauses = Counter() # Cause -> Games
+        self.ticksPerPrey = Counter() # Mean Ticks per Prey (Rounded) -> Games
+        self.heatmaps = {} # "ColumnsxRows" -> Head Visits per Cell (Row by Row)
+
+    def addGame(self, score: int, ticks: int, deathCause: str) -> None:
+        """
+            This method adds the result of a single game.
+        """
+        self.games += 1
+        self.totalScore += score
+        self.totalTicks += ticks
+        self.scores[score] += 1
+        self.deathCauses[deathCause] += 1
+        if score > 0:
+            self.ticksPerPrey[round(ticks / score)] += 1
+
+    def heatmap(self, columns: int, rows: int) -> list:
+        """
+            This method returns the heatmap of the given board size, which is created if needed.
+        """
+        return self.heatmaps.setdefault(f"{columns}x{rows}", [0] * (columns * rows))
+
+    def merge(self, other: "GameStats") -> "GameStats":
+        """
+            This method adds the aggregates of another (disjoint) set of games, and returns self.
+        """
+        self.games += other.games
+        self.totalScore += other.totalScore
+        self.totalTicks += other.totalTicks
+        self.scores.update(other.scores)
+        self.deathCauses.update(other.deathCauses)
+        self.ticksPerPrey.update(other.ticksPerPrey)
+        for size, visits in other.heatmaps.items():
+            if size in self.heatmaps:
+                self.heatmaps[size] = [a + b for a, b in zip(self.heatmaps[size], visits)]
+            else:
+                self.heatmaps[size] = list(visits)
+        return self
+
+    def toDict(self) -> dict:
+        """
+            This method returns the aggregates, which can be serialized as JSON (e.g. into the cache).
+        """
+        return {"games": self.games, "totalScore": self.totalScore, "totalTicks": self.totalTicks,
+                "scores": dict(self.scores), "deathCauses": dict(self.deathCauses),
+                "ticksPerPrey": dict(self.ticksPerPrey), "heatmaps": self.heatmaps}
+
+    @classmethod
+    def fromDict(cls, data: dict) -> "GameStats":
+        """
+            This method returns the aggregates of the given dict (see `toDict()`), whose integer keys were turned
+            into strings by JSON.
+        """
+        stats = cls()
+        stats.games, stats.totalScore, stats.totalTicks = data["games"], data["totalScore"], data["totalTicks"]
+        stats.scores = Counter({int(score): games for score, games in data["scores"].items()})
+        stats.deathCauses = Counter({None if cause == "null" else cause: games for cause, games in data["deathCauses"].items()})
+        stats.ticksPerPrey = Counter({int(ticks): games for ticks, games in data["ticksPerPrey"].items()})
+        stats.heatmaps = {size: list(visits) for size, visits in data["heatmaps"].items()}
+        return stats
+
+    def summary(self) -> dict:
+        """
+            This method returns the headline statistics of the aggregates.
+        """
+        prey = self.totalScore
+        return {"games": self.games, "meanScore": self.totalScore / self.games if self.games else 0.0,
+                "score": {f"p{percent}": counterPercentile(self.scores, percent) for percent in (50, 90, 99)},
+                "maxScore": max(self.scores, default = None),
+                "deathCauses": {str(cause): games for cause, games in self.deathCauses.most_common()},
+                "ticksPerPrey": self.totalTicks / prey if prey else None,
+                "ticksPerPreyPerGame": {f"p{percent}": counterPercentile(self.ticksPerPrey, percent) for percent in (50, 90, 99)}}
+
+def counterPercentile(counter: Counter, percent: float) -> int:
+    """
+        This function returns the smallest value of a distribution (i.e. value -> count) whose
+        cumulative count reaches the given percentage of the total, or None if it is empty.
+    """
+    total = sum(counter.values())
+    if not total:
+        return None
+    target, cumulative = total * percent / 100, 0
+    for value in sorted(counter):
+        cumulative += counter[value]
+        if cumulative >= target:
+            return value
+    return value
+
+def readLines(path: str, start: int = 0, end: int = None, chunkSize: int = CHUNK_SIZE):
+    """
+        This generator yields every complete line which starts in the byte range [start, end) of the file,
+        along with the offset following it, reading the file in chunks. The line which starts before the range
+        is left to the previous range, and a partially written last line (i.e. still being appended) is left out.
+    """
+    with open(path, "rb") as file:
+        if start > 0:
+            file.seek(start - 1)
+            if file.read(1) != b"\n":
+                file.readline() # Rest of the Line of the Previous Range
+        offset = file.tell()
+        buffer = b""
+        while end is None or offset < end:
+            chunk = file.read(chunkSize)
+            if not chunk:
+                return
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            for line in lines:
+                if end is not None and offset >= end:
+                    return
+                offset += len(line) + 1
+                yield line, offset
+
+def parseResults(lines):
+    """
+        This generator yields the results (score, ticks, death cause) of the well-formed lines, along with the
+        offset following each of them.
+    """
+    for line, offset in lines:
+        try:
+            result = json.loads(line)
+            yield (result["score"], result["ticks"], result["deathCause"]), offset
+        except (ValueError, KeyError, TypeError):
+            continue
+
+def aggregateResults(task: tuple) -> tuple:
+    """
+        This function aggregates the results of a byte range of a result file, and returns them along with the offset
+        following its last complete line (None if there is none). It is run by the worker processes.
+    """
+    path, start, end = task
+    stats, last = GameStats(), None
+    for (score, ticks, deathCause), last in parseResults(readLines(path, start, end)):
+        stats.addGame(score, ticks, deathCause)
+    return path, stats, last
+
+def aggregateReplay(task: tuple) -> tuple:
+    """
+        This function re-simulates the session of a replay file from its start, and aggregates its result and the
+        cells of its head. It is run by the worker processes.
+    """
+    path, _, _ = task
+    stats = GameStats()
+    player = ReplayPlayer(path)
+    try:
+        engine = player.seek(0)
+        columns, rows = engine.columns, engine.rows
+        heat = stats.heatmap(columns, rows)
+        directions, lastTick = player.directions, player.lastTick
+        column, row = engine.snakeCoordinates[-1]
+        heat[row * columns + column] += 1
+        while engine.tick < lastTick and engine.gameNotOver:
+            engine.step(directions.get(engine.tick))
+            column, row = engine.snakeCoordinates[-1]
+            if 0 <= column < columns and 0 <= row < rows: # Not Through a Wall
+                heat[row * columns + column] += 1
+        stats.addGame(engine.score, engine.tick, engine.deathCause if not engine.gameNotOver else "timeout")
+    finally:
+        player.close()
+    return path, stats, os.path.getsize(path)
+
+def isReplay(path: str) -> bool:
+    """
+        This function checks whether a file is a replay file (rather than a result file) from its magic.
+    """
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+def fingerprint(path: str, size: int) -> str:
+    """
+        This function returns a digest of the first bytes of a file (at most the given size).
+    """
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read(min(size, FINGERPRINT_SIZE))).hexdigest()
+
+def loadCache(path: str) -> dict:
+    """
+        This function returns the cached aggregates per file (empty if there is no valid cache).
+    """
+    if path is None or not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as cache:
+            return json.load(cache)
+    except ValueError:
+        return {} # Recomputed
+
+def analyze(paths: list, cachePath: str = None, processes: int = 1, splitSize: int = SPLIT_SIZE) -> tuple:
+    """
+        This function aggregates the given log files, reusing the cached aggregate of every file and only reading
+        what was added to it since, and returns the total aggregates along with the number of bytes read.
+    """
+    cache = loadCache(cachePath)
+    entries, tasks = {}, []
+    for path in paths:
+        key, size = os.path.abspath(path), os.path.getsize(path)
+        entry = cache.get(key)
+        if isReplay(path):
+            if entry is None or entry["size"] != size or entry["mtime"] != os.path.getmtime(path):
+                entry = {"kind": "replay", "offset": 0, "stats": None}
+                tasks.append((aggregateReplay, (path, 0, size)))
+        else:
+            if entry is None or entry["offset"] > size or entry["fingerprint"] != fingerprint(path, entry["offset"]):
+                entry = {"kind": "results", "offset": 0, "stats": None} # New or Rewritten File
+            for start in range(entry["offset"], size, splitSize):
+                tasks.append((aggregateResults, (path, start, min(start + splitSize, size))))
+        entries[key] = entry
+
+    read = sum(task[2] - task[1] for _, task in tasks)
+    if processes > 1 and len(tasks) > 1:
+        with Pool(processes) as pool:
+            outcomes = [pool.apply_async(function, (task,)) for function, task in tasks]
+            outcomes = [outcome.get() for outcome in outcomes]
+    else:
+        outcomes = [function(task) for function, task in tasks]
+
+    fresh = {}
+    for path, stats, offset in outcomes:
+        key = os.path.abspath(path)
+        entry = entries[key]
+        if key not in fresh:
+            fresh[key] = GameStats.fromDict(entry["stats"]) if entry["stats"] is not None else GameStats()
+        fresh[key].merge(stats)
+        if offset is not None:
+            entry["offset"] = max(entry["offset"], offset)
+    for key, stats in fresh.items():
+        entry = entries[key]
+        entry.update(stats = stats.toDict(), size = os.path.getsize(key), mtime = os.path.getmtime(key),
+                     fingerprint = fingerprint(key, entry["offset"]))
+
+    total = GameStats()
+    for entry in entries.values():
+        if entry["stats"] is not None:
+            total.merge(GameStats.fromDict(entry["stats"]))
+    if cachePath is not None:
+        cache.update(entries)
+        with open(cachePath, "w") as output:
+            json.dump(cache, output)
+    return total, read
+
+def renderHeatmap(visits: list, columns: int) -> str:
+    """
+        This function returns a heatmap as lines of characters, from the least (" ") to the most ("@") visited cells.
+    """
+    peak = max(visits) or 1
+    shades = [HEAT_SHADES[min(count * len(HEAT_SHADES) // peak, len(HEAT_SHADES) - 1)] if count else " " for count in visits]
+    return "\n".join("".join(shades[row:row + columns]) for row in range(0, len(shades), columns))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Aggregate the results and replays of many snake games in a single pass.")
+    parser.add_argument("paths", nargs = "+", help = "result files (JSON lines) and replay files")
+    parser.add_argument("--processes", type = int, default = 1, help = "number of worker processes")
+    parser.add_argument("--split", type = int, default = SPLIT_SIZE, help = "bytes of a result file aggregated by a single task")
+    parser.add_argument("--cache", default = ".analytics-cache.json", help = "path of the cache of the aggregates per file")
+    parser.add_argument("--no-cache", action = "store_true", help = "read every file from the start, without updating the cache")
+    parser.add_argument("--heatmap", action = "store_true", help = "print the heatmaps of the head positions")
+    parser.add_argument("--report", default = None, help = "path of the JSON report of the whole aggregates to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats, read = analyze(args.paths, None if args.no_cache else args.cache, args.processes, args.split)
+    summary = stats.summary()
+    summary.update(bytesRead = read, elapsed = time.perf_counter() - start)
+    print(json.dumps(summary, indent = 2))
+    if args.heatmap:
+        for size, visits in stats.heatmaps.items():
+            print(f"\nhead positions ({size} cells) :")
+            print(renderHeatmap(visits, int(size.split("x")[0])))
+    if args.report:
+        with open(args.report, "w") as report:
+            json.dump({"arguments": vars(args), "time": time.time(), "summary": summary, "stats": stats.toDict()}, report, indent = 2)
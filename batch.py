@@ -0,0 +1,200 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements a vectorized batch of games, stepped in lockstep with NumPy.
+
+    The `BatchEngine` class holds N boards with the same rules as the `Engine` class (see `engine.py`), i.e. the
+    `Game.move()` rules, in NumPy arrays : the direction codes, the head cells, the ring-buffer bodies, the occupancy
+    grids, the free-cell indexes and the prey cells. A single call of `step()` moves every snake, with the
+    Python-level tuple math of `calculateNewCoordinates()`, `isCaptured()` and `isGameOver()` replaced by array
+    operations. Boards whose game is over are reset automatically, which is convenient for bot training.
+
+    As in the `Engine` class, the boards are grids of cells, and a cell (column, row) is stored as its index
+    row * columns + column.
+
+    *Note that NumPy is only required by this module.*
+"""
+
+import numpy as np
+
+from engine import WINDOW_WIDTH, WINDOW_HEIGHT, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH, PREY_MARGIN, startingCells
+
+#direction codes, in the same order as the arrow keys of whenAnArrowKeyIsPressed()
+DIRECTIONS = ("Left", "Right", "Up", "Down")
+LEFT, RIGHT, UP, DOWN = range(4)
+NO_ACTION = -1
+OPPOSITE_CODES = np.array([RIGHT, LEFT, DOWN, UP], dtype = np.int8)
+COLUMN_STEPS = np.array([-1, 1, 0, 0], dtype = np.int32)
+ROW_STEPS = np.array([0, 0, -1, 1], dtype = np.int32)
+
+class BatchEngine():
+    '''
+        This class implements N games stepped in lockstep with vectorized operations.
+    '''
+    def __init__(self, boards: int, width: int = WINDOW_WIDTH, height: int = WINDOW_HEIGHT,
+                 snakeIconWidth: int = SNAKE_ICON_WIDTH, preyIconWidth: int = PREY_ICON_WIDTH,
+                 seed = None):
+        """
+            This initializer allocates the arrays of every board, then resets all of them.
+        """
+        self.boards = boards
+        self.width = width
+        self.height = height
+        self.snakeIconWidth = snakeIconWidth
+        self.preyIconWidth = preyIconWidth
+        self.random = np.random.default_rng(seed)
+
+        self.columns = width // snakeIconWidth
+        self.rows = height // snakeIconWidth
+        self.startingCells = np.array([row * self.columns + column for column, row in startingCells(self.columns, self.rows)], dtype = np.int32)
+
+        #cells where a prey can be created, PREY_MARGIN cells away from the walls (as in `Body`)
+        cellColumns = np.arange(self.columns * self.rows) % self.columns
+        cellRows = np.arange(self.columns * self.rows) // self.columns
+        self.eligible = ((cellColumns >= PREY_MARGIN) & (cellColumns < self.columns - PREY_MARGIN) &
+                         (cellRows >= PREY_MARGIN) & (cellRows < self.rows - PREY_MARGIN))
+        self.eligibleCells = np.flatnonzero(self.eligible).astype(np.int32)
+
+        self.capacity = self.columns * self.rows + 1 # Longest Possible Snake (Including a Head Off the Board)
+        self.index = np.arange(boards)
+        self.bodies = np.full((boards, self.capacity), -1, dtype = np.int32) # Ring Buffers of Cells (From Tail to Head)
+        self.tails = np.zeros(boards, dtype = np.int64) # Position of the Tail in the Ring Buffer
+        self.lengths = np.zeros(boards, dtype = np.int64)
+        self.occupied = np.zeros((boards, self.columns * self.rows), dtype = np.uint8)
+        self.free = np.zeros((boards, self.eligibleCells.size), dtype = np.int32) # Free Cells (In No Particular Order)
+        self.freePositions = np.full((boards, self.columns * self.rows), -1, dtype = np.int32) # Position in the Free Cells (or -1)
+        self.freeCounts = np.zeros(boards, dtype = np.int64)
+        self.headColumns = np.zeros(boards, dtype = np.int32)
+        self.headRows = np.zeros(boards, dtype = np.int32)
+        self.directions = np.zeros(boards, dtype = np.int8)
+        self.preyColumns = np.zeros(boards, dtype = np.int32)
+        self.preyRows = np.zeros(boards, dtype = np.int32)
+        self.scores = np.zeros(boards, dtype = np.int32)
+        self.ticks = np.zeros(boards, dtype = np.int64)
+        self.reset(np.ones(boards, dtype = bool))
+
+    def reset(self, mask: np.ndarray) -> None:
+        """
+            This method resets the boards selected by the boolean mask to the starting
+            snake coordinates, direction and score, and creates their first prey.
+        """
+        boards = np.flatnonzero(mask)
+        if boards.size == 0:
+            return
+        self.occupied[boards] = 0
+        self.free[boards] = self.eligibleCells
+        self.freePositions[boards] = -1
+        self.freePositions[boards[:, None], self.eligibleCells] = np.arange(self.eligibleCells.size, dtype = np.int32)
+        self.freeCounts[boards] = self.eligibleCells.size
+        self.bodies[boards, :len(self.startingCells)] = self.startingCells
+        for cell in self.startingCells:
+            self.occupied[boards, cell] += 1
+            if self.eligible[cell] and self.occupied[boards[0], cell] == 1:
+                self.removeFree(boards, np.full(boards.size, cell))
+        self.tails[boards] = 0
+        self.lengths[boards] = len(self.startingCells)
+        headCell = self.startingCells[-1]
+        self.headColumns[boards] = headCell % self.columns
+        self.headRows[boards] = headCell // self.columns
+        self.directions[boards] = LEFT
+        self.scores[boards] = 0
+        self.ticks[boards] = 0
+        self.createNewPrey(boards)
+
+    def addFree(self, boards: np.ndarray, cells: np.ndarray) -> None:
+        """
+            This method appends a cell to the free cells of each of the given (distinct) boards.
+        """
+        self.freePositions[boards, cells] = self.freeCounts[boards]
+        self.free[boards, self.freeCounts[boards]] = cells
+        self.freeCounts[boards] += 1
+
+    def removeFree(self, boards: np.ndarray, cells: np.ndarray) -> None:
+        """
+            This method removes a cell from the free cells of each of the given (distinct) boards,
+            by moving their last free cell into its position (as in `Body.removeFree()`).
+        """
+        positions = self.freePositions[boards, cells]
+        self.freeCounts[boards] -= 1
+        last = self.free[boards, self.freeCounts[boards]]
+        self.free[boards, positions] = last
+        self.freePositions[boards, last] = positions
+        self.freePositions[boards, cells] = -1
+
+    def createNewPrey(self, boards: np.ndarray) -> None:
+        """
+            This method picks a random free cell as the prey of each of the given boards
+            (as in `Engine.createNewPrey()`). The boards must have a free cell.
+        """
+        cells = self.free[boards, (self.random.random(boards.size) * self.freeCounts[boards]).astype(np.int64)]
+        self.preyColumns[boards] = cells % self.columns
+        self.preyRows[boards] = cells // self.columns
+
+    def step(self, actions: np.ndarray = None) -> tuple:
+        """
+            This method advances every board by a single tick.
+            The actions are direction codes (or NO_ACTION) for each board, which are
+            ignored if they would reverse the snake onto itself.
+            It returns the boolean arrays of the boards which captured their prey and
+            of the boards whose game was over (and which have been reset).
+        """
+        index = self.index
+        if actions is not None:
+            actions = np.asarray(actions, dtype = np.int8)
+            turning = (actions != NO_ACTION) & (actions != OPPOSITE_CODES[self.directions])
+            self.directions = np.where(turning, actions, self.directions).astype(np.int8)
+
+        #calculate the new head coordinates
+        self.headColumns += COLUMN_STEPS[self.directions]
+        self.headRows += ROW_STEPS[self.directions]
+
+        #check if the prey is captured (i.e. the head is on the prey cell)
+        captured = (self.headColumns == self.preyColumns) & (self.headRows == self.preyRows)
+
+        #move the snakes which did not capture their prey (i.e. remove their tail)
+        moving = np.flatnonzero(~captured)
+        tailCells = self.bodies[moving, self.tails[moving] % self.capacity]
+        self.occupied[moving, tailCells] -= 1
+        freed = self.eligible[tailCells] & (self.occupied[moving, tailCells] == 0)
+        self.addFree(moving[freed], tailCells[freed])
+        self.tails[moving] += 1
+        self.lengths[moving] -= 1
+
+        #check if the game is over (wall or bite)
+        wall = ((self.headColumns < 0) | (self.headRows < 0) |
+                (self.headColumns >= self.columns) | (self.headRows >= self.rows))
+        headCells = np.where(wall, -1, self.headRows * self.columns + self.headColumns)
+        gameOver = wall | (self.occupied[index, np.maximum(headCells, 0)] > 0) & ~wall
+
+        #append the new heads
+        self.bodies[index, (self.tails + self.lengths) % self.capacity] = headCells
+        self.lengths += 1
+        onBoard = np.flatnonzero(~wall)
+        onBoardCells = headCells[onBoard]
+        self.occupied[onBoard, onBoardCells] += 1
+        taken = self.eligible[onBoardCells] & (self.occupied[onBoard, onBoardCells] == 1)
+        self.removeFree(onBoard[taken], onBoardCells[taken])
+
+        self.scores += captured
+        self.ticks += 1
+        gameOver |= captured & (self.freeCounts == 0) # Board Filled by the Snake
+        capturedBoards = np.flatnonzero(captured & ~gameOver)
+        if capturedBoards.size:
+            self.createNewPrey(capturedBoards)
+        self.reset(gameOver)
+        return captured, gameOver
+
+    def snakeCoordinates(self, board: int) -> list:
+        """
+            This method returns the cell coordinates of the snake (from tail to head) of a board,
+            e.g. to render it.
+        """
+        cells = self.bodies[board, (self.tails[board] + np.arange(self.lengths[board])) % self.capacity]
+        return [(cell % self.columns, cell // self.columns) for cell in cells.tolist()]
+
+    def preyCoordinates(self, board: int) -> tuple:
+        """
+            This method returns the cell coordinates of the prey of a board.
+        """
+        return (int(self.preyColumns[board]), int(self.preyRows[board]))
@@ -0,0 +1,788 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the benchmarks of the snake game.
+
+    Each benchmark is registered by name and can be run with :
+        python benchmark.py <name>
+    The results can also be written as a JSON report (e.g. to compare them between releases) with :
+        python benchmark.py <name> --report results.json
+"""
+
+import argparse
+import asyncio, copy, json, pickle, platform, queue, random, threading, time, tracemalloc
+from collections import deque
+from multiprocessing import Pipe, Process
+from types import SimpleNamespace
+
+from channel import CoalescingChannel
+from delta import DeltaDecoder, DeltaEncoder
+from engine import Engine
+from instrumentation import instrument
+from metrics import Histogram
+from renderer import CellRenderer, SegmentRenderer, snakePoints
+from scheduler import POLICIES, Scheduler
+from sharedboard import SharedBoard
+from snapshot import SnapshotBuffer
+
+BENCHMARKS = {}
+
+def benchmark(function):
+    """
+        This decorator registers a benchmark function under its name
+        (without the "bench" prefix, e.g. benchBodyLength -> bodyLength).
+    """
+    name = function.__name__[len("bench"):]
+    BENCHMARKS[name[0].lower() + name[1:]] = function
+    return function
+
+def serpentine(columns: int, rows: int):
+    """
+        This generator yields the cell coordinates of a path which sweeps the
+        board row by row, alternating between left-to-right and right-to-left.
+    """
+    for row in range(rows):
+        columnRange = range(columns) if row % 2 == 0 else range(columns - 1, -1, -1)
+        for column in columnRange:
+            yield (column, row)
+
+def directionTowards(current: tuple, target: tuple) -> str:
+    """
+        This function returns the direction to move from the current
+        coordinates to the adjacent target coordinates.
+    """
+    if target[0] < current[0]:
+        return "Left"
+    elif target[0] > current[0]:
+        return "Right"
+    elif target[1] < current[1]:
+        return "Up"
+    return "Down"
+
+def busyWait(seconds: float) -> None:
+    """
+        This function keeps the CPU busy (holding the GIL) for the given duration, e.g. to emulate a slow bot.
+    """
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def produceShared(boardName: str, length: int, cells: int, rate: int, ticks: int, work: float, results) -> None:
+    """
+        This function runs the `Game` of `alternative.py` in a separate process, publishing its frames into the
+        shared board of the given name (see `benchIpc()`), then sends the elapsed time through the results pipe.
+    """
+    import alternative
+    board = SharedBoard.attach(boardName)
+    game = alternative.Game(snapshots = board)
+    game.engine, directions = serpentineEngine(length, cells)
+    scheduler = Scheduler(1 / rate if rate else 0.0, "catchup")
+    def tick() -> None:
+        game.direction = directions[scheduler.ticks]
+        busyWait(work)
+        game.move()
+    start = time.perf_counter()
+    scheduler.run(tick, lambda: scheduler.ticks < ticks)
+    results.send(time.perf_counter() - start)
+    board.close()
+
+@benchmark
+def benchBodyLength(args) -> list:
+    """
+        This benchmark measures the cost of a tick as a function of the snake length,
+        from the starting length of 5 up to a snake filling a board of
+        args.cells x args.cells cells. The snake follows a serpentine path so it
+        never collides, and the per-tick cost should remain flat.
+    """
+    filledLength = args.cells * args.cells - args.ticks - 1 # Board Filled (Except Room for Measured Ticks)
+    lengths = [5, *[10 ** power for power in range(3, 7) if 10 ** power < filledLength], filledLength]
+
+    results = []
+    for length in lengths:
+        engine, directions = serpentineEngine(length, args.cells)
+        directions = directions[:args.ticks]
+
+        start = time.perf_counter()
+        for direction in directions:
+            engine.step(direction)
+        elapsed = time.perf_counter() - start
+        results.append({"length": length, "nsPerTick": elapsed / args.ticks * 1e9})
+        print(f"length {length:>9} : {elapsed / args.ticks * 1e9:8.0f} ns/tick")
+    return results
+
+def serpentineEngine(length: int, cells: int, seed: int = 0) -> tuple:
+    """
+        This function returns an engine whose snake of the given length lies on a serpentine
+        path through a board of cells x cells, along with the directions which follow the path.
+    """
+    snakeIconWidth = 15
+    path = list(serpentine(cells, cells))
+    engine = Engine(cells * snakeIconWidth, cells * snakeIconWidth, snakeIconWidth, seed = seed)
+    engine.reset(path[:length], directionTowards(path[length - 2], path[length - 1]))
+    directions = [directionTowards(path[i], path[i + 1]) for i in range(length - 1, len(path) - 1)]
+    return engine, directions
+
+@benchmark
+def benchBatch(args) -> list:
+    """
+        This benchmark measures the board-steps per second of the vectorized `BatchEngine` (which requires NumPy)
+        for each of args.batches boards, with random actions, against stepping `Engine` instances one by one.
+    """
+    import numpy as np
+    from batch import BatchEngine, DIRECTIONS, NO_ACTION
+
+    engines = [Engine(seed = seed) for seed in range(100)]
+    start = time.perf_counter()
+    for tick in range(args.ticks // 10):
+        for engine in engines:
+            if not engine.step(DIRECTIONS[tick % 4] if tick % 3 == 0 else None):
+                engine.reset()
+    sequential = len(engines) * (args.ticks // 10) / (time.perf_counter() - start)
+    print(f"{'Engine':>12} : {sequential:>12,.0f} board-steps/sec")
+
+    results = [{"engine": "Engine", "boards": len(engines), "boardStepsPerSec": sequential}]
+    random = np.random.default_rng(0)
+    for boards in args.batches:
+        batch = BatchEngine(boards, seed = 0)
+        actions = random.integers(NO_ACTION, len(DIRECTIONS), size = (16, boards), dtype = np.int8)
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            batch.step(actions[tick % len(actions)])
+        boardStepsPerSec = boards * args.ticks / (time.perf_counter() - start)
+        results.append({"engine": "BatchEngine", "boards": boards, "boardStepsPerSec": boardStepsPerSec})
+        print(f"{boards:>6} boards : {boardStepsPerSec:>12,.0f} board-steps/sec")
+    return results
+
+@benchmark
+def benchPreyPlacement(args) -> list:
+    """
+        This benchmark measures the cost of creating a prey as the snake fills a board of args.cells x args.cells
+        cells (up to 99.9% of the cells where a prey can be created), with the free-cell index of the `Body` class
+        against rejection sampling (i.e. drawing random cells until one is not occupied).
+    """
+    path = list(serpentine(args.cells, args.cells))
+    eligible = Engine(args.cells * 15, args.cells * 15).body.eligible
+    results = []
+    for fill in (0.5, 0.9, 0.99, 0.999):
+        #the snake covers the start of the path, so leave the given fraction of the eligible cells at its end
+        freeCells = max(1, round((1 - fill) * sum(eligible)))
+        length = len(path)
+        while freeCells:
+            length -= 1
+            column, row = path[length]
+            freeCells -= eligible[row * args.cells + column]
+        engine, _ = serpentineEngine(length, args.cells)
+        body = engine.body
+        occupancy = 1 - len(body.free) / sum(eligible)
+
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            engine.createNewPrey()
+        indexed = (time.perf_counter() - start) / args.ticks
+
+        draws = 0
+        randrange = engine.random.randrange
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            while True:
+                draws += 1
+                index = randrange(len(body.occupied))
+                if body.eligible[index] and not body.occupied[index]:
+                    break
+        rejection = (time.perf_counter() - start) / args.ticks
+
+        results.append({"occupancy": occupancy, "indexedUs": indexed * 1e6, "rejectionUs": rejection * 1e6,
+                        "rejectionDraws": draws / args.ticks})
+        print(f"occupancy {occupancy:7.2%} : index {indexed * 1e6:7.2f} us/prey, "
+              f"rejection {rejection * 1e6:9.2f} us/prey ({draws / args.ticks:,.0f} draws)")
+    return results
+
+@benchmark
+def benchForks(args) -> list:
+    """
+        This benchmark measures the forks per second of a breadth-first lookahead search, which forks a state in
+        each direction and steps it, skipping the states already in its transposition table, for each of args.lengths.
+        The persistent `GameState` (keyed by its stable hash) is compared with deep copies of the `Engine`
+        (keyed by its snake coordinates, prey and direction). Each search stops after args.ticks forks or 10 sec.
+    """
+    from state import GameState
+
+    def search(root, fork, key) -> tuple:
+        table = {key(root)}
+        frontier = deque([root])
+        forks = 0
+        start = time.perf_counter()
+        while forks < args.ticks and time.perf_counter() - start < 10:
+            state = frontier.popleft() if frontier else root # Restart When the Search Is Exhausted
+            for direction in ("Left", "Right", "Up", "Down"):
+                child = fork(state, direction)
+                forks += 1
+                childKey = key(child)
+                if child.gameNotOver and childKey not in table:
+                    table.add(childKey)
+                    frontier.append(child)
+        return forks / (time.perf_counter() - start), len(table)
+
+    def forkEngine(engine, direction: str):
+        child = copy.deepcopy(engine)
+        child.step(direction)
+        return child
+
+    results = []
+    for length in args.lengths:
+        engine, _ = serpentineEngine(length, int((2 * length) ** 0.5) + 4)
+        root = GameState.fromEngine(engine)
+        persistent, states = search(root, lambda state, direction: state.clone().step(direction),
+                                    lambda state: state.stateHash)
+        copied, _ = search(engine, forkEngine,
+                           lambda engine: (tuple(engine.snakeCoordinates), engine.preyCoordinates, engine.direction))
+        results.append({"length": length, "gameStateForksPerSec": persistent, "engineForksPerSec": copied,
+                        "states": states})
+        print(f"length {length:>6} : GameState {persistent:>10,.0f} forks/sec, "
+              f"Engine deepcopy {copied:>10,.0f} forks/sec ({states} distinct states)")
+    return results
+
+@benchmark
+def benchAutopilot(args) -> list:
+    """
+        This benchmark plays args.ticks ticks with the `AutopilotController` (restarting the game when it is over)
+        on boards of increasing size, and reports the plan latency against the budget of args.budget us,
+        the ticks which took longer than the budget and those whose plan was cut short, and the mean score, along with the mean score of the `GreedyController`.
+    """
+    from controllers import AutopilotController, GreedyController
+
+    def play(engine, controller) -> tuple:
+        scores = []
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            if not engine.step(controller(engine)):
+                scores.append(engine.score)
+                engine.reset()
+        scores.append(engine.score)
+        return args.ticks / (time.perf_counter() - start), sum(scores) / len(scores)
+
+    results = []
+    for columns, rows in ((34, 20), (100, 100), (300, 300)): # Default Board, Then Larger Ones
+        _, greedyScore = play(Engine(columns * 15, rows * 15, 15, seed = 0), GreedyController(0))
+        autopilot = AutopilotController(0, args.budget)
+        ticksPerSec, score = play(Engine(columns * 15, rows * 15, 15, seed = 0), autopilot)
+        results.append({"columns": columns, "rows": rows, "ticksPerSec": ticksPerSec, "meanScore": score, "greedyMeanScore": greedyScore,
+                        "overBudget": autopilot.overBudget, "cutShort": autopilot.cutShort, "latency": autopilot.latency.toDict()})
+        print(f"{columns:>4}x{rows:<4} : {ticksPerSec:>8,.0f} ticks/sec, mean score {score:7.1f} (greedy {greedyScore:7.1f}), "
+              f"{autopilot.overBudget} ticks over budget, {autopilot.cutShort} cut short, {autopilot.latency}")
+    return results
+
+@benchmark
+def benchDelta(args) -> list:
+    """
+        This benchmark compares the size (pickled bytes) and the cost of producing and
+        consuming a full "move" message against a delta message, as the snake grows.
+        The delta figures are amortized over args.keyframes, i.e. they include the keyframes.
+    """
+    results = []
+    for length in (5, 100, 1000, 10000, 50000):
+        cells = int((length + args.ticks) ** 0.5) + 2
+        engine, directions = serpentineEngine(length, cells)
+        encoder, decoder = DeltaEncoder(keyframeInterval = args.keyframes), DeltaDecoder()
+        decoder.apply(encoder.encode(engine))
+
+        fullBytes = deltaBytes = 0
+        fullTime = deltaTime = 0.0
+        for direction in directions[:args.ticks]:
+            engine.step(direction)
+            start = time.perf_counter()
+            fullMessage = pickle.dumps({"move": list(engine.snakeCoordinates)})
+            [coord for point in pickle.loads(fullMessage)["move"] for coord in point] # Flattened for Canvas
+            middle = time.perf_counter()
+            deltaMessage = pickle.dumps({"delta": encoder.encode(engine)})
+            decoder.apply(pickle.loads(deltaMessage)["delta"])
+            end = time.perf_counter()
+            fullBytes += len(fullMessage)
+            deltaBytes += len(deltaMessage)
+            fullTime += middle - start
+            deltaTime += end - middle
+
+        results.append({"length": length, "fullBytesPerTick": fullBytes / args.ticks, "deltaBytesPerTick": deltaBytes / args.ticks,
+                        "fullUsPerTick": fullTime / args.ticks * 1e6, "deltaUsPerTick": deltaTime / args.ticks * 1e6})
+        print(f"length {length:>7} : full {fullBytes / args.ticks:>10.0f} B {fullTime / args.ticks * 1e6:>9.1f} us"
+              f" | delta {deltaBytes / args.ticks:>6.0f} B {deltaTime / args.ticks * 1e6:>6.1f} us")
+    return results
+
+@benchmark
+def benchIpc(args) -> list:
+    """
+        This benchmark compares the IPC models by driving the `Game` of `original.py` (with its queue, or
+        the coalescing channel) and of `alternative.py` (with its locks and semaphores, or the snapshot buffer)
+        headlessly at each of args.rates (ticks/sec, 0 for unthrottled) and args.lengths (snake lengths).
+        A consumer thread emulates the gui by blocking on the queue (or the "full" semaphore) and flattening
+        the snake coordinates as the canvas update does, while the channel and snapshot consumers (which have
+        no blocking read) poll every millisecond. In the "process" model, the game instead runs in a separate
+        process, publishing its frames into a `SharedBoard`, which the consumer polls every millisecond.
+        Each tick can also keep the CPU busy for args.work us (i.e. a slow bot), which delays the consumer thread
+        of the other models (since they share the GIL), but not the consumer of the "process" model.
+        It reports the throughput, the producer-to-consumer latency, the lock wait and hold times,
+        the maximum backlog and (with args.memory) the peak memory allocated during the run.
+    """
+    import original, alternative
+
+    def runModel(model: str, length: int, rate: int) -> dict:
+        cells = int((length + args.ticks) ** 0.5) + 2
+        if model in ("queue", "channel"):
+            game = original.Game(gameQueue = queue.Queue() if model == "queue" else CoalescingChannel(64, "drop_oldest"))
+        elif model == "process":
+            board = SharedBoard.create(max(cells, 34), max(cells, 20)) # Room for the Initial Frame of the Game
+            results, sender = Pipe(duplex = False)
+            producer = Process(target = produceShared, daemon = True,
+                args = (board.name, length, cells, rate, args.ticks, args.work / 1e6, sender))
+            game = SimpleNamespace(snapshots = board)
+        else:
+            game = alternative.Game(snapshots = SnapshotBuffer() if model == "snapshot" else None)
+            instrument(game)
+        if model != "process":
+            game.engine, directions = serpentineEngine(length, cells)
+        latency = Histogram("latency")
+        done = threading.Event()
+        consumed = [0]
+
+        def consume(snakeCoordinates, producedAt: float) -> None:
+            snakePoints(snakeCoordinates, 15) # Flattened Pixels for Canvas
+            latency.record(time.perf_counter() - producedAt)
+            consumed[0] += 1
+
+        def consumeQueue() -> None:
+            while not done.is_set() or not game.queue.empty():
+                try:
+                    task = game.queue.get(timeout = 0.01) if model == "queue" else game.queue.get_nowait()
+                except queue.Empty:
+                    if model == "channel":
+                        time.sleep(0.001) # Channel Has No Blocking Get (Handled by Tkinter)
+                    continue
+                if "move" in task:
+                    consume(task["move"], task["time"])
+
+        def consumeLocks() -> None:
+            while not done.is_set():
+                if game.full["move"].acquire(timeout = 0.01):
+                    game.locks["move"].acquire()
+                    snakeCoordinates, producedAt = list(game.snakeCoordinates), game.moveTime
+                    game.locks["move"].release()
+                    consume(snakeCoordinates, producedAt)
+
+        def consumeSnapshot() -> None:
+            lastSeq = 0
+            while not done.is_set():
+                frame = game.snapshots.latest(lastSeq)
+                if frame is not None and game.snapshots.isCurrent(frame):
+                    lastSeq = frame.seq
+                    consume(frame.snakeCoordinates, frame.time) # Shared Board Frames Are Only Valid Until Overwritten
+                time.sleep(0.001)
+
+        consumer = threading.Thread(target = {"queue": consumeQueue, "channel": consumeQueue,
+            "locks": consumeLocks, "snapshot": consumeSnapshot, "process": consumeSnapshot}[model], daemon = True)
+        backlog = [0]
+        def tick() -> None:
+            game.direction = directions[scheduler.ticks]
+            busyWait(args.work / 1e6)
+            game.move()
+            if model in ("queue", "channel"):
+                backlog[0] = max(backlog[0], game.queue.qsize())
+            elif model == "locks":
+                backlog[0] = game.full["move"].maxBacklog
+
+        if args.memory:
+            tracemalloc.start()
+        scheduler = Scheduler(1 / rate if rate else 0.0, "catchup")
+        consumer.start()
+        if model == "process":
+            producer.start()
+            elapsed = results.recv()
+            producer.join()
+        else:
+            start = time.perf_counter()
+            scheduler.run(tick, lambda: scheduler.ticks < args.ticks)
+            elapsed = time.perf_counter() - start
+        done.set()
+        consumer.join()
+        if model == "process":
+            board.unlink()
+        peakMemory = tracemalloc.get_traced_memory()[1] if args.memory else None
+        tracemalloc.stop()
+
+        result = {"model": model, "length": length, "rate": rate,
+                  "ticksPerSec": args.ticks / elapsed, "consumed": consumed[0], "maxBacklog": backlog[0],
+                  "latency": latency.toDict(), "peakMemoryBytes": peakMemory}
+        if model == "locks":
+            result["locks"] = {key: lock.toDict() for key, lock in game.locks.items()}
+        print(f"{model:>8} length {length:>6} rate {rate or 'max':>5} : {result['ticksPerSec']:>9.0f} ticks/sec, "
+              f"{consumed[0]:>5} consumed, backlog {backlog[0]:>5}, latency p50<={result['latency']['p50_us']:.0f}us "
+              f"p99<={result['latency']['p99_us']:.0f}us" + (f", peak {peakMemory / 1e6:.1f} MB" if args.memory else ""))
+        return result
+
+    return [runModel(model, length, rate)
+        for rate in args.rates for length in args.lengths
+        for model in ("queue", "channel", "locks", "snapshot", "process")]
+
+@benchmark
+def benchEventLoop(args) -> list:
+    """
+        This benchmark compares the input latency (i.e. from a key press to the render of the move which applies it)
+        and the CPU usage of the asyncio `Session` of `cooperative.py` with the threaded `Game` of `original.py` (queue)
+        and `alternative.py` (locks), for args.ticks ticks of args.period sec on a board of 200 x 200 cells.
+        An emulated keyboard presses an arrow key (perpendicular to the snake) every 2 to 4 ticks. In the threaded
+        models, an emulated gui thread handles the key presses as soon as they happen, and polls the game every
+        args.poll sec, while in the asyncio model, the key presses are handled by the next Tk update (every
+        TK_INTERVAL sec) and the moves are rendered by the tick itself. The asyncio model is also run along with
+        args.sessions headless sessions played by greedy bots on the same event loop.
+    """
+    import original, alternative
+    from cooperative import Session, TK_INTERVAL
+    from controllers import GreedyController
+
+    cells = 200
+    start = [(cells // 2 + offset, cells // 2) for offset in range(4, -1, -1)] # Heading Left from the Center
+    perpendicular = {"Left": ("Up", "Down"), "Right": ("Up", "Down"), "Up": ("Left", "Right"), "Down": ("Left", "Right")}
+
+    class Keyboard():
+        #emulates the gamer : one key press at a time, until the move which applies it is rendered
+        def __init__(self):
+            self.random = random.Random(0)
+            self.latency = Histogram("key to canvas")
+            self.pending = None # (Direction, Time Pressed)
+            self.nextPress = time.perf_counter() + self.delay()
+        def delay(self) -> float:
+            return self.random.uniform(2, 4) * args.period
+        def press(self, direction: str) -> str:
+            self.pending = (self.random.choice(perpendicular[direction]), time.perf_counter())
+            self.nextPress = time.perf_counter() + self.delay()
+            return self.pending[0]
+        def render(self, snakeCoordinates) -> None:
+            (tailColumn, tailRow), (headColumn, headRow) = snakeCoordinates[-2], snakeCoordinates[-1]
+            if self.pending is not None and directionTowards((tailColumn, tailRow), (headColumn, headRow)) == self.pending[0]:
+                self.latency.record(time.perf_counter() - self.pending[1])
+                self.pending = None
+
+    def runThreaded(model: str) -> dict:
+        module = original if model == "queue" else alternative
+        game = module.Game(width = cells * 15, height = cells * 15)
+        game.engine.reset(start, "Left")
+        keyboard = Keyboard()
+        done = threading.Event()
+
+        def renderQueue() -> None:
+            try:
+                while True:
+                    task = game.queue.get_nowait()
+                    if "move" in task:
+                        keyboard.render(task["move"])
+            except queue.Empty:
+                pass
+        def renderLocks() -> None:
+            if game.full["move"].acquire(blocking = False):
+                game.locks["move"].acquire()
+                keyboard.render(game.snakeCoordinates)
+                game.locks["move"].release()
+        render = renderQueue if model == "queue" else renderLocks
+
+        def gui() -> None: # Tk Thread : Key Presses As They Happen, Polling Every args.poll
+            nextPoll = time.perf_counter() + args.poll
+            while not done.is_set():
+                now = time.perf_counter()
+                if keyboard.pending is None and now >= keyboard.nextPress:
+                    game.whenAnArrowKeyIsPressed(SimpleNamespace(keysym = keyboard.press(game.direction)))
+                if now >= nextPoll:
+                    render()
+                    nextPoll += args.poll
+                time.sleep(max(0.0, min(nextPoll, keyboard.nextPress if keyboard.pending is None else nextPoll) - time.perf_counter()))
+
+        thread = threading.Thread(target = gui, daemon = True)
+        scheduler = Scheduler(args.period, "catchup")
+        startTime, startCpu = time.perf_counter(), time.process_time()
+        thread.start()
+        scheduler.run(game.move, lambda: scheduler.ticks < args.ticks and game.gameNotOver)
+        done.set()
+        thread.join()
+        cpu = (time.process_time() - startCpu) / (time.perf_counter() - startTime)
+        return {"ticks": scheduler.ticks, "cpu": cpu, "latency": keyboard.latency, "lateness": scheduler.lateness}
+
+    def runAsyncio(sessions: int) -> dict:
+        keyboard = Keyboard()
+        async def play() -> Session:
+            session = Session(Engine(cells * 15, cells * 15, 15), speed = args.period)
+            session.engine.reset(start, "Left")
+            session.render = lambda session: keyboard.render(session.engine.snakeCoordinates)
+            bots = [Session(Engine(seed = index), GreedyController(index), speed = args.period, restart = True)
+                    for index in range(sessions)]
+            events = [] # Key Presses Waiting for the Next Tk Update
+            async def press() -> None:
+                while True:
+                    await asyncio.sleep(max(0.0, keyboard.nextPress - time.perf_counter()))
+                    if keyboard.pending is None:
+                        keyboard.press(session.direction)
+                        events.append(keyboard.pending)
+                    else:
+                        keyboard.nextPress = time.perf_counter() + args.period
+            async def tk() -> None:
+                while True:
+                    await asyncio.sleep(TK_INTERVAL)
+                    for event in events:
+                        session.inputs.push(*event)
+                    events.clear()
+            tasks = [asyncio.create_task(task) for task in (press(), tk(), session.play(), *(bot.play() for bot in bots))]
+            while session.scheduler.ticks < args.ticks and session.engine.gameNotOver:
+                await asyncio.sleep(args.period)
+            for task in tasks:
+                task.cancel()
+            return session
+        startTime, startCpu = time.perf_counter(), time.process_time()
+        session = asyncio.run(play())
+        cpu = (time.process_time() - startCpu) / (time.perf_counter() - startTime)
+        return {"ticks": session.scheduler.ticks, "cpu": cpu, "latency": keyboard.latency, "lateness": session.scheduler.lateness}
+
+    results = []
+    for model in ("queue", "locks", "asyncio", f"asyncio+{args.sessions}"):
+        if model.startswith("asyncio"):
+            result = runAsyncio(args.sessions if "+" in model else 0)
+        else:
+            result = runThreaded(model)
+        latency, lateness = result.pop("latency"), result.pop("lateness")
+        results.append({"model": model, **result, "latency": latency.toDict(), "lateness": lateness.toDict()})
+        print(f"{model:>12} : {result['ticks']:>5} ticks, cpu {result['cpu']:6.1%}, "
+              f"key to canvas mean {latency.total / max(latency.count, 1) * 1e3:.1f}ms p99<={latency.percentile(99) * 1e3:.1f}ms "
+              f"({latency.count} keys), tick lateness p99<={lateness.percentile(99) * 1e3:.1f}ms")
+    return results
+
+@benchmark
+def benchRender(args) -> list:
+    """
+        This benchmark measures the frame time of the snake renderers as the snake grows (args.lengths), for args.ticks
+        ticks on a board just large enough for it : the polyline of the `Gui` classes (whose whole coordinate list
+        is sent to Tcl every frame), the `SegmentRenderer` (from delta messages) and the `CellRenderer` (from whole
+        frames, as in snapshot mode). Each frame is flushed with `update_idletasks()`, so that its time includes
+        the redraw of the damaged region of the canvas. It requires a display, since it opens a Tk window.
+    """
+    from tkinter import Tk, Canvas, TclError
+    try:
+        root = Tk()
+    except TclError as error:
+        raise SystemExit(f"The render benchmark requires a display : {error}")
+
+    results = []
+    for length in args.lengths:
+        cells = int((length + args.ticks) ** 0.5) + 2
+        for mode in ("polyline", "segments", "cells"):
+            engine, directions = serpentineEngine(length, cells)
+            canvas = Canvas(root, width = cells * 15, height = cells * 15, bg = "black")
+            canvas.pack()
+            snakeIcon = canvas.create_line((0, 0), (0, 0), fill = "blue", width = 15)
+            preyIcon = canvas.create_rectangle(0, 0, 0, 0, fill = "blue", outline = "blue")
+            scoreText = canvas.create_text(60, 15, fill = "white", text = "Your Score: 0")
+            if mode == "polyline":
+                render = lambda: canvas.coords(snakeIcon, *snakePoints(engine.snakeCoordinates, 15))
+            elif mode == "segments":
+                renderer, encoder = SegmentRenderer(canvas, preyIcon, scoreText, "blue", 15, 10), DeltaEncoder(args.keyframes)
+                render = lambda: renderer.apply(encoder.encode(engine))
+            else:
+                renderer = CellRenderer(canvas, preyIcon, scoreText, "blue", 15, 10)
+                render = lambda: renderer.draw(engine.snakeCoordinates)
+            render() # First Frame (Not Measured)
+            root.update()
+
+            frameTime = Histogram("frame")
+            for direction in directions[:args.ticks]:
+                engine.step(direction)
+                start = time.perf_counter()
+                render()
+                root.update_idletasks() # Redraw the Damaged Region
+                frameTime.record(time.perf_counter() - start)
+            canvas.destroy()
+
+            results.append({"mode": mode, "length": length, "frame": frameTime.toDict()})
+            print(f"{mode:>8} length {length:>7} : frame mean {frameTime.total / frameTime.count * 1e3:7.2f}ms "
+                  f"p50<={frameTime.percentile(50) * 1e3:.2f}ms p99<={frameTime.percentile(99) * 1e3:.2f}ms")
+    root.destroy()
+    return results
+
+@benchmark
+def benchTiles(args) -> list:
+    """
+        This benchmark measures the tick time (i.e. all of the boards stepped by the worker pool) and the frame time
+        (i.e. the batched render pass of all of the boards) of the multi-board mode of `tiled.py`, against the number
+        of boards (args.boards) played by greedy bots, for args.ticks ticks of args.period sec stepped by args.workers
+        workers, while the gui thread renders every FRAME_INTERVAL. Without a display, the script of each render
+        pass is evaluated by a stub canvas command of a bare Tcl interpreter, i.e. without drawing anything.
+    """
+    from tkinter import Tk, Tcl, Canvas, TclError
+    from tiled import FRAME_INTERVAL, TiledGames, TileRenderer
+    try:
+        root = Tk()
+        display = True
+    except TclError:
+        root = Tcl()
+        root.eval("set ::items 0; proc .tiles {args} {incr ::items}") # Stub Canvas Command
+        display = False
+
+    results = []
+    for boards in args.boards:
+        tiles = TiledGames(boards, cell = 4, workers = args.workers, speed = args.period, seed = 0)
+        if display:
+            canvas = Canvas(root, width = tiles.width, height = tiles.height, bg = "black")
+            canvas.pack()
+            renderer = TileRenderer(root.tk, str(canvas), tiles)
+        else:
+            renderer = TileRenderer(root.tk, ".tiles", tiles)
+        clock = threading.Thread(target = tiles.run)
+        clock.start()
+        start = time.perf_counter()
+        while tiles.scheduler.ticks < args.ticks:
+            renderer.render()
+            if display:
+                root.update() # Redraw the Canvas
+            time.sleep(FRAME_INTERVAL / 1000)
+        elapsed = time.perf_counter() - start
+        tiles.running = False
+        clock.join()
+        if display:
+            canvas.destroy()
+
+        tickTime, frameTime = tiles.tickTime, renderer.frameTime
+        results.append({"boards": boards, "workers": tiles.workers, "display": display, "ticks": tiles.scheduler.ticks,
+                        "missed": tiles.missed, "framesPerSec": frameTime.count / elapsed, "tick": tickTime.toDict(),
+                        "frame": frameTime.toDict(), "lateness": tiles.scheduler.lateness.toDict()})
+        print(f"{boards:>5} boards : tick mean {tickTime.total / tickTime.count * 1e3:6.2f}ms p99<={tickTime.percentile(99) * 1e3:.2f}ms "
+              f"({tiles.missed} missed), frame mean {frameTime.total / frameTime.count * 1e3:6.2f}ms "
+              f"p99<={frameTime.percentile(99) * 1e3:.2f}ms, {frameTime.count / elapsed:5.1f} frames/sec", flush = True)
+    if display:
+        root.destroy()
+    else:
+        print("(no display : the render passes were evaluated without drawing)")
+    return results
+
+@benchmark
+def benchLockAcquisitions(args) -> list:
+    """
+        This benchmark counts the lock and semaphore acquisitions per tick of the `Game` in `alternative.py`,
+        with the per-field locks and counting semaphores against the snapshot buffer. The gui is emulated
+        by a thread which reads the shared state as `Gui.update()` does every args.poll seconds
+        (without a canvas), while the game moves every args.period seconds.
+    """
+    import alternative
+
+    results = []
+    for mode in ("locks", "snapshot"):
+        game = alternative.Game(snapshots = SnapshotBuffer() if mode == "snapshot" else None)
+        game.engine, directions = serpentineEngine(5, int(args.ticks ** 0.5) + 2)
+        instrument(game)
+        done = threading.Event()
+        frames, lastSeq = [0], [0]
+
+        def readLocks() -> None:
+            for key in ("move", "prey", "score"):
+                if game.full[key].acquire(blocking = False):
+                    game.locks[key].acquire()
+                    frames[0] += key == "move"
+                    game.locks[key].release()
+            game.full["game_over"].acquire(blocking = False)
+
+        def readSnapshot() -> None:
+            frame = game.snapshots.latest(lastSeq[0])
+            if frame is not None:
+                lastSeq[0] = frame.seq
+                frames[0] += 1
+
+        def emulateGui() -> None:
+            read = readSnapshot if mode == "snapshot" else readLocks
+            while not done.is_set():
+                read()
+                time.sleep(args.poll)
+
+        gui = threading.Thread(target = emulateGui, daemon = True)
+        gui.start()
+        for direction in directions[:args.ticks]:
+            game.direction = direction
+            game.move()
+            time.sleep(args.period)
+        done.set()
+        gui.join()
+
+        acquisitions = sum(primitive.acquisitions for primitive in [*game.locks.values(), *game.full.values()])
+        result = {"mode": mode, "acquisitionsPerTick": acquisitions / args.ticks, "framesRead": frames[0],
+                  "moveBacklog": game.full["move"].backlog}
+        results.append(result)
+        print(f"{mode:>8} : {result['acquisitionsPerTick']:5.2f} acquisitions/tick, "
+              f"{frames[0]} frames read, \"full\" move backlog {result['moveBacklog']}")
+    return results
+
+@benchmark
+def benchScheduler(args) -> list:
+    """
+        This benchmark compares the cadence of the sleep-then-move superloop with the
+        fixed-timestep scheduler policies, while args.contention threads keep the CPU busy.
+        The drift is how far behind wall time the last tick started.
+    """
+    def contend() -> None:
+        while not done.is_set():
+            sum(range(10000))
+
+    def measureSleepLoop() -> dict:
+        engine = Engine(seed = 0)
+        start = time.monotonic()
+        for tick in range(args.ticks):
+            time.sleep(args.period)
+            if not engine.step():
+                engine.reset()
+        return {"mode": "sleep", "drift_ms": (time.monotonic() - start - args.ticks * args.period) * 1e3}
+
+    def measureScheduler(policy: str) -> dict:
+        engine = Engine(seed = 0)
+        scheduler = Scheduler(args.period, policy)
+        def tick() -> None:
+            if not engine.step():
+                engine.reset()
+        start = time.monotonic()
+        scheduler.run(tick, lambda: scheduler.ticks < args.ticks)
+        drift = time.monotonic() - start - (scheduler.ticks + scheduler.dropped) * args.period
+        return {"mode": policy, "drift_ms": drift * 1e3, **scheduler.toDict()}
+
+    done = threading.Event()
+    threads = [threading.Thread(target = contend, daemon = True) for _ in range(args.contention)]
+    for thread in threads:
+        thread.start()
+    results = [measureSleepLoop(), *[measureScheduler(policy) for policy in POLICIES]]
+    done.set()
+
+    for result in results:
+        lateness = f" lateness p50<={result['lateness']['p50_us']:.0f}us p99<={result['lateness']['p99_us']:.0f}us" if "lateness" in result else ""
+        print(f"{result['mode']:>8} : drift {result['drift_ms']:8.2f} ms{lateness}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run a benchmark of the snake game.")
+    parser.add_argument("name", choices = sorted(BENCHMARKS), help = "benchmark to run")
+    parser.add_argument("--ticks", type = int, default = 2000, help = "number of measured ticks")
+    parser.add_argument("--cells", type = int, default = 1000, help = "number of cells along each side of the board")
+    parser.add_argument("--period", type = float, default = 0.01, help = "period of the scheduled ticks (sec)")
+    parser.add_argument("--poll", type = float, default = 0.1, help = "polling period of the emulated gui (sec)")
+    parser.add_argument("--contention", type = int, default = 2, help = "number of threads keeping the CPU busy")
+    parser.add_argument("--keyframes", type = int, default = 100, help = "number of ticks between delta keyframes")
+    parser.add_argument("--rates", type = lambda rates: [int(rate) for rate in rates.split(",")], default = [0, 1000],
+        help = "comma-separated tick rates (ticks/sec, 0 for unthrottled)")
+    parser.add_argument("--lengths", type = lambda lengths: [int(length) for length in lengths.split(",")], default = [5, 1000, 10000],
+        help = "comma-separated snake lengths")
+    parser.add_argument("--batches", type = lambda batches: [int(boards) for boards in batches.split(",")], default = [100, 1000, 10000],
+        help = "comma-separated numbers of boards in the vectorized batch")
+    parser.add_argument("--boards", type = lambda boards: [int(count) for count in boards.split(",")], default = [16, 64, 256],
+        help = "comma-separated numbers of tiled boards")
+    parser.add_argument("--workers", type = int, default = 2, help = "number of worker threads stepping the tiled boards")
+    parser.add_argument("--budget", type = float, default = 1000, help = "planning budget of the autopilot per tick (us)")
+    parser.add_argument("--sessions", type = int, default = 100, help = "number of headless sessions played on the same event loop")
+    parser.add_argument("--work", type = float, default = 0, help = "CPU time spent by the game on every tick, e.g. by a slow bot (us)")
+    parser.add_argument("--memory", action = "store_true", help = "trace the peak memory allocated (slows down the benchmark)")
+    parser.add_argument("--report", default = None, help = "path of the JSON report to write")
+    args = parser.parse_args()
+
+    results = BENCHMARKS[args.name](args)
+    if args.report:
+        with open(args.report, "w") as report:
+            json.dump({"benchmark": args.name, "arguments": vars(args), "python": platform.python_version(),
+                       "platform": platform.platform(), "time": time.time(), "results": results}, report, indent = 2)
@@ -0,0 +1,152 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements a bounded, coalescing channel from the game to the gui.
+
+    With the unbounded `queue.Queue()` of the original design, every "move" task is kept until the gui handles it,
+    so a stalled gui (e.g. window being dragged) accumulates stale frames and then redraws them all in one burst.
+    The `CoalescingChannel` class instead keeps at most one pending task for each of the "move", "prey" and "score"
+    types, replacing its value with the latest one. Other tasks (i.e. "delta" tasks, which cannot be skipped without
+    a keyframe) are kept in order, up to maxsize pending tasks, after which the backpressure policy applies :
+        "block" : the game waits until the gui makes room.
+        "drop_oldest" : the oldest pending task is dropped.
+        "drop_newest" : the new task is dropped.
+    The "game_over" task is never dropped. Once a "delta" task was dropped, the gui ignores the following ones until
+    a keyframe, so the channel flags it (see `takeResync()`), and the game sends a keyframe as its next "delta" task.
+
+    It has the same interface as `queue.Queue()` for the queue handler (i.e. put, get_nowait, task_done).
+"""
+
+import queue
+import threading
+from collections import deque
+
+COALESCED_TASKS = ("move", "prey", "score")
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+def isKeyframe(task: dict) -> bool:
+    """
+        This function checks whether a task is a "delta" task with a keyframe.
+    """
+    return "keyframe" in task.get("delta", ())
+
+class CoalescingChannel():
+    '''
+        This class implements a bounded channel which coalesces superseded tasks.
+    '''
+    def __init__(self, maxsize: int = 64, policy: str = "drop_oldest"):
+        """
+            This initializer sets the maximum number of pending tasks and the backpressure policy.
+        """
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown Backpressure Policy : {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.entries = deque() # Pending Tasks (Each in a List, So Its Value Can Be Replaced In Place)
+        self.coalescable = {} # Pending Entry of Each Coalesced Task Type
+        self.resync = False # Whether a "delta" Task Was Dropped Since the Last Keyframe Was Requested
+        self.condition = threading.Condition()
+        self.counters = {"put": 0, "get": 0, "coalesced": 0, "dropped": 0, "blocked": 0, "maxPending": 0}
+
+    def put(self, task: dict) -> None:
+        """
+            This method adds a task to the channel, coalescing it with
+            a pending task of the same type or applying the backpressure policy.
+        """
+        with self.condition:
+            self.counters["put"] += 1
+            taskType = next(iter(task))
+            if taskType in COALESCED_TASKS:
+                entry = self.coalescable.get(taskType)
+                if entry is not None:
+                    entry[0] = task # Replace Superseded Value
+                    self.counters["coalesced"] += 1
+                    return
+                entry = self.coalescable[taskType] = [task]
+            else:
+                entry = [task]
+                if taskType != "game_over" and self.pendingStream() >= self.maxsize:
+                    if self.policy == "drop_newest":
+                        self.counters["dropped"] += 1
+                        self.resync = self.resync or taskType == "delta"
+                        return
+                    elif self.policy == "drop_oldest":
+                        self.dropOldest()
+                    else:
+                        self.counters["blocked"] += 1
+                        self.condition.wait_for(lambda: self.pendingStream() < self.maxsize)
+            self.entries.append(entry)
+            if isKeyframe(task):
+                self.resync = False # Supersedes the Dropped Deltas
+            self.counters["maxPending"] = max(self.counters["maxPending"], len(self.entries))
+
+    def pendingStream(self) -> int:
+        """
+            This method returns the number of pending tasks which are not coalesced.
+        """
+        return len(self.entries) - len(self.coalescable)
+
+    def dropOldest(self) -> None:
+        """
+            This method drops the oldest pending task which is neither coalesced nor "game_over".
+        """
+        for entry in self.entries:
+            taskType = next(iter(entry[0]))
+            if taskType not in COALESCED_TASKS and taskType != "game_over":
+                self.entries.remove(entry)
+                self.counters["dropped"] += 1
+                if taskType == "delta" and not any(isKeyframe(pending[0]) for pending in self.entries):
+                    self.resync = True # The Pending Deltas Cannot Be Applied
+                return
+
+    def takeResync(self) -> bool:
+        """
+            This method returns whether a "delta" task was dropped since it was last called (and no keyframe
+            is pending after it), i.e. whether the next "delta" task must be a keyframe.
+        """
+        with self.condition:
+            resync, self.resync = self.resync, False
+            return resync
+
+    def get_nowait(self) -> dict:
+        """
+            This method removes and returns the oldest pending task,
+            or raises queue.Empty if there is none.
+        """
+        with self.condition:
+            if not self.entries:
+                raise queue.Empty
+            task = self.entries.popleft()[0]
+            taskType = next(iter(task))
+            if taskType in COALESCED_TASKS:
+                del self.coalescable[taskType]
+            self.counters["get"] += 1
+            self.condition.notify()
+            return task
+
+    def task_done(self) -> None:
+        """
+            This method is provided for compatibility with queue.Queue().
+        """
+
+    def qsize(self) -> int:
+        """
+            This method returns the number of pending tasks.
+        """
+        return len(self.entries)
+
+    def empty(self) -> bool:
+        """
+            This method checks if there are no pending tasks.
+        """
+        return not self.entries
+
+    def stats(self) -> dict:
+        """
+            This method returns a copy of the counters, i.e. the number of tasks put and retrieved,
+            the number of tasks coalesced or dropped, how many times the game was blocked,
+            and the maximum number of pending tasks.
+        """
+        with self.condition:
+            return dict(self.counters)
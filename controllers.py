@@ -0,0 +1,187 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the controllers which can steer the snake of a headless `Engine`.
+
+    A controller is called with the engine before every tick and returns a direction (or None to keep going),
+    as expected by `Engine.turbo()`. Controllers are created from a seed, so that a game is fully deterministic
+    for a given engine seed and controller seed (except the autopilot when its time budget runs out).
+    They are registered by name in the CONTROLLERS dict.
+"""
+
+import random, time
+
+from distance import DistanceField, canReach
+from engine import OPPOSITE_DIRECTIONS
+from metrics import Histogram
+
+DIRECTION_STEPS = {"Left": (-1, 0), "Right": (1, 0), "Up": (0, -1), "Down": (0, 1)}
+CHOICE_MARGIN = 100 # Part of the Autopilot Budget Reserved for Choosing the Move Once Planning Stops (us)
+
+def nextCoordinates(engine, direction: str) -> tuple:
+    """
+        This function returns the coordinates of the head after moving in the given direction.
+    """
+    column, row = engine.snakeCoordinates[-1]
+    stepColumn, stepRow = DIRECTION_STEPS[direction]
+    return (column + stepColumn, row + stepRow)
+
+def isSafe(engine, coordinates: tuple) -> bool:
+    """
+        This function checks if the head can move to the given coordinates without hitting
+        a wall or the body (conservatively assuming that the tail does not move).
+    """
+    column, row = coordinates
+    return 0 <= column < engine.columns and 0 <= row < engine.rows and not engine.body.isOccupied(coordinates)
+
+class RandomController():
+    '''
+        This class implements a controller which turns at random.
+    '''
+    def __init__(self, seed = None, turnProbability: float = 0.2):
+        """
+            This initializer sets the seed and the probability of turning on each tick.
+        """
+        self.random = random.Random(seed)
+        self.turnProbability = turnProbability
+
+    def __call__(self, engine) -> str:
+        """
+            This method returns a random direction, or None to keep going.
+        """
+        if self.random.random() < self.turnProbability:
+            return self.random.choice(tuple(DIRECTION_STEPS))
+        return None
+
+class GreedyController():
+    '''
+        This class implements a controller which moves towards the prey,
+        avoiding any move which would immediately end the game.
+    '''
+    def __init__(self, seed = None):
+        """
+            This initializer sets the seed used to break ties between equally close moves.
+        """
+        self.random = random.Random(seed) # Breaks Ties
+
+    def __call__(self, engine) -> str:
+        """
+            This method returns the safe direction which is closest to the prey, or None if there is none.
+        """
+        preyColumn, preyRow = engine.preyCoordinates
+        candidates = []
+        for direction in DIRECTION_STEPS:
+            if direction == OPPOSITE_DIRECTIONS[engine.direction]:
+                continue
+            coordinates = nextCoordinates(engine, direction)
+            if isSafe(engine, coordinates):
+                distance = abs(coordinates[0] - preyColumn) + abs(coordinates[1] - preyRow)
+                candidates.append((distance, self.random.random(), direction))
+        return min(candidates)[2] if candidates else None
+
+class AutopilotController():
+    '''
+        This class implements a controller which follows the shortest path to the prey around the snake
+        (see `DistanceField` in `distance.py`), only taking a move after which the head can still reach the tail.
+        The planning of each tick is limited to a time budget.
+    '''
+    def __init__(self, seed = None, budget: float = 1000):
+        """
+            This initializer sets the seed used to break ties between equally close moves,
+            and the time budget of each tick (us).
+        """
+        self.random = random.Random(seed) # Breaks Ties
+        self.budget = budget
+        self.latency = Histogram("autopilot plan")
+        self.cutShort = 0 # Number of Ticks Whose Plan Was Cut Short by the Budget
+        self.overBudget = 0 # Number of Ticks Which Took Longer Than the Budget
+        self.field = None
+        self.body = None
+        self.tick = None
+        self.tail = None
+
+    def __call__(self, engine) -> str:
+        """
+            This method returns the direction of the safe move which is closest to the prey, or None if there is none.
+            The moves are tried from the closest, and the first one after which the head can reach the tail is taken.
+            If the budget runs out, the closest move found so far is taken without checking the tail.
+            Planning stops CHOICE_MARGIN us before the end of the budget, so that the move is chosen within it.
+        """
+        start = time.perf_counter_ns()
+        deadline = start + int(max(self.budget - CHOICE_MARGIN, 0) * 1000)
+        self.follow(engine, deadline)
+
+        columns, rows, occupied = engine.columns, engine.rows, engine.body.occupied
+        preyColumn, preyRow = engine.preyCoordinates
+        snakeCoordinates = engine.snakeCoordinates
+        tail = snakeCoordinates[0][1] * columns + snakeCoordinates[0][0]
+        moves = []
+        for direction in DIRECTION_STEPS:
+            if direction == OPPOSITE_DIRECTIONS[engine.direction]:
+                continue
+            column, row = nextCoordinates(engine, direction)
+            if not (0 <= column < columns and 0 <= row < rows):
+                continue
+            cell = row * columns + column
+            captures = (column, row) == (preyColumn, preyRow)
+            if occupied[cell] and (captures or cell != tail): # The Tail Only Moves Away if the Prey Is Not Captured
+                continue
+            moves.append((direction, cell, captures, abs(column - preyColumn) + abs(row - preyRow)))
+
+        complete = self.field.update(deadline, [cell for _, cell, _, _ in moves])
+        candidates = [(self.field.distance(cell), distance, self.random.random(), direction, cell, captures)
+                      for direction, cell, captures, distance in moves]
+        candidates.sort()
+
+        choice = candidates[0][3] if candidates else None
+        for _, _, _, direction, cell, captures in candidates:
+            newTail = snakeCoordinates[0] if captures or len(snakeCoordinates) < 2 else snakeCoordinates[1]
+            reachable = canReach(occupied, columns, rows, cell, newTail[1] * columns + newTail[0], deadline)
+            if reachable is None:
+                break
+            if reachable:
+                choice = direction
+                break
+        if not complete or (candidates and reachable is None):
+            self.cutShort += 1
+        elapsed = time.perf_counter_ns() - start
+        if elapsed > self.budget * 1000:
+            self.overBudget += 1
+        self.latency.record(elapsed / 1e9)
+        return choice
+
+    def follow(self, engine, deadline: int = None) -> None:
+        """
+            This method updates the distance field with the move of the last tick, or resets it
+            if the prey changed, or if the engine was reset or stepped without the autopilot.
+            The field is only allocated for the first game on a board size, and reused by the next ones.
+        """
+        columns = engine.columns
+        tailColumn, tailRow = engine.snakeCoordinates[0]
+        headColumn, headRow = engine.snakeCoordinates[-1]
+        tail, head = tailRow * columns + tailColumn, headRow * columns + headColumn
+        preyColumn, preyRow = engine.preyCoordinates
+        prey = preyRow * columns + preyColumn
+
+        if engine.body is not self.body or engine.tick != self.tick + 1:
+            self.body = engine.body
+            if self.field is None or (self.field.columns, self.field.rows) != (columns, engine.rows):
+                self.field = DistanceField(columns, engine.rows, engine.body.occupied)
+            else:
+                self.field.occupied = engine.body.occupied
+            self.field.setTarget(prey)
+        elif prey != self.field.target:
+            self.field.setTarget(prey)
+        else:
+            self.field.block(head, deadline)
+            if tail != self.tail:
+                self.field.free(self.tail)
+        self.tick = engine.tick
+        self.tail = tail
+
+CONTROLLERS = {
+    "random": RandomController,
+    "greedy": GreedyController,
+    "autopilot": AutopilotController,
+}
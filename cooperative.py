@@ -0,0 +1,244 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This program implements a variety of the snake
+    game (https://en.wikipedia.org/wiki/Snake_(video_game_genre))
+
+    The game and the gui run cooperatively on a single asyncio event loop (i.e. in a single thread), instead of
+    a thread for the `superloop()` and polling callbacks for the gui. Every part of a `Session` is a coroutine :
+        The tick of the game, on the drift-free fixed timestep of the `Scheduler` (see `Scheduler.runAsync()`).
+        The optional bot, which plans the next move after every tick, and presses the arrow keys as the gamer would.
+        The telemetry, which writes the metrics of the sessions as JSON lines every interval.
+    The Tkinter event loop is interleaved with them by a coroutine which processes the pending Tk events
+    (i.e. `Tk.update()`) every few milliseconds, instead of the blocking `Tk.mainloop()`.
+
+    The arrow keys are queued by the key bindings into the ring of `inputs.py`, and the first pending key press which
+    changes the direction is applied at the start of each tick, as in the other implementations.
+
+    Since everything runs in the same thread, each tick is rendered right after the engine is stepped, without any
+    lock or queue handoff, and any number of sessions can be played on the same loop (e.g. headless bots).
+"""
+
+import argparse
+import asyncio, json, sys, time
+
+from tkinter import Tk, Canvas, Button, TclError
+
+from controllers import AutopilotController, GreedyController
+from engine import Engine, WINDOW_WIDTH, WINDOW_HEIGHT, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH
+from inputs import InputRing
+from metrics import Histogram
+from renderer import preyRectangle, snakePoints
+from scheduler import POLICIES, Scheduler
+
+#some constants for our GUI (the board dimensions are those of the engine)
+BACKGROUND_COLOUR = "black"   #you may change this colour if you wish
+ICON_COLOUR = "blue"        #you may change this colour if you wish
+
+TK_INTERVAL = 0.01 # Period of the Tk Event Processing (sec)
+
+class Session():
+    '''
+        This class implements a single game session as coroutines of the running event loop.
+    '''
+    def __init__(self, engine: Engine, bot = None, render = None, speed: float = 0.15, policy: str = "catchup",
+                 restart: bool = False):
+        """
+            This initializer takes the engine of the session, the optional bot (i.e. a controller, see
+            `controllers.py`), the optional render function (called with the session after every tick),
+            and the period (sec) and missed tick policy of its scheduler.
+            If restart is true, the game is reset whenever it is over (e.g. for headless bots).
+        """
+        self.engine = engine
+        self.bot = bot
+        self.render = render
+        self.restart = restart
+        self.scheduler = Scheduler(speed, policy)
+        self.inputs = InputRing() # Arrow Keys Pressed Since the Last Tick
+        self.ticked = asyncio.Event()
+        self.ticked.set() # The Bot Plans the First Move
+        self.direction = engine.direction
+        self.inputLatency = Histogram("key to canvas")
+
+    def whenAnArrowKeyIsPressed(self, e) -> None:
+        """
+            This method is bound to the arrow keys, and queues the key (with the time it was pressed),
+            which sets the movement direction at the start of a later tick (see `tick()`).
+        """
+        self.inputs.push(e.keysym)
+
+    async def drive(self) -> None:
+        """
+            This coroutine lets the bot plan the next move after every tick (i.e. while the session waits for its next deadline).
+        """
+        while True:
+            await self.ticked.wait()
+            self.ticked.clear()
+            direction = self.bot(self.engine)
+            if direction is not None:
+                self.direction = direction
+
+    def tick(self) -> None:
+        """
+            This method applies the first pending key press which changes the movement direction without
+            reversing the snake (if any), steps the engine, then renders the session.
+            The latency from that key press to the render of its move is recorded.
+        """
+        event = self.inputs.pop(self.direction)
+        if event is not None:
+            self.direction = event[0]
+        if not self.engine.step(self.direction) and self.restart:
+            self.engine.reset()
+            self.direction = self.engine.direction
+        if self.render is not None:
+            self.render(self)
+        if event is not None:
+            self.inputLatency.record(time.perf_counter() - event[1])
+        self.ticked.set()
+
+    async def play(self) -> None:
+        """
+            This coroutine plays the session until the game is over (or forever if it restarts),
+            while its bot coroutine (if any) runs in between the ticks.
+        """
+        bot = asyncio.create_task(self.drive()) if self.bot is not None else None
+        try:
+            await self.scheduler.runAsync(self.tick, lambda: self.engine.gameNotOver)
+        finally:
+            if bot is not None:
+                bot.cancel()
+
+class Gui():
+    """
+        This class takes care of the game's graphic user interface (gui)
+        creation and termination, and renders a session.
+    """
+    def __init__(self, session: Session):
+        """
+            The initializer instantiates the main window and
+            creates the starting icons for the snake and the prey,
+            and displays the initial gamer score.
+        """
+        #some GUI constants
+        scoreTextXLocation = 60
+        scoreTextYLocation = 15
+        textColour = "white"
+        #instantiate and create gui
+        self.root = Tk()
+        self.canvas = Canvas(self.root, width = WINDOW_WIDTH,
+            height = WINDOW_HEIGHT, bg = BACKGROUND_COLOUR)
+        self.canvas.pack()
+        #create starting game icons for snake and the prey
+        self.snakeIcon = self.canvas.create_line(
+            (0, 0), (0, 0), fill=ICON_COLOUR, width=SNAKE_ICON_WIDTH)
+        self.preyIcon = self.canvas.create_rectangle(
+            0, 0, 0, 0, fill=ICON_COLOUR, outline=ICON_COLOUR)
+        #display starting score of 0
+        self.score = self.canvas.create_text(
+            scoreTextXLocation, scoreTextYLocation, fill=textColour,
+            text='Your Score: 0', font=("Helvetica","11","bold"))
+        #binding the arrow keys to be able to control the snake
+        for key in ("Left", "Right", "Up", "Down"):
+            self.root.bind(f"<Key-{key}>", session.whenAnArrowKeyIsPressed)
+        self.lastPrey = None
+        self.lastScore = 0
+        self.render(session)
+
+    def render(self, session: Session) -> None:
+        """
+            This method draws the current state of the session, converting its cell coordinates to pixels.
+            It is called by the session after every tick, in the same thread, so it reads the engine directly.
+        """
+        engine = session.engine
+        self.canvas.coords(self.snakeIcon, *snakePoints(engine.snakeCoordinates, SNAKE_ICON_WIDTH))
+        if engine.preyCoordinates != self.lastPrey:
+            self.lastPrey = engine.preyCoordinates
+            self.canvas.coords(self.preyIcon, *preyRectangle(self.lastPrey, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH))
+        if engine.score != self.lastScore:
+            self.lastScore = engine.score
+            self.canvas.itemconfigure(self.score, text=f"Your Score: {self.lastScore}")
+        if not engine.gameNotOver:
+            self.gameOver()
+
+    def gameOver(self) -> None:
+        """
+            This method is used at the end to display a
+            game over button.
+        """
+        gameOverButton = Button(self.canvas, text="Game Over!",
+            height = 3, width = 10, font=("Helvetica","14","bold"),
+            command=self.root.destroy)
+        self.canvas.create_window(200, 100, anchor="nw", window=gameOverButton)
+
+    async def run(self) -> None:
+        """
+            This coroutine processes the pending Tk events every TK_INTERVAL, until the window is closed.
+        """
+        while True:
+            try:
+                self.root.update()
+            except TclError:
+                return # Window Destroyed
+            await asyncio.sleep(TK_INTERVAL)
+
+async def telemetry(sessions: list, interval: float, output = sys.stderr) -> None:
+    """
+        This coroutine writes the metrics of the first session (i.e. the one on screen), the number of sessions
+        still playing, and the CPU usage of the process since the previous line, as a JSON line every interval.
+    """
+    cpu, wall = time.process_time(), time.perf_counter()
+    while True:
+        await asyncio.sleep(interval)
+        now, nowCpu = time.perf_counter(), time.process_time()
+        print(json.dumps({"time": time.time(), "cpu": (nowCpu - cpu) / (now - wall),
+                          "sessions": sum(session.engine.gameNotOver or session.restart for session in sessions),
+                          "ticks": sum(session.scheduler.ticks for session in sessions),
+                          "scheduler": sessions[0].scheduler.toDict(), "input": sessions[0].inputLatency.toDict()}),
+              file = output, flush = True)
+        cpu, wall = nowCpu, now
+
+async def main(args: argparse.Namespace) -> list:
+    """
+        This coroutine plays the game on screen (along with the headless sessions) until the window is closed,
+        and returns the sessions.
+    """
+    autopilot = AutopilotController(args.seed, args.autopilot) if args.autopilot is not None else None
+    session = Session(Engine(WINDOW_WIDTH, WINDOW_HEIGHT, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH, args.seed), autopilot,
+                      speed = args.speed, policy = args.scheduler)
+    gui = Gui(session)
+    session.render = gui.render
+    sessions = [session] + [Session(Engine(WINDOW_WIDTH, WINDOW_HEIGHT, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH, index),
+                                    GreedyController(index), speed = args.speed, restart = True)
+                            for index in range(args.sessions)]
+
+    tasks = [asyncio.create_task(session.play()) for session in sessions]
+    if args.telemetry:
+        tasks.append(asyncio.create_task(telemetry(sessions, args.telemetry)))
+    await gui.run()
+    for task in tasks:
+        task.cancel()
+    return sessions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Play the snake game (asyncio event loop model).")
+    parser.add_argument("--scheduler", choices = POLICIES, default = "catchup", help = "missed tick policy of the game")
+    parser.add_argument("--speed", type = float, default = 0.15, help = "period of the game ticks (sec)")
+    parser.add_argument("--seed", type = int, default = None, help = "seed of the prey generator")
+    parser.add_argument("--autopilot", type = float, nargs = "?", const = 1000, default = None, metavar = "BUDGET",
+        help = "let the autopilot play, with the given planning budget per tick (us, default : 1000)")
+    parser.add_argument("--sessions", type = int, default = 0,
+        help = "number of headless sessions played by greedy bots on the same event loop")
+    parser.add_argument("--telemetry", type = float, default = None, metavar = "INTERVAL",
+        help = "write the metrics to stderr as JSON lines every INTERVAL seconds")
+    parser.add_argument("--metrics", action = "store_true", help = "print the collected metrics on exit")
+    args = parser.parse_args()
+
+    start, startCpu = time.perf_counter(), time.process_time()
+    sessions = asyncio.run(main(args))
+    if args.metrics:
+        print(sessions[0].scheduler.lateness)
+        print(sessions[0].inputLatency)
+        if sessions[0].bot is not None:
+            print(f"{sessions[0].bot.latency} ({sessions[0].bot.overBudget} ticks over budget, {sessions[0].bot.cutShort} plans cut short)")
+        print(f"cpu: {(time.process_time() - startCpu) / (time.perf_counter() - start):.1%}")
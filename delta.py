@@ -0,0 +1,87 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the delta protocol for the render messages of the game.
+
+    Instead of sending the whole snake every tick, the game sends what changed since the previous tick :
+        {"seq": n, "head": (column, row), "tail": True, "prey": (column, row), "score": s}
+    where "tail" indicates whether the tail was removed (i.e. the prey was not captured),
+    and "prey" and "score" are only present if they changed.
+
+    Every keyframeInterval ticks (and for the first message), a keyframe with the full state is sent instead :
+        {"seq": n, "keyframe": True, "snake": [...], "prey": (column, row), "score": s}
+    This lets a receiver (re)synchronize if it started late or missed a message.
+    The coordinates are the cell coordinates of the engine, which the renderer converts to pixels.
+"""
+
+from collections import deque
+
+class DeltaEncoder():
+    '''
+        This class encodes the state of an engine after each tick into delta messages.
+    '''
+    def __init__(self, keyframeInterval: int = 100):
+        """
+            This initializer sets the number of ticks between keyframes.
+        """
+        self.keyframeInterval = keyframeInterval
+        self.seq = 0
+        self.preyCoordinates = None
+        self.score = None
+
+    def encode(self, engine, keyframe: bool = False) -> dict:
+        """
+            This method returns the message for the current state of the engine.
+            It must be called once after every step of the engine.
+            A keyframe can be forced, e.g. after the engine was reset, or a message was not delivered.
+        """
+        seq = self.seq
+        self.seq += 1
+        if keyframe or seq % self.keyframeInterval == 0:
+            return self.keyframe(engine, seq)
+
+        message = {"seq": seq, "head": engine.snakeCoordinates[-1], "tail": not engine.preyCaptured}
+        if engine.preyCoordinates != self.preyCoordinates:
+            self.preyCoordinates = message["prey"] = engine.preyCoordinates
+        if engine.score != self.score:
+            self.score = message["score"] = engine.score
+        return message
+
+    def keyframe(self, engine, seq: int) -> dict:
+        """
+            This method returns a keyframe message with the full state of the engine.
+        """
+        self.preyCoordinates = engine.preyCoordinates
+        self.score = engine.score
+        return {"seq": seq, "keyframe": True, "snake": list(engine.snakeCoordinates),
+                "prey": self.preyCoordinates, "score": self.score}
+
+class DeltaDecoder():
+    '''
+        This class applies delta messages to reconstruct the snake coordinates.
+    '''
+    def __init__(self):
+        """
+            This initializer creates an empty state, which is synchronized by the first keyframe.
+        """
+        self.snakeCoordinates = deque()
+        self.seq = None # No Keyframe Received
+
+    def apply(self, message: dict) -> bool:
+        """
+            This method applies the message to the snake coordinates.
+            It returns False if the message was ignored, i.e. a delta which
+            does not follow the last applied message (waiting for a keyframe).
+        """
+        if "keyframe" in message:
+            self.snakeCoordinates = deque(message["snake"])
+        elif self.seq is None or message["seq"] != self.seq + 1:
+            self.seq = None # Missed Message (Resynchronize on Next Keyframe)
+            return False
+        else:
+            if message["tail"]:
+                self.snakeCoordinates.popleft()
+            self.snakeCoordinates.append(message["head"])
+        self.seq = message["seq"]
+        return True
@@ -0,0 +1,196 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the path finding used by the autopilot (see `AutopilotController` in `controllers.py`).
+
+    The `DistanceField` class keeps the breadth-first search (BFS) distance of every cell of the board to a target
+    cell (i.e. the prey), going around the snake. Instead of recomputing it from scratch every tick, it is updated
+    incrementally as the body moves :
+        A cell freed by the tail can only shorten distances, which are propagated outwards from it.
+        A cell taken by the head can only lengthen the distances which depended on it. Those cells are invalidated
+        (in increasing distance order, so a cell is only invalidated if none of its neighbours still has a smaller
+        distance), then reassigned from their remaining neighbours.
+    Both cases push the changed cells onto a single priority queue, which is drained up to a deadline, so the work
+    can be spread over several ticks on a large board. Every loop checks its deadline on each iteration, so that
+    the planning of a tick overruns its budget by a single step at most. The field is exact whenever the queue is empty, and the
+    distance of a cell is exact as soon as it is not larger than the smallest pending distance.
+
+    Resetting the field for a new target takes constant time, rather than refilling the whole board : the distances
+    of each target (i.e. generation) are stored offset by a base lower than the base of every previous generation by
+    more than the longest distance, so that every distance left over from a previous generation reads as unknown.
+
+    The `canReach()` function checks (up to a deadline) whether the head can still reach a cell, e.g. the tail,
+    with a best-first search towards it.
+"""
+
+import heapq, time
+from array import array
+
+INFINITY = 1 << 30 # Distance of the Cells Which Cannot Reach the Target
+FIRST_BASE = (1 << 30) - 1 # Offset of the Distances Before the First Target (Small Integers Are Faster)
+
+def neighbours(cell: int, columns: int, rows: int) -> list:
+    """
+        This function returns the cells adjacent to the given cell on a board of columns x rows cells.
+    """
+    row, column = divmod(cell, columns)
+    adjacent = []
+    if column > 0:
+        adjacent.append(cell - 1)
+    if column < columns - 1:
+        adjacent.append(cell + 1)
+    if row > 0:
+        adjacent.append(cell - columns)
+    if row < rows - 1:
+        adjacent.append(cell + columns)
+    return adjacent
+
+def canReach(occupied, columns: int, rows: int, start: int, goal: int, deadline: int) -> bool:
+    """
+        This function checks whether the goal cell can be reached from the start cell through the cells
+        which are not occupied (the goal itself may be occupied, e.g. by the tail).
+        The cells closest to the goal (Manhattan distance) are explored first, so that a path across open
+        space is found without exploring the whole region around the start.
+        It returns None if the deadline (time.perf_counter_ns()) passed before the search was complete.
+    """
+    if start == goal:
+        return True
+    clock = time.perf_counter_ns
+    goalRow, goalColumn = divmod(goal, columns)
+    visited = {start}
+    frontier = [(0, start)]
+    while frontier:
+        if clock() > deadline:
+            return None
+        for cell in neighbours(heapq.heappop(frontier)[1], columns, rows):
+            if cell == goal:
+                return True
+            if cell not in visited and not occupied[cell]:
+                visited.add(cell)
+                row, column = divmod(cell, columns)
+                heapq.heappush(frontier, (abs(row - goalRow) + abs(column - goalColumn), cell))
+    return False
+
+class DistanceField():
+    '''
+        This class maintains the BFS distances to a target cell around the occupied cells of a board.
+    '''
+    def __init__(self, columns: int, rows: int, occupied):
+        """
+            This initializer takes the board dimensions and its occupancy grid (e.g. `Body.occupied`),
+            which is read as it changes. The distances are unknown until a target is set.
+        """
+        self.columns = columns
+        self.rows = rows
+        self.occupied = occupied
+        self.span = columns * rows + 1 # Longer Than Any Distance
+        self.base = FIRST_BASE # Offset of the Distances of the Current Target
+        self.infinity = FIRST_BASE # Offset Distances at Least This Large Are Unknown
+        self.distances = array("q", [FIRST_BASE]) * (columns * rows) # Offset Distances
+        self.pending = [] # Heap of (Offset Distance, Cell) to Propagate
+        self.target = -1
+
+    def setTarget(self, cell: int) -> None:
+        """
+            This method resets the field for a new target, whose distances are then propagated by `update()`.
+            The reset only lowers the base of the distances, so that all of them become unknown at once
+            (the distances are only refilled once the base runs out, i.e. the refill is amortized over many resets).
+        """
+        if self.base - self.span < -FIRST_BASE: # Every Few Million Cells of Resets
+            self.distances = array("q", [FIRST_BASE]) * (self.columns * self.rows)
+            self.base = FIRST_BASE
+        self.base -= self.span
+        self.infinity = self.base + self.span
+        self.distances[cell] = self.base
+        self.pending = [(self.base, cell)]
+        self.target = cell
+
+    def distance(self, cell: int) -> int:
+        """
+            This method returns the distance of a cell to the target (INFINITY if it is unknown or unreachable).
+        """
+        distance = self.distances[cell]
+        return distance - self.base if distance < self.infinity else INFINITY
+
+    def free(self, cell: int) -> None:
+        """
+            This method updates the field for a cell which is no longer occupied.
+        """
+        if self.occupied[cell]:
+            return
+        distances = self.distances
+        best = self.base if cell == self.target else min(
+            distances[neighbour] for neighbour in neighbours(cell, self.columns, self.rows)) + 1
+        if best < distances[cell] and best < self.infinity:
+            distances[cell] = best
+            heapq.heappush(self.pending, (best, cell))
+
+    def block(self, cell: int, deadline: int = None) -> None:
+        """
+            This method updates the field for a cell which is now occupied, by invalidating
+            every cell whose distance depended on it, then reassigning them from their neighbours.
+            A distance depends on a cell if it is larger, and no other neighbour has a smaller distance
+            (i.e. while the field is incomplete, a distance may be larger than its neighbour + 1).
+            If the deadline (time.perf_counter_ns()) passes, the field is reset instead, to be rebuilt by `update()`.
+        """
+        distances, infinity = self.distances, self.infinity
+        if distances[cell] >= infinity:
+            return
+        clock = time.perf_counter_ns
+        columns, rows = self.columns, self.rows
+        previous = {cell: distances[cell]} # Distances of the Invalidated Cells
+        distances[cell] = infinity
+        queue = [(previous[cell], cell)]
+        while queue: # In Increasing Distance Order
+            if deadline is not None and clock() > deadline:
+                self.setTarget(self.target)
+                return
+            _, invalidated = heapq.heappop(queue)
+            for neighbour in neighbours(invalidated, columns, rows):
+                distance = distances[neighbour]
+                if distance >= infinity or distance <= previous[invalidated] or neighbour == self.target:
+                    continue
+                if not any(distances[support] < distance for support in neighbours(neighbour, columns, rows)):
+                    previous[neighbour] = distance
+                    distances[neighbour] = infinity
+                    heapq.heappush(queue, (distance, neighbour))
+
+        del previous[cell]
+        reassigned = []
+        for invalidated in previous:
+            if deadline is not None and clock() > deadline:
+                self.setTarget(self.target)
+                return
+            best = min(distances[neighbour] for neighbour in neighbours(invalidated, columns, rows)) + 1
+            if best < infinity:
+                reassigned.append((best, invalidated))
+        for best, invalidated in reassigned:
+            distances[invalidated] = best
+            heapq.heappush(self.pending, (best, invalidated))
+
+    def update(self, deadline: int = None, cells: list = ()) -> bool:
+        """
+            This method propagates the pending changes until the deadline (time.perf_counter_ns()), if any.
+            Since they are propagated in increasing distance order, it stops as soon as the closest of the given
+            cells (if any) is exact, i.e. no pending change can make any of them closer.
+            It returns whether the field is complete (or the closest of the given cells is exact).
+        """
+        pending, distances, occupied = self.pending, self.distances, self.occupied
+        columns, rows = self.columns, self.rows
+        clock = time.perf_counter_ns
+        popped = 0
+        while pending:
+            if deadline is not None and clock() > deadline:
+                return False
+            popped += 1
+            if popped & 15 == 0 and cells and min(distances[cell] for cell in cells) <= pending[0][0]:
+                return True
+            distance, cell = heapq.heappop(pending)
+            if distance != distances[cell] or (occupied[cell] and cell != self.target):
+                continue # Superseded or Blocked
+            for neighbour in neighbours(cell, columns, rows):
+                if distance + 1 < distances[neighbour] and not occupied[neighbour]:
+                    distances[neighbour] = distance + 1
+                    heapq.heappush(pending, (distance + 1, neighbour))
+        return True
@@ -0,0 +1,352 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the headless simulation core of the snake game.
+
+    The `Engine` class owns the entire game state (i.e. snake coordinates, direction, prey and score)
+    and the rules which were previously embedded in the `Game` class. It has no dependency on `tkinter`,
+    so it can be stepped by bots, replays and load tests without creating a window.
+
+    The `Game` classes in `original.py` and `alternative.py` delegate their rules to an `Engine` instance
+    and only take care of the Inter-Process Communication (IPC) with their respective `Gui`.
+
+    The engine works in integer cell coordinates, i.e. (column, row) tuples on a grid of snakeIconWidth cells
+    which tiles the window from its top left corner. The snake moves by one cell per tick, and the prey occupies
+    a single cell, so capturing the prey and hitting a wall are integer comparisons. The conversion to pixel
+    coordinates is only done by the renderers (see `renderer.py`).
+
+    Running this module directly executes the turbo loop and reports the achieved tick rate :
+        python engine.py --ticks 1000000
+"""
+
+import argparse
+import functools, random, time
+from collections import deque
+
+#default constants of the game board (see `original.py` and `alternative.py`)
+WINDOW_WIDTH = 500
+WINDOW_HEIGHT = 300
+SNAKE_ICON_WIDTH = 15
+PREY_ICON_WIDTH = 10
+PREY_MARGIN = 1 # Minimum Number of Cells Between a Prey and the Walls
+
+#starting location of the snake (from tail to head) on the default board, in cell coordinates
+STARTING_CELLS = [(32, 3), (31, 3), (30, 3), (29, 3), (28, 3)]
+
+#smallest board (in cells) on which the snake starts with its head one cell away from the walls, and a free cell left for the prey
+MIN_COLUMNS = 6
+MIN_ROWS = 4
+
+OPPOSITE_DIRECTIONS = {"Left": "Right", "Right": "Left", "Up": "Down", "Down": "Up"}
+
+def startingCells(columns: int, rows: int) -> list:
+    """
+        This function returns the starting location of the snake on a board of columns x rows cells, i.e.
+        STARTING_CELLS shifted towards the top left corner of the board as much as needed to keep its tail on the board
+        and its row one cell away from the bottom wall (so that it is unchanged on the default board).
+        The board must be at least MIN_COLUMNS x MIN_ROWS cells.
+    """
+    columnShift = max(0, STARTING_CELLS[0][0] - (columns - 1))
+    rowShift = max(0, STARTING_CELLS[0][1] - (rows - 2))
+    return [(column - columnShift, row - rowShift) for column, row in STARTING_CELLS]
+
+@functools.lru_cache(maxsize = 16)
+def eligibleCells(columns: int, rows: int, firstColumn: int, lastColumn: int, firstRow: int, lastRow: int) -> tuple:
+    """
+        This function returns the eligibility of every cell of a grid (i.e. whether a prey can be created in it),
+        along with the initial free cells and their positions. It is cached, since the engine creates a new
+        `Body` with the same grid for every game.
+    """
+    eligible = bytearray(columns * rows)
+    free = []
+    freePositions = [-1] * (columns * rows)
+    rowLength = max(0, lastColumn + 1 - firstColumn)
+    for row in range(firstRow, lastRow + 1):
+        start = row * columns + firstColumn
+        eligible[start:start + rowLength] = b"\x01" * rowLength
+        freePositions[start:start + rowLength] = range(len(free), len(free) + rowLength)
+        free.extend(range(start, start + rowLength))
+    return bytes(eligible), tuple(free), tuple(freePositions)
+
+class Body():
+    '''
+        This class stores the snake cells (from tail to head) in a deque,
+        along with an occupancy grid of the board, and an index of the
+        free cells where a prey can be created.
+        Pushing a head, popping a tail, testing a cell and picking a random
+        free cell are constant time operations, regardless of the length of the snake.
+    '''
+    def __init__(self, snakeCoordinates: list, columns: int, rows: int, margin: int = PREY_MARGIN):
+        """
+            This initializer marks the cells of the snake on a grid of columns x rows cells.
+            The free cells are the cells at least margin cells away from the walls which
+            are not occupied. They are kept in a list, along with the position of
+            each cell in that list, so that a cell is added or removed by swapping
+            it with the last one.
+        """
+        self.columns = columns
+        self.rows = rows
+        self.occupied = bytearray(columns * rows) # Number of Snake Points per Cell
+
+        eligible, free, freePositions = eligibleCells(columns, rows, margin, columns - 1 - margin,
+                                                      margin, rows - 1 - margin)
+        self.eligible = eligible # Read Only (Shared Between Bodies)
+        self.free = list(free) # Free Eligible Cells (In No Particular Order)
+        self.freePositions = list(freePositions) # Position of Each Cell in the Free List (or -1)
+
+        self.coordinates = deque(snakeCoordinates)
+        for coordinates in self.coordinates:
+            self.mark(coordinates, 1)
+
+    def cellIndex(self, coordinates: tuple) -> int:
+        """
+            This method returns the index of the grid cell at the given coordinates,
+            or -1 if they are off the grid.
+        """
+        column, row = coordinates
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return row * self.columns + column
+        return -1
+
+    def cellCoordinates(self, index: int) -> tuple:
+        """
+            This method returns the coordinates of the grid cell with the given index.
+        """
+        row, column = divmod(index, self.columns)
+        return (column, row)
+
+    def mark(self, coordinates: tuple, count: int) -> None:
+        """
+            This method adds the count (i.e. 1 or -1) to the occupancy of the cell at the
+            given coordinates, and updates the free cells if the cell became free or occupied.
+        """
+        index = self.cellIndex(coordinates)
+        if index >= 0:
+            occupancy = self.occupied[index] + count
+            self.occupied[index] = occupancy
+            if self.eligible[index]:
+                if occupancy == 0:
+                    self.addFree(index)
+                elif occupancy == count:
+                    self.removeFree(index)
+
+    def addFree(self, index: int) -> None:
+        """
+            This method appends the cell with the given index to the free cells.
+        """
+        self.freePositions[index] = len(self.free)
+        self.free.append(index)
+
+    def removeFree(self, index: int) -> None:
+        """
+            This method removes the cell with the given index from the free cells,
+            by moving the last free cell into its position.
+        """
+        position = self.freePositions[index]
+        last = self.free.pop()
+        if last != index:
+            self.free[position] = last
+            self.freePositions[last] = position
+        self.freePositions[index] = -1
+
+    def setFreeOrder(self, free: list) -> None:
+        """
+            This method reorders the free cells, which must be the same cells as the current ones
+            (e.g. to restore a recorded state, since the order of the free cells determines the prey).
+        """
+        self.free = list(free)
+        for position, index in enumerate(self.free):
+            self.freePositions[index] = position
+
+    def randomFreeCell(self, generator: random.Random) -> tuple:
+        """
+            This method returns the coordinates of a free cell picked uniformly at random,
+            or None if every cell is occupied.
+        """
+        if not self.free:
+            return None
+        return self.cellCoordinates(self.free[generator.randrange(len(self.free))])
+
+    def isOccupied(self, coordinates: tuple) -> bool:
+        """
+            This method checks if any part of the snake is at the given coordinates.
+        """
+        index = self.cellIndex(coordinates)
+        return index >= 0 and self.occupied[index] > 0
+
+    def pushHead(self, coordinates: tuple) -> None:
+        """
+            This method appends a new head to the snake.
+        """
+        self.coordinates.append(coordinates)
+        self.mark(coordinates, 1)
+
+    def popTail(self) -> tuple:
+        """
+            This method removes and returns the tail of the snake.
+        """
+        coordinates = self.coordinates.popleft()
+        self.mark(coordinates, -1)
+        return coordinates
+
+class Engine():
+    '''
+        This class implements the game state and rules without any gui.
+    '''
+    def __init__(self, width: int = WINDOW_WIDTH, height: int = WINDOW_HEIGHT,
+                 snakeIconWidth: int = SNAKE_ICON_WIDTH, preyIconWidth: int = PREY_ICON_WIDTH,
+                 seed = None):
+        """
+            This initializer sets the board dimensions (i.e. the window dimensions
+            in pixels, divided into cells of snakeIconWidth pixels) and the random
+            number generator used for prey placement, then resets the game state.
+            Providing a seed makes the game fully deterministic for a given
+            sequence of directions.
+        """
+        self.width = width
+        self.height = height
+        self.snakeIconWidth = snakeIconWidth
+        self.preyIconWidth = preyIconWidth
+        self.columns = width // snakeIconWidth
+        self.rows = height // snakeIconWidth
+        self.random = random.Random(seed)
+        self.reset()
+
+    def reset(self, snakeCoordinates: list = None, direction: str = "Left") -> None:
+        """
+            This method sets the initial snake coordinate list, movement
+            direction and score, and creates the first prey.
+            The snake coordinates are ordered from tail to head, and
+            stored as the deque of a `Body` instance.
+        """
+        #starting length and location of the snake
+        #note that it is a list of tuples, each being a
+        # (column, row) tuple. Initially its size is 5 tuples.
+        if snakeCoordinates is None:
+            snakeCoordinates = startingCells(self.columns, self.rows)
+        self.body = Body(snakeCoordinates, self.columns, self.rows)
+        self.snakeCoordinates = self.body.coordinates
+        self.direction = direction
+        self.score = 0
+        self.tick = 0
+        self.gameNotOver = True
+        self.deathCause = None
+        self.preyCaptured = False
+        self.createNewPrey()
+
+    def step(self, direction: str = None) -> bool:
+        """
+            This method advances the game by a single tick.
+            The optional direction is applied first, unless it would
+            reverse the snake onto itself.
+            It returns whether the game is still in progress. The
+            preyCaptured field indicates whether the prey was captured
+            (and a new one created) during this tick.
+        """
+        if not self.gameNotOver:
+            return False
+        if direction is not None and direction != OPPOSITE_DIRECTIONS[self.direction]:
+            self.direction = direction
+
+        newCoordinates = self.calculateNewCoordinates()
+        self.preyCaptured = self.isCaptured(newCoordinates)
+        if self.preyCaptured:
+            self.score += 1
+        else:
+            self.body.popTail() # Move Snake
+        self.isGameOver(newCoordinates)
+        self.body.pushHead(newCoordinates) # Append New Snake Head
+        if self.preyCaptured:
+            self.createNewPrey() # Once the New Head Occupies Its Cell
+        self.tick += 1
+        return self.gameNotOver
+
+    def turbo(self, ticks: int, controller = None) -> int:
+        """
+            This method runs the game for the given number of ticks
+            as fast as possible, resetting the game whenever it is over.
+            The optional controller is called with the engine before
+            every tick and returns a direction (or None to keep going).
+            It returns the number of games which were completed.
+        """
+        step = self.step
+        reset = self.reset
+        gamesCompleted = 0
+        for _ in range(ticks):
+            if not step(controller(self) if controller else None):
+                gamesCompleted += 1
+                reset()
+        return gamesCompleted
+
+    def calculateNewCoordinates(self) -> tuple:
+        """
+            This method calculates and returns the new
+            coordinates to be added to the snake
+            coordinates list based on the movement
+            direction and the current coordinate of
+            head of the snake.
+        """
+        lastColumn, lastRow = self.snakeCoordinates[-1]
+        if self.direction == "Left":
+            lastColumn -= 1
+        elif self.direction == "Right":
+            lastColumn += 1
+        elif self.direction == "Up":
+            lastRow -= 1
+        else:
+            lastRow += 1
+        return (lastColumn, lastRow)
+
+    def isCaptured(self, snakeCoordinates: tuple) -> bool:
+        """
+            This method checks if the snake head at the given coordinates
+            is on the cell of the prey.
+        """
+        return snakeCoordinates == self.preyCoordinates
+
+    def isGameOver(self, snakeCoordinates: tuple) -> None:
+        """
+            This method checks if the game is over by
+            checking if now the snake has passed any wall
+            or if it has bit itself (i.e. the new head is on a cell
+            which is still occupied after the tail has moved).
+            If that is the case, it updates the gameNotOver field and
+            the deathCause field (i.e. "wall" or "self").
+        """
+        column, row = snakeCoordinates
+
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            self.gameNotOver = False
+            self.deathCause = "wall"
+        elif self.body.isOccupied(snakeCoordinates):
+            self.gameNotOver = False
+            self.deathCause = "self"
+
+    def createNewPrey(self) -> None:
+        """
+            This methods picks a free cell of the body uniformly at random
+            as the coordinates of the new prey, which are stored in the
+            preyCoordinates field, so the prey never lands on the snake.
+            To make playing the game easier, the cell is PREY_MARGIN
+            cells away from the walls.
+            If there is no free cell left (i.e. the snake fills the board),
+            the game is over and the prey is put off the board.
+        """
+        self.preyCoordinates: tuple = self.body.randomFreeCell(self.random)
+        if self.preyCoordinates is None:
+            self.gameNotOver = False
+            self.deathCause = "full"
+            self.preyCoordinates = (-1, -1) # Off the Board
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run the headless snake engine in its turbo loop.")
+    parser.add_argument("--ticks", type = int, default = 1000000, help = "number of ticks to simulate")
+    parser.add_argument("--seed", type = int, default = None, help = "seed of the prey generator")
+    args = parser.parse_args()
+
+    engine = Engine(seed = args.seed)
+    start = time.perf_counter()
+    games = engine.turbo(args.ticks)
+    elapsed = time.perf_counter() - start
+    print(f"{args.ticks} ticks ({games} games) in {elapsed:.3f} s : {args.ticks / elapsed:,.0f} ticks/sec")
@@ -0,0 +1,66 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the input queue of the arrow keys, from the gui thread to the game thread.
+
+    When the key binding sets the direction of the game directly, a key press is lost whenever two keys are pressed
+    within the same tick (e.g. Up then Left while going Right : only Left reaches the engine, which ignores it since
+    it would reverse the snake). The `InputRing` class instead queues every key press, along with the time it
+    was pressed, and the game consumes them at tick boundaries, i.e. one direction change per tick. Each press is
+    checked against the direction of the tick which applies it (not the direction when it was pressed), so a press
+    which would not change the direction, or would reverse the snake, is skipped in favour of the next one.
+
+    The ring has a single producer (the gui thread) and a single consumer (the game thread), each of which only writes
+    its own counter, so no lock is needed : the producer stores the event into its slot before publishing it by
+    advancing its counter (each of these stores is atomic under the GIL). When the ring is full, the newest press is
+    dropped (and counted), since the producer cannot overwrite a slot which the consumer has not read yet.
+"""
+
+import time
+
+from engine import OPPOSITE_DIRECTIONS
+
+class InputRing():
+    '''
+        This class implements a bounded single-producer, single-consumer ring buffer of key presses.
+    '''
+    def __init__(self, capacity: int = 8):
+        """
+            This initializer sets the number of key presses which can be pending (i.e. pressed ahead of the ticks).
+        """
+        self.capacity = capacity
+        self.slots = [None] * capacity # (Direction, Time Pressed)
+        self.pushed = 0 # Only Written by the Producer
+        self.popped = 0 # Only Written by the Consumer
+        self.dropped = 0 # Only Written by the Producer
+
+    def __len__(self) -> int:
+        """
+            The number of pending key presses.
+        """
+        return self.pushed - self.popped
+
+    def push(self, direction: str, pressedAt: float = None) -> bool:
+        """
+            This method queues a key press (by default, pressed now, i.e. time.perf_counter()).
+            It returns False if the ring is full, in which case the key press is dropped.
+        """
+        if self.pushed - self.popped >= self.capacity:
+            self.dropped += 1
+            return False
+        self.slots[self.pushed % self.capacity] = (direction, pressedAt if pressedAt is not None else time.perf_counter())
+        self.pushed += 1 # Publish the Slot
+        return True
+
+    def pop(self, direction: str) -> tuple:
+        """
+            This method returns the first pending key press (direction, time pressed) which changes the given
+            direction without reversing it, skipping the others, or None if there is none.
+        """
+        while self.popped < self.pushed:
+            event = self.slots[self.popped % self.capacity]
+            self.popped += 1 # Release the Slot
+            if event[0] in OPPOSITE_DIRECTIONS and event[0] != direction and event[0] != OPPOSITE_DIRECTIONS[direction]:
+                return event
+        return None
@@ -0,0 +1,190 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the optional contention instrumentation of the `Game.locks` and `Game.full` dicts
+    in `alternative.py`.
+
+    The `instrument()` function wraps every lock in an `InstrumentedLock`, which records how long each acquisition
+    waited and how long the lock was then held, along with how many acquisitions found it already held (i.e. contention).
+    It also wraps every semaphore in an `InstrumentedSemaphore`, which tracks its backlog (i.e. values produced by the
+    game which the gui has not consumed yet), from the values it counts as they are produced and consumed.
+    Since the statistics are updated by both the game and gui threads, each wrapper updates them under its own
+    internal lock, which is only held for the update (never while waiting for the wrapped lock or semaphore).
+    Since the dicts are only wrapped when instrumentation is enabled, there is no overhead otherwise.
+
+    The statistics can be dumped periodically as JSON lines by a `StatsDumper` thread.
+"""
+
+import json, sys, threading, time
+
+from metrics import Histogram
+
+class InstrumentedLock():
+    '''
+        This class wraps a lock to record its wait time, hold time and contention.
+    '''
+    def __init__(self, name: str, lock = None):
+        """
+            This initializer wraps the given lock (or a new one).
+        """
+        self.name = name
+        self.lock = lock if lock is not None else threading.Lock()
+        self.wait = Histogram(f"{name} wait")
+        self.hold = Histogram(f"{name} hold")
+        self.acquisitions = 0 # Number of Attempts
+        self.contentions = 0 # Number of Attempts Which Found the Lock Held
+        self.acquiredAt = 0.0 # Only Written by the Holder
+        self.statsLock = threading.Lock() # Protects the Statistics
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        """
+            This method acquires the lock (with the same arguments as threading.Lock),
+            recording how long it waited if the lock was held.
+        """
+        waited = 0.0
+        acquired = self.lock.acquire(blocking = False)
+        contended = not acquired
+        if contended and blocking:
+            start = time.perf_counter()
+            acquired = self.lock.acquire(timeout = timeout)
+            waited = time.perf_counter() - start
+        with self.statsLock: # Critical Section
+            self.acquisitions += 1
+            if contended:
+                self.contentions += 1
+            if acquired:
+                self.wait.record(waited)
+        if acquired:
+            self.acquiredAt = time.perf_counter()
+        return acquired
+
+    def release(self) -> None:
+        """
+            This method records how long the lock was held, then releases it.
+        """
+        held = time.perf_counter() - self.acquiredAt
+        self.lock.release()
+        with self.statsLock: # Critical Section
+            self.hold.record(held)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.release()
+
+    def toDict(self) -> dict:
+        """
+            This method returns the statistics of the lock which can be serialized as JSON.
+        """
+        with self.statsLock: # Critical Section
+            return {"acquisitions": self.acquisitions, "contentions": self.contentions,
+                    "wait": self.wait.toDict(), "hold": self.hold.toDict()}
+
+class InstrumentedSemaphore():
+    '''
+        This class wraps a semaphore to record its backlog of produced values.
+    '''
+    def __init__(self, name: str, semaphore = None):
+        """
+            This initializer wraps the given semaphore (or a new one with a value of 0).
+            Any value already produced counts towards the backlog : it is counted by consuming
+            every value, then producing them again (before any thread uses the semaphore).
+        """
+        self.name = name
+        self.semaphore = semaphore if semaphore is not None else threading.Semaphore(value = 0)
+        self.wait = Histogram(f"{name} wait")
+        self.acquisitions = 0 # Number of Attempts
+        self.consumed = 0
+        self.produced = 0
+        while self.semaphore.acquire(blocking = False):
+            self.produced += 1
+        for _ in range(self.produced):
+            self.semaphore.release()
+        self.maxBacklog = self.produced
+        self.statsLock = threading.Lock() # Protects the Statistics
+
+    def acquire(self, blocking: bool = True, timeout: float = None) -> bool:
+        """
+            This method acquires the semaphore (with the same arguments as threading.Semaphore),
+            recording how long it waited when it succeeds.
+        """
+        start = time.perf_counter()
+        acquired = self.semaphore.acquire(blocking, timeout)
+        waited = time.perf_counter() - start
+        with self.statsLock: # Critical Section
+            self.acquisitions += 1
+            if acquired:
+                self.wait.record(waited)
+                self.consumed += 1
+        return acquired
+
+    def release(self) -> None:
+        """
+            This method releases the semaphore (i.e. produces a value) and updates the backlog.
+        """
+        with self.statsLock: # Critical Section (Counted Before the Value Can Be Consumed)
+            self.produced += 1
+            self.maxBacklog = max(self.maxBacklog, self.produced - self.consumed)
+        self.semaphore.release()
+
+    @property
+    def backlog(self) -> int:
+        """
+            The number of produced values which have not been consumed.
+        """
+        return self.produced - self.consumed
+
+    def toDict(self) -> dict:
+        """
+            This method returns the statistics of the semaphore which can be serialized as JSON.
+        """
+        with self.statsLock: # Critical Section
+            return {"acquisitions": self.acquisitions, "produced": self.produced, "consumed": self.consumed,
+                    "backlog": self.produced - self.consumed, "maxBacklog": self.maxBacklog, "wait": self.wait.toDict()}
+
+def instrument(game) -> None:
+    """
+        This function wraps the locks and full semaphores of the game.
+        It must be called before the game and gui threads use them.
+    """
+    game.locks = {name: InstrumentedLock(name, lock) for name, lock in game.locks.items()}
+    game.full = {name: InstrumentedSemaphore(name, semaphore) for name, semaphore in game.full.items()}
+
+def stats(game) -> dict:
+    """
+        This function returns the statistics of every instrumented lock and semaphore of the game.
+    """
+    return {
+        "locks": {name: lock.toDict() for name, lock in game.locks.items()},
+        "full": {name: semaphore.toDict() for name, semaphore in game.full.items()},
+    }
+
+class StatsDumper(threading.Thread):
+    '''
+        This class implements a daemon thread which periodically dumps the statistics of an instrumented game.
+    '''
+    def __init__(self, game, interval: float, output = sys.stderr):
+        """
+            This initializer sets the game, the interval between dumps (sec) and the output stream.
+        """
+        super().__init__(daemon = True)
+        self.game = game
+        self.interval = interval
+        self.output = output
+
+    def run(self) -> None:
+        """
+            This method writes the statistics as a JSON line every interval.
+        """
+        while True:
+            time.sleep(self.interval)
+            self.dump()
+
+    def dump(self) -> None:
+        """
+            This method writes the current statistics as a JSON line.
+        """
+        print(json.dumps({"time": time.time(), **stats(self.game)}), file = self.output, flush = True)
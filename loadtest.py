@@ -0,0 +1,173 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This program runs a load test of the game server (see `server.py`) entirely over localhost.
+
+    For each number of sessions (in increasing order), it connects clients until the server hosts that many sessions.
+    Each client plays as a random gamer would (i.e. sends a direction change after some of its frames), and only
+    counts the frames it receives instead of decoding them, so that the clients stay cheap next to the server.
+    After a warm-up, a window of ticks is measured : its metrics (i.e. the tick-deadline misses, the duration and
+    lateness of the ticks) are requested from the server by a control connection, which is one of the sessions.
+    By default, the server is started in a child process (so that the clients do not share its GIL) :
+        python loadtest.py --sessions 100,1000,2000,5000
+    The clients can also connect to a server which is already running (with --restart, so that the sessions last) :
+        python loadtest.py --connect --port 8765
+"""
+
+import argparse
+import asyncio, json, platform, random, time
+from multiprocessing import Pipe, Process
+from types import SimpleNamespace
+
+from scheduler import POLICIES
+from server import encodeLine, runServer
+
+DIRECTION_LINES = [encodeLine({"direction": direction}) for direction in ("Left", "Right", "Up", "Down")]
+CONNECT_BATCH = 100 # Number of Connections Opened Concurrently
+
+class LoadClient(asyncio.Protocol):
+    '''
+        This class implements a client which plays its session at random.
+    '''
+    def __init__(self, generator: random.Random, turnProbability: float, counters: SimpleNamespace):
+        """
+            This initializer takes the random generator of the clients, the probability of a direction change
+            after each frame, and the counters shared by the clients.
+        """
+        self.random = generator
+        self.turnProbability = turnProbability
+        self.counters = counters
+        self.transport = None
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        """
+            This method keeps the transport of the connection.
+        """
+        self.transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        """
+            This method counts the frames received, and may send a direction change.
+        """
+        frames = data.count(b"\n")
+        self.counters.frames += frames
+        if frames and self.random.random() < self.turnProbability:
+            self.transport.write(self.random.choice(DIRECTION_LINES))
+
+    def connection_lost(self, exc: Exception) -> None:
+        """
+            This method counts the connections closed by the server (e.g. game over without --restart).
+        """
+        self.counters.lost += 1
+
+class ControlClient(LoadClient):
+    '''
+        This class implements the client which also requests the metrics of the server.
+    '''
+    def __init__(self, generator: random.Random, turnProbability: float, counters: SimpleNamespace):
+        """
+            This initializer sets the futures of the session parameters and of the pending metrics request.
+        """
+        super().__init__(generator, turnProbability, counters)
+        loop = asyncio.get_running_loop()
+        self.hello = loop.create_future()
+        self.pending = None
+        self.buffer = b""
+
+    def data_received(self, data: bytes) -> None:
+        """
+            This method counts the frames received, and resolves the futures of the
+            session parameters (i.e. the first line) and of the metrics.
+        """
+        super().data_received(data)
+        *lines, self.buffer = (self.buffer + data).split(b"\n")
+        for line in lines:
+            if not self.hello.done():
+                self.hello.set_result(json.loads(line))
+            elif line.startswith(b'{"stats"') and self.pending is not None:
+                self.pending.set_result(json.loads(line)["stats"])
+                self.pending = None
+
+    async def stats(self, reset: bool = False) -> dict:
+        """
+            This coroutine returns the metrics of the current window of the server, then starts a new window if requested.
+        """
+        self.pending = asyncio.get_running_loop().create_future()
+        self.transport.write(encodeLine({"stats": True, "reset": reset}))
+        return await self.pending
+
+async def loadTest(args: argparse.Namespace, host: str, port: int) -> list:
+    """
+        This coroutine ramps the number of sessions up, measuring a window of ticks for each of args.sessions.
+    """
+    loop = asyncio.get_running_loop()
+    generator = random.Random(args.seed)
+    counters = SimpleNamespace(frames = 0, lost = 0)
+    def connect(protocol):
+        if args.unix:
+            return loop.create_unix_connection(protocol, args.unix)
+        return loop.create_connection(protocol, host, port)
+
+    _, control = await connect(lambda: ControlClient(generator, args.turn, counters))
+    period = (await control.hello)["period"]
+    clients = [control]
+    results = []
+    for count in sorted(args.sessions):
+        while len(clients) < count:
+            connections = await asyncio.gather(*(connect(lambda: LoadClient(generator, args.turn, counters))
+                                                 for _ in range(min(CONNECT_BATCH, count - len(clients)))))
+            clients.extend(client for _, client in connections)
+        await asyncio.sleep(args.warmup * period)
+        await control.stats(reset = True)
+        frames, start = counters.frames, time.perf_counter()
+        await asyncio.sleep(args.ticks * period)
+        stats = await control.stats(reset = True)
+        elapsed = time.perf_counter() - start
+
+        result = {**stats, "missRate": stats["missed"] / max(stats["ticks"], 1),
+                  "framesReceivedPerSec": (counters.frames - frames) / elapsed, "connectionsLost": counters.lost}
+        results.append(result)
+        print(f"{stats['sessions']:>6} sessions : {stats['ticks']:>4} ticks, {stats['missed']:>4} missed "
+              f"({result['missRate']:6.1%}), tick p50<={stats['tick']['p50_us'] / 1e3:.1f}ms "
+              f"p99<={stats['tick']['p99_us'] / 1e3:.1f}ms, lateness p99<={stats['lateness']['p99_us'] / 1e3:.1f}ms, "
+              f"{result['framesReceivedPerSec']:>8.0f} frames/sec received, {stats['framesDropped']} dropped", flush = True)
+    for client in clients:
+        client.transport.close()
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run a load test of the snake game server over localhost.")
+    parser.add_argument("--sessions", type = lambda counts: [int(count) for count in counts.split(",")],
+        default = [100, 500, 1000, 2000], help = "comma-separated numbers of concurrent sessions")
+    parser.add_argument("--ticks", type = int, default = 50, help = "number of measured ticks per number of sessions")
+    parser.add_argument("--warmup", type = int, default = 10, help = "number of ticks before each measure")
+    parser.add_argument("--turn", type = float, default = 0.05, help = "probability of a direction change after each frame")
+    parser.add_argument("--connect", action = "store_true", help = "connect to a running server instead of starting one")
+    parser.add_argument("--host", default = "127.0.0.1", help = "address of the server")
+    parser.add_argument("--port", type = int, default = 0, help = "TCP port of the server (any free port if it is started)")
+    parser.add_argument("--unix", default = None, metavar = "PATH", help = "Unix socket of the server instead of TCP")
+    parser.add_argument("--speed", type = float, default = 0.15, help = "period of the ticks of the started server (sec)")
+    parser.add_argument("--scheduler", choices = POLICIES, default = "catchup", help = "missed tick policy of the started server")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the server and of the clients")
+    parser.add_argument("--report", default = None, help = "path of the JSON report to write")
+    args = parser.parse_args()
+
+    port = args.port
+    if not args.connect:
+        address, sender = Pipe(duplex = False)
+        serverProcess = Process(target = runServer, daemon = True,
+            args = (args.host, args.port, args.unix, args.speed, args.scheduler, True, args.seed, sender.send))
+        serverProcess.start()
+        boundAddress = address.recv() # Once Listening
+        port = boundAddress[1] if not args.unix else None
+    try:
+        results = asyncio.run(loadTest(args, args.host, port))
+    finally:
+        if not args.connect:
+            serverProcess.terminate()
+            serverProcess.join()
+    if args.report:
+        with open(args.report, "w") as report:
+            json.dump({"benchmark": "loadtest", "arguments": vars(args), "python": platform.python_version(),
+                       "platform": platform.platform(), "time": time.time(), "results": results}, report, indent = 2)
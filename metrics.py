@@ -0,0 +1,86 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the metrics shared by the game loops and the benchmarks.
+
+    The `Histogram` class aggregates durations (in seconds) into logarithmic buckets
+    of microseconds, so recording a sample is constant time and memory is bounded
+    regardless of how long the game runs.
+"""
+
+import bisect
+
+#upper bounds of the buckets (us), i.e. 1, 2, 4, ..., ~67 s
+BUCKET_BOUNDS = [2 ** exponent for exponent in range(27)]
+
+class Histogram():
+    '''
+        This class implements a histogram of durations with logarithmic buckets.
+    '''
+    def __init__(self, name: str = ""):
+        """
+            This initializer creates the empty buckets. The last bucket
+            counts every sample above the largest bound.
+        """
+        self.name = name
+        self.reset()
+
+    def reset(self) -> None:
+        """
+            This method clears all of the recorded samples.
+        """
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, seconds: float) -> None:
+        """
+            This method records a single duration (in seconds).
+            Negative durations (e.g. a tick which was early) fall in the first bucket.
+        """
+        microseconds = seconds * 1e6
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, microseconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def percentile(self, percent: float) -> float:
+        """
+            This method returns an upper bound (in seconds) of the given percentile,
+            i.e. the bound of the bucket which contains it.
+        """
+        if not self.count:
+            return 0.0
+        threshold = self.count * percent / 100
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= threshold:
+                return min(BUCKET_BOUNDS[index] / 1e6, self.maximum) if index < len(BUCKET_BOUNDS) else self.maximum
+        return self.maximum
+
+    def toDict(self) -> dict:
+        """
+            This method returns a summary of the histogram which can be serialized as JSON.
+            The buckets are keyed by their upper bound (us).
+        """
+        return {
+            "name": self.name,
+            "count": self.count,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "p50_us": self.percentile(50) * 1e6,
+            "p99_us": self.percentile(99) * 1e6,
+            "max_us": self.maximum * 1e6,
+            "buckets_us": {
+                (str(BUCKET_BOUNDS[index]) if index < len(BUCKET_BOUNDS) else "inf"): count
+                for index, count in enumerate(self.counts) if count
+            },
+        }
+
+    def __str__(self) -> str:
+        summary = self.toDict()
+        return (f"{self.name}: n={summary['count']} mean={summary['mean_us']:.0f}us "
+                f"p50<={summary['p50_us']:.0f}us p99<={summary['p99_us']:.0f}us max={summary['max_us']:.0f}us")
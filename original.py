@@ -6,20 +6,39 @@
     game (https://en.wikipedia.org/wiki/Snake_(video_game_genre))
 """
 
+import argparse
 import threading
 import queue        #the thread-safe queue from Python standard library
 
 from tkinter import Tk, Canvas, Button
 import random, time
+from collections import deque
+
+from channel import BACKPRESSURE_POLICIES, CoalescingChannel
+from controllers import AutopilotController
+from delta import DeltaEncoder
+from engine import Engine, WINDOW_WIDTH, WINDOW_HEIGHT, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH, MIN_COLUMNS, MIN_ROWS
+from inputs import InputRing
+from metrics import Histogram
+from profiler import Profiler, noLap
+from replay import SEED_LIMIT, ReplayWriter
+from renderer import CellRenderer, SegmentRenderer, preyRectangle, snakePoints
+from scheduler import POLICIES, Scheduler
+from wakeup import Notifier
+
+#some constants for our GUI (the board dimensions are those of the engine)
+BACKGROUND_COLOUR = "black"   #you may change this colour if you wish
+ICON_COLOUR = "blue"        #you may change this colour if you wish
 
 class Gui():
     """
         This class takes care of the game's graphic user interface (gui)
         creation and termination.
     """
-    def __init__(self):
+    def __init__(self, game: "Game"):
         """
-            The initializer instantiates the main window and
+            The initializer instantiates the main window (with the
+            dimensions of the board of the game) and
             creates the starting icons for the snake and the prey,
             and displays the initial gamer score.
         """
@@ -27,14 +46,16 @@ class Gui():
         scoreTextXLocation = 60
         scoreTextYLocation = 15
         textColour = "white"
+        self.snakeIconWidth = game.engine.snakeIconWidth
+        self.preyIconWidth = game.engine.preyIconWidth
         #instantiate and create gui
         self.root = Tk()
-        self.canvas = Canvas(self.root, width = WINDOW_WIDTH,
-            height = WINDOW_HEIGHT, bg = BACKGROUND_COLOUR)
+        self.canvas = Canvas(self.root, width = game.engine.width,
+            height = game.engine.height, bg = BACKGROUND_COLOUR)
         self.canvas.pack()
         #create starting game icons for snake and the prey
         self.snakeIcon = self.canvas.create_line(
-            (0, 0), (0, 0), fill=ICON_COLOUR, width=SNAKE_ICON_WIDTH)
+            (0, 0), (0, 0), fill=ICON_COLOUR, width=self.snakeIconWidth)
         self.preyIcon = self.canvas.create_rectangle(
             0, 0, 0, 0, fill=ICON_COLOUR, outline=ICON_COLOUR)
         #display starting score of 0
@@ -59,9 +80,24 @@ class QueueHandler():
     """
         This class implements the queue handler for the game.
     """
-    def __init__(self):
-        self.queue = gameQueue
+    def __init__(self, game: "Game", gui: Gui, renderer: SegmentRenderer = None, notifier: Notifier = None,
+                 profiler: Profiler = None):
+        """
+            The handler takes the tasks of the game's queue to the gui.
+            The renderer is required to handle "delta" tasks. If it is a
+            `CellRenderer`, it also draws the "move" tasks instead of the polyline.
+            If a notifier is provided, the queue is handled whenever the
+            game notifies the gui, instead of polling it every 100 ms.
+            If a profiler is provided, the handling of each task is timed.
+        """
+        self.queue = game.queue
         self.gui = gui
+        self.renderer = renderer
+        self.notifier = notifier
+        self.latency = Histogram("move to canvas")
+        self.lap = profiler.timer("gui").lap if profiler is not None else noLap
+        if self.notifier is not None:
+            self.notifier.attach(self.gui.root, self.queueHandler)
         self.queueHandler()
 
     def queueHandler(self) -> None:
@@ -69,58 +105,110 @@ class QueueHandler():
             This method handles the queue by constantly retrieving
             tasks from it and accordingly taking the corresponding
             action.
-            A task could be: game_over, move, prey, score.
+            A task could be: game_over, move, prey, score, delta.
             Each item in the queue is a dictionary whose key is
             the task type (for example, "move") and its value is
-            the corresponding task value.
+            the corresponding task value, in the cell coordinates of
+            the engine (which are converted to pixels here).
             If the queue.empty exception happens, it schedules
-            to call itself after a short delay.
+            to call itself after a short delay (unless it is
+            called by the notifier).
+            The latency from the move() of the game to the canvas
+            update is recorded for "move" and "delta" tasks.
         '''
+        gui = self.gui
         try:
             while True:
                 task = self.queue.get_nowait()
+                self.lap() # Start of the Task
                 if "game_over" in task:
                     gui.gameOver()
                 elif "move" in task:
-                    points = [x for point in task["move"] for x in point]
-                    gui.canvas.coords(gui.snakeIcon, *points)
+                    if self.renderer is not None:
+                        self.renderer.draw(task["move"])
+                    else:
+                        points = snakePoints(task["move"], gui.snakeIconWidth)
+                        gui.canvas.coords(gui.snakeIcon, *points)
+                    self.latency.record(time.perf_counter() - task["time"])
                 elif "prey" in task:
-                    gui.canvas.coords(gui.preyIcon, *task["prey"])
+                    gui.canvas.coords(gui.preyIcon, *preyRectangle(task["prey"], gui.snakeIconWidth, gui.preyIconWidth))
                 elif "score" in task:
                     gui.canvas.itemconfigure(
                         gui.score, text=f"Your Score: {task['score']}")
+                elif "delta" in task:
+                    self.renderer.apply(task["delta"])
+                    self.latency.record(time.perf_counter() - task["time"])
+                self.lap(next(iter(task))) # Task Type (i.e. First Key)
                 self.queue.task_done()
         except queue.Empty:
-            gui.root.after(100, self.queueHandler)
+            if self.notifier is None:
+                gui.root.after(100, self.queueHandler)
+
 class Game():
     '''
         This class implements most of the game functionalities.
+        The game state and rules are delegated to a headless `Engine`,
+        while this class generates the tasks for the queue handler.
     '''
-    def __init__(self):
+    def __init__(self, encoder: DeltaEncoder = None, notifier: Notifier = None,
+                 seed: int = None, recordPath: str = None, autopilot: AutopilotController = None,
+                 profiler: Profiler = None, gameQueue: queue.Queue = None,
+                 width: int = WINDOW_WIDTH, height: int = WINDOW_HEIGHT):
         """
-           This initializer sets the initial snake coordinate list, movement
-           direction, and arranges for the first prey to be created.
+           This initializer creates the engine (on a board of width x height pixels),
+           which sets the initial snake coordinate list, movement direction, and the first prey.
+           The tasks are put into the given queue (or any object with the same interface,
+           e.g. a `CoalescingChannel`), or a new one, which the queue handler reads.
+           If an encoder is provided, the game generates "delta" tasks
+           instead of the "move", "prey" and "score" tasks.
+           If a notifier is provided, the gui is notified after every move.
+           If a record path is provided, the session is recorded into a replay file,
+           which requires the seed of the prey generator.
+           If an autopilot is provided, it presses the arrow keys before every move.
+           If a profiler is provided, the phases of every move (and of the engine) are timed.
         """
-        self.queue = gameQueue
+        self.queue = gameQueue if gameQueue is not None else queue.Queue()
+        self.engine = Engine(width, height,
+                             SNAKE_ICON_WIDTH, PREY_ICON_WIDTH, seed)
+        self.recorder = ReplayWriter(recordPath, self.engine, seed) if recordPath else None
+        self.autopilot = autopilot
+        self.lap = profiler.timer("move").lap if profiler is not None else noLap
+        if profiler is not None:
+            profiler.profileEngine(self.engine)
+        self.encoder = encoder
+        self.notifier = notifier
         self.score = 0
-        #starting length and location of the snake
-        #note that it is a list of tuples, each being an
-        # (x, y) tuple. Initially its size is 5 tuples.
-        self.snakeCoordinates = [(495, 55), (485, 55), (475, 55),
-                                 (465, 55), (455, 55)]
-        #initial direction of the snake
+        #initial direction of the snake, and the arrow keys pressed since the last move
         self.direction = "Left"
+        self.inputs = InputRing()
+        self.inputLatency = Histogram("key to move")
         self.gameNotOver = True
-        self.createNewPrey()
+        if self.encoder is not None:
+            self.queue.put({"delta" : self.encoder.encode(self.engine), "time" : time.perf_counter()}) # Keyframe
+        else:
+            self.queue.put({"prey" : self.engine.preyCoordinates})
+
+    @property
+    def snakeCoordinates(self) -> deque:
+        """
+            The snake coordinates (from tail to head) owned by the engine.
+        """
+        return self.engine.snakeCoordinates
 
-    def superloop(self) -> None:
+    def superloop(self, scheduler: Scheduler = None) -> None:
         """
             This method implements a main loop
             of the game. It constantly generates "move"
             tasks to cause the constant movement of the snake.
             Use the SPEED constant to set how often the move tasks
             are generated.
+            If a scheduler is provided, the moves are instead generated
+            on its drift-free fixed timestep.
         """
+        if scheduler is not None:
+            scheduler.run(self.move, lambda: self.gameNotOver)
+            return
+
         SPEED = 0.15     #speed of snake updates (sec)
         while self.gameNotOver:
             #complete the method implementation below
@@ -131,156 +219,174 @@ class Game():
         """
             This method is bound to the arrow keys
             and is called when one of those is clicked.
-            It sets the movement direction based on
-            the key that was pressed by the gamer.
-            Use as is.
+            It queues the key that was pressed by the gamer
+            (with the time it was pressed), which sets the
+            movement direction at the start of a later move
+            (see `applyInput()`), so that no key press is lost.
         """
-        currentDirection = self.direction
-        #ignore invalid keys
-        if (currentDirection == "Left" and e.keysym == "Right" or
-            currentDirection == "Right" and e.keysym == "Left" or
-            currentDirection == "Up" and e.keysym == "Down" or
-            currentDirection == "Down" and e.keysym == "Up"):
-            return
-        self.direction = e.keysym
+        self.inputs.push(e.keysym)
+
+    def applyInput(self) -> float:
+        """
+            This method sets the movement direction from the first pending
+            key press which changes it without reversing the snake (if any),
+            and returns the time it was pressed (or None).
+        """
+        event = self.inputs.pop(self.direction)
+        if event is None:
+            return None
+        self.direction = event[0]
+        return event[1]
+
+    def steer(self) -> None:
+        """
+            This method lets the autopilot (if any) plan the next move,
+            and sets the movement direction of its move (which a key
+            pressed by the gamer in the meantime still overrides).
+        """
+        if self.autopilot is not None:
+            direction = self.autopilot(self.engine)
+            if direction is not None:
+                self.direction = direction
 
     def move(self) -> None:
         """
             This method implements what is needed to be done
             for the movement of the snake.
-            It generates a new snake coordinate.
+            It steps the engine in the current direction.
             If based on this new movement, the prey has been
-            captured, it adds a task to the queue for the updated
-            score and also creates a new prey.
-            It also calls a corresponding method to check if
-            the game should be over.
-            The snake coordinates list (representing its length
-            and position) should be correctly updated.
+            captured, it adds tasks to the queue for the updated
+            score and the new prey.
+            If the game is over, it adds a "game_over" task to the queue.
+            In delta mode, all of these changes are added as a single
+            "delta" task instead, which is a keyframe if the channel dropped a "delta" task.
+            The "move" and "delta" tasks are stamped with the time they were produced.
+            If an autopilot is provided, it steers the snake first.
+            The first pending key press which changes the direction is then applied,
+            and the latency from the key press to this move is recorded.
+            If a profiler is provided, each of these phases is timed.
         """
+        self.lap() # Start of the Tick
+        self.steer()
+        pressedAt = self.applyInput()
+        self.lap("plan")
+        self.gameNotOver = self.engine.step(self.direction)
+        self.recordInput(pressedAt)
+        self.lap("step")
+        self.recordMove()
+        self.lap("record")
 
-        def isCaptured(snakeCoordinates: tuple, preyCoordinates: list) -> bool:
-            captureCoordinates = (
-                snakeCoordinates[0] - SNAKE_ICON_WIDTH // 2, # x0
-                snakeCoordinates[1] - SNAKE_ICON_WIDTH // 2, # y0
-                snakeCoordinates[0] + SNAKE_ICON_WIDTH // 2, # x1
-                snakeCoordinates[1] + SNAKE_ICON_WIDTH // 2 # y1
-            )
-
-            isCaptured: bool = False
-            # Checks if Snake Coordinates are in Prey Coordinates (instance where Prey could be much larger than Snake)
-            if (captureCoordinates[0] <= preyCoordinates[2] and captureCoordinates[1] <= preyCoordinates[3]) and (captureCoordinates[0] >= preyCoordinates[0] and captureCoordinates[1] >= preyCoordinates[1]): # Snake Point 0 "inside" Prey
-                isCaptured = True
-            elif (captureCoordinates[2] >= preyCoordinates[0] and captureCoordinates[3] >= preyCoordinates[1]) and (captureCoordinates[2] <= preyCoordinates[2] and captureCoordinates[3] <= preyCoordinates[3]): # Snake Point 1 "inside" Prey
-                isCaptured = True
-            # Checks if Prey Coordinates are in Snake Coordinates (instance where Snake could be much larger than Prey)
-            elif (preyCoordinates[2] >= captureCoordinates[0] and preyCoordinates[3] >= captureCoordinates[1]) and (preyCoordinates[2] <= captureCoordinates[2] and preyCoordinates[3] <= captureCoordinates[3]): # Prey Point 0 "inside" Snake
-                isCaptured = True
-            elif (preyCoordinates[0] <= captureCoordinates[2] and preyCoordinates[1] <= captureCoordinates[3]) and (preyCoordinates[0] >= captureCoordinates[0] and preyCoordinates[1] >= captureCoordinates[1]): # Prey Point 1 "inside" Snake
-                isCaptured = True
-            return isCaptured
-
-        NewSnakeCoordinates = self.calculateNewCoordinates()
-        #complete the method implementation below
-
-        if isCaptured(snakeCoordinates = NewSnakeCoordinates, preyCoordinates = gui.canvas.coords(gui.preyIcon)): # Access from GUI:
-            self.snakeCoordinates = [*self.snakeCoordinates, NewSnakeCoordinates] # Append New Snake Head
-
-            self.score += 1
-            gameQueue.put({"score" : self.score})
-            self.createNewPrey()
-        else:
-            self.snakeCoordinates = [*self.snakeCoordinates[1:], NewSnakeCoordinates] # Move Snake
-        self.isGameOver(NewSnakeCoordinates)
-        gameQueue.put({"move" :  self.snakeCoordinates})
+        if self.encoder is not None:
+            self.score = self.engine.score
+            resync = isinstance(self.queue, CoalescingChannel) and self.queue.takeResync()
+            self.queue.put({"delta" : self.encoder.encode(self.engine, resync), "time" : time.perf_counter()})
+        elif self.engine.preyCaptured:
+            self.score = self.engine.score
+            self.queue.put({"score" : self.score})
+            self.queue.put({"prey" : self.engine.preyCoordinates})
+        if not self.gameNotOver:
+            self.queue.put({"game_over" : True})
+        if self.encoder is None:
+            self.queue.put({"move" :  list(self.snakeCoordinates), "time" : time.perf_counter()}) # Snapshot (Engine Updates Deque In Place)
+        self.lap("publish")
+        if self.notifier is not None:
+            self.notifier.notify()
+        self.lap("notify")
 
-    def calculateNewCoordinates(self) -> tuple:
+    def recordInput(self, pressedAt: float) -> None:
         """
-            This method calculates and returns the new
-            coordinates to be added to the snake
-            coordinates list based on the movement
-            direction and the current coordinate of
-            head of the snake.
-            It is used by the move() method.
+            This method records the latency from the key press applied by the last move (if any) to the move.
         """
-        lastX, lastY = self.snakeCoordinates[-1]
-        #complete the method implementation below
-        if self.direction == "Left":
-            lastX -= SNAKE_ICON_WIDTH
-        elif self.direction == "Right":
-            lastX += SNAKE_ICON_WIDTH
-        elif self.direction == "Up":
-            lastY -= SNAKE_ICON_WIDTH
-        else:
-            lastY += SNAKE_ICON_WIDTH
-        return (lastX, lastY)
+        if pressedAt is not None:
+            self.inputLatency.record(time.perf_counter() - pressedAt)
 
-    def isGameOver(self, snakeCoordinates: tuple) -> None:
+    def recordMove(self) -> None:
         """
-            This method checks if the game is over by
-            checking if now the snake has passed any wall
-            or if it has bit itself.
-            If that is the case, it updates the gameNotOver
-            field and also adds a "game_over" task to the queue.
+            This method records the last move of the engine into the replay file (if any),
+            and closes it when the game is over.
         """
-        x, y = snakeCoordinates
-        #complete the method implementation below
-
-        x_collision: bool = (x <= 0) or (x >= WINDOW_WIDTH)
-        y_collision: bool = (y <= 0) or (y >= WINDOW_HEIGHT)
+        if self.recorder is not None:
+            self.recorder.record(self.engine)
+            if not self.gameNotOver:
+                self.recorder.close(self.engine)
 
-        if (x_collision) or (y_collision) or ((x, y) in self.snakeCoordinates[:-1]):
-            self.gameNotOver = False
-            gameQueue.put({"game_over" : True})
-        return
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Play the snake game (message passing IPC model).")
+    parser.add_argument("--scheduler", choices = POLICIES, default = None,
+        help = "run the superloop on a fixed timestep with the given missed tick policy")
+    parser.add_argument("--speed", type = float, default = 0.15, help = "period of the scheduler (sec)")
+    parser.add_argument("--delta", action = "store_true", help = "send delta render messages instead of the whole snake")
+    parser.add_argument("--keyframes", type = int, default = 100, help = "number of ticks between delta keyframes")
+    parser.add_argument("--cells", action = "store_true",
+        help = "draw the snake with a pool of per-cell canvas items, only moving the cells which changed")
+    parser.add_argument("--width", type = int, default = WINDOW_WIDTH, help = "width of the board (pixels)")
+    parser.add_argument("--height", type = int, default = WINDOW_HEIGHT, help = "height of the board (pixels)")
+    parser.add_argument("--wakeup", action = "store_true", help = "notify the gui of new tasks instead of polling the queue")
+    parser.add_argument("--channel", choices = BACKPRESSURE_POLICIES, default = None,
+        help = "use a bounded channel which coalesces superseded tasks, with the given backpressure policy")
+    parser.add_argument("--channel-size", type = int, default = 64, help = "maximum number of pending tasks in the channel")
+    parser.add_argument("--seed", type = int, default = None, help = "seed of the prey generator")
+    parser.add_argument("--record", default = None, metavar = "PATH", help = "record the session into a replay file")
+    parser.add_argument("--autopilot", type = float, nargs = "?", const = 1000, default = None, metavar = "BUDGET",
+        help = "let the autopilot play, with the given planning budget per tick (us, default : 1000)")
+    parser.add_argument("--profile", default = None, metavar = "PATH",
+        help = "time the phases of every tick, appending their histograms as JSON lines on exit (and on SIGUSR1)")
+    parser.add_argument("--metrics", action = "store_true", help = "print the collected metrics on exit")
+    args = parser.parse_args()
+    if args.width // SNAKE_ICON_WIDTH < MIN_COLUMNS or args.height // SNAKE_ICON_WIDTH < MIN_ROWS:
+        parser.error(f"the board must be at least {MIN_COLUMNS * SNAKE_ICON_WIDTH}x{MIN_ROWS * SNAKE_ICON_WIDTH} pixels")
+    if args.record and args.seed is not None and abs(args.seed) >= SEED_LIMIT:
+        parser.error("--seed must be less than 2**64 in magnitude to be recorded")
 
-    def createNewPrey(self) -> None:
-        """
-            This methods picks an x and a y randomly as the coordinate
-            of the new prey and uses that to calculate the
-            coordinates (x - 5, y - 5, x + 5, y + 5). [you need to replace 5 with a constant]
-            It then adds a "prey" task to the queue with the calculated
-            rectangle coordinates as its value. This is used by the
-            queue handler to represent the new prey.
-            To make playing the game easier, set the x and y to be THRESHOLD
-            away from the walls.
-        """
-        THRESHOLD = 15
+    if args.channel:
+        gameQueue = CoalescingChannel(args.channel_size, args.channel)     #instantiate a bounded channel with the same interface
+    else:
+        gameQueue = queue.Queue()     #instantiate a queue object using python's queue class
 
-        generatedCoordinates: tuple = (
-            random.randint(THRESHOLD, WINDOW_WIDTH - THRESHOLD),  # Generate X Coordinate Threshold Away From Walls
-            random.randint(THRESHOLD, WINDOW_HEIGHT - THRESHOLD)  # Generate Y Coordinate Threshold Away From Walls
-        )
+    notifier = Notifier() if args.wakeup else None
 
-        preyCoordinates: tuple = (
-            generatedCoordinates[0] - PREY_ICON_WIDTH // 2, # x0
-            generatedCoordinates[1] - PREY_ICON_WIDTH // 2, # y0
-            generatedCoordinates[0] + PREY_ICON_WIDTH // 2, # x1
-            generatedCoordinates[1] + PREY_ICON_WIDTH // 2 # y1
-        )
+    seed = args.seed if args.seed is not None or not args.record else random.randrange(2 ** 63)
 
-        gameQueue.put({"prey" : preyCoordinates})
+    autopilot = AutopilotController(seed, args.autopilot) if args.autopilot is not None else None
 
-if __name__ == "__main__":
-    #some constants for our GUI
-    WINDOW_WIDTH = 500
-    WINDOW_HEIGHT = 300
-    SNAKE_ICON_WIDTH = 15
-    PREY_ICON_WIDTH = 10
-    #add the specified constant PREY_ICON_WIDTH here
+    profiler = Profiler(args.profile) if args.profile else None
+    if profiler is not None:
+        profiler.dumpOnSignal()
 
-    BACKGROUND_COLOUR = "black"   #you may change this colour if you wish
-    ICON_COLOUR = "blue"        #you may change this colour if you wish
+    game = Game(DeltaEncoder(args.keyframes) if args.delta else None, notifier, seed, args.record, autopilot, profiler,
+                gameQueue, args.width, args.height)        #instantiate the game object
 
-    gameQueue = queue.Queue()     #instantiate a queue object using python's queue class
+    gui = Gui(game)    #instantiate the game user interface
 
-    game = Game()        #instantiate the game object
+    if args.cells:
+        renderer = CellRenderer(gui.canvas, gui.preyIcon, gui.score,
+            ICON_COLOUR, gui.snakeIconWidth, gui.preyIconWidth)
+    else:
+        renderer = SegmentRenderer(gui.canvas, gui.preyIcon, gui.score,
+            ICON_COLOUR, gui.snakeIconWidth, gui.preyIconWidth) if args.delta else None
 
-    gui = Gui()    #instantiate the game user interface
+    queueHandler = QueueHandler(game, gui, renderer, notifier, profiler)  #instantiate the queue handler
 
-    QueueHandler()  #instantiate the queue handler
+    scheduler = Scheduler(args.speed, args.scheduler) if args.scheduler else None
 
     #start a thread with the main loop of the game
-    threading.Thread(target = game.superloop, daemon=True).start()
+    threading.Thread(target = game.superloop, args = (scheduler,), daemon=True).start()
 
     #start the GUI's own event loop
-    gui.root.mainloop()
\ No newline at end of file
+    gui.root.mainloop()
+
+    if game.recorder is not None and game.gameNotOver:
+        game.recorder.close(game.engine) #window closed before the game was over
+
+    if profiler is not None:
+        profiler.dump()
+
+    if args.metrics:
+        print(queueHandler.latency)
+        print(f"{game.inputLatency} ({game.inputs.dropped} key presses dropped)")
+        if args.channel:
+            print(f"channel: {game.queue.stats()}")
+        if scheduler is not None:
+            print(scheduler.lateness)
+        if autopilot is not None:
+            print(f"{autopilot.latency} ({autopilot.overBudget} ticks over budget, {autopilot.cutShort} plans cut short)")
\ No newline at end of file
@@ -0,0 +1,187 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the optional per-tick phase profiler of the game loops.
+
+    A `Profiler` keeps a histogram of durations per phase of a tick (e.g. "move.step" or "gui.move"). Each thread
+    times its own phases with a `PhaseTimer`, whose `lap()` records the time elapsed since its previous lap, read
+    from a monotonic integer counter (time.perf_counter_ns()), into the histogram of the phase.
+    The phases inside `Engine.step()` are timed by wrapping the methods of the engine (see `profileEngine()`), so,
+    as for the instrumentation of the locks (see `instrumentation.py`), there is no overhead when profiling is disabled.
+
+    Recording takes no lock : each thread records into its own histograms (those of its `PhaseTimer`, or those of
+    the thread for the engine phases), which only grow. The histograms are rolling : every dump appends the histograms
+    of the window since the previous dump (i.e. their difference with the previous dump), along with the totals since
+    the start, as a JSON line, so that no sample is lost or counted twice. They are dumped on exit, and whenever the
+    process receives SIGUSR1 (on POSIX), by a thread started from the signal handler :
+        python original.py --profile profile.jsonl
+        kill -USR1 <pid>
+"""
+
+import functools, json, signal, threading, time
+
+from metrics import BUCKET_BOUNDS, Histogram
+
+def noLap(phase: str = None) -> None:
+    """
+        This function is the lap of a disabled profiler, which records nothing.
+    """
+
+def recordInto(histograms: dict, phase: str, nanoseconds: int) -> None:
+    """
+        This function records a single duration (ns) into the histogram of the given phase (created if needed).
+    """
+    histogram = histograms.get(phase)
+    if histogram is None:
+        histogram = histograms[phase] = Histogram(phase)
+    histogram.record(nanoseconds / 1e9)
+
+class PhaseTimer():
+    '''
+        This class times the consecutive phases of a single thread.
+    '''
+    def __init__(self, profiler: "Profiler", prefix: str):
+        """
+            This initializer sets the profiler which dumps the phases, and the prefix of their names.
+            The timer must only be used by a single thread, which records into its own histograms.
+        """
+        self.histograms = profiler.register()
+        self.prefix = prefix
+        self.names = {} # Phase -> Prefixed Name
+        self.last = time.perf_counter_ns()
+
+    def lap(self, phase: str = None) -> None:
+        """
+            This method records the time since the previous lap as the given phase.
+            Without a phase, it only starts timing the next one (e.g. at the start of a tick).
+        """
+        now = time.perf_counter_ns()
+        if phase is not None:
+            name = self.names.get(phase)
+            if name is None:
+                name = self.names[phase] = f"{self.prefix}.{phase}"
+            recordInto(self.histograms, name, now - self.last)
+        self.last = now
+
+def mergeInto(histograms: dict, phase: str, counts: list, total: float, maximum: float) -> None:
+    """
+        This function adds the given bucket counts, total and maximum into the histogram of the given phase (created if needed).
+    """
+    histogram = histograms.get(phase)
+    if histogram is None:
+        histogram = histograms[phase] = Histogram(phase)
+    histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+    histogram.count = sum(histogram.counts)
+    histogram.total += total
+    histogram.maximum = max(histogram.maximum, maximum)
+
+class Profiler():
+    '''
+        This class aggregates the phase durations into rolling histograms, and dumps them as JSON lines.
+    '''
+    def __init__(self, path: str):
+        """
+            This initializer sets the path of the JSON lines file which the dumps are appended to.
+        """
+        self.path = path
+        self.sources = [] # Histograms of Each Timer or Thread (Phase -> Histogram Since the Start)
+        self.previous = {} # (Source, Phase) -> (Bucket Counts, Total, Maximum) at the Previous Dump
+        self.local = threading.local() # Histograms of the Current Thread (Engine Phases)
+        self.windowStart = time.time()
+        self.lock = threading.Lock() # Taken by the Dumps and the Registration of New Histograms (Never by a Record)
+
+    def timer(self, prefix: str) -> PhaseTimer:
+        """
+            This method returns a new timer for the phases of a thread, e.g. timer("move").
+        """
+        return PhaseTimer(self, prefix)
+
+    def register(self) -> dict:
+        """
+            This method returns new histograms (phase -> histogram) which are dumped along with the others.
+        """
+        histograms = {}
+        with self.lock:
+            self.sources.append(histograms)
+        return histograms
+
+    def record(self, phase: str, nanoseconds: int) -> None:
+        """
+            This method records a single duration (ns) of the given phase into the histograms of the current thread.
+        """
+        histograms = getattr(self.local, "histograms", None)
+        if histograms is None:
+            histograms = self.local.histograms = self.register()
+        recordInto(histograms, phase, nanoseconds)
+
+    def timed(self, function, phase: str):
+        """
+            This method returns a wrapper of the function which records the duration of every call as the given phase.
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(phase, time.perf_counter_ns() - start)
+        return wrapper
+
+    def profileEngine(self, engine) -> None:
+        """
+            This method wraps the methods called by `Engine.step()` (and those of its current body),
+            so that each of them is recorded as an "engine" phase.
+        """
+        for name in ("calculateNewCoordinates", "isCaptured", "isGameOver", "createNewPrey"):
+            setattr(engine, name, self.timed(getattr(engine, name), f"engine.{name}"))
+        for name in ("popTail", "pushHead"):
+            setattr(engine.body, name, self.timed(getattr(engine.body, name), f"engine.{name}"))
+
+    def dumpOnSignal(self, signum = getattr(signal, "SIGUSR1", None)) -> None:
+        """
+            This method dumps the histograms whenever the process receives the signal (if the platform has it).
+            It must be called from the main thread. The dump runs in its own thread, which waits for the lock
+            (the interrupted thread may hold it in the middle of a dump).
+        """
+        if signum is not None:
+            signal.signal(signum, lambda *_: threading.Thread(target = self.dump, daemon = True).start())
+
+    def toDict(self) -> dict:
+        """
+            This method returns the histograms of the window since the previous call and the totals (merged
+            across threads), which can be serialized as JSON, then starts a new window. It must be called with
+            the lock held (see `dump()`). The bucket counts of each histogram are copied at once, so a sample
+            recorded meanwhile is counted in a single window (its duration may only be added to the mean of the next one).
+        """
+        now = time.time()
+        windows, totals = {}, {}
+        for index, histograms in enumerate(self.sources):
+            for phase, histogram in list(histograms.items()):
+                counts, total, maximum = list(histogram.counts), histogram.total, histogram.maximum
+                previousCounts, previousTotal, previousMaximum = self.previous.get((index, phase), (None, 0.0, 0.0))
+                self.previous[(index, phase)] = (counts, total, maximum)
+                windowCounts = counts if previousCounts is None else [a - b for a, b in zip(counts, previousCounts)]
+                windowMaximum = maximum
+                if maximum <= previousMaximum: # Reached in a Previous Window (Bounded by the Largest Bucket of This One)
+                    last = max((bucket for bucket, count in enumerate(windowCounts) if count), default = None)
+                    if last is None:
+                        windowMaximum = 0.0
+                    elif last < len(BUCKET_BOUNDS):
+                        windowMaximum = min(maximum, BUCKET_BOUNDS[last] / 1e6)
+                mergeInto(windows, phase, windowCounts, total - previousTotal, windowMaximum)
+                mergeInto(totals, phase, counts, total, maximum)
+        summary = {"time": now, "window_sec": now - self.windowStart,
+                   "window": {phase: histogram.toDict() for phase, histogram in windows.items() if histogram.count},
+                   "total": {phase: histogram.toDict() for phase, histogram in totals.items()}}
+        self.windowStart = now
+        return summary
+
+    def dump(self) -> None:
+        """
+            This method appends the histograms as a JSON line to the file, then starts a new window.
+        """
+        with self.lock: # Critical Section (Between Dumps)
+            summary = self.toDict()
+        with open(self.path, "a") as output:
+            output.write(json.dumps(summary) + "\n")
@@ -0,0 +1,237 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements renderers which draw the game onto a Tkinter canvas.
+
+    The engine works in cell coordinates (see `engine.py`), which are only converted to pixel coordinates here :
+    the snake is drawn through the centers of its cells, whose top left corner is (column * snakeIconWidth,
+    row * snakeIconWidth), and the prey as a square of preyIconWidth pixels centered on its cell.
+
+    The `Gui` classes draw the snake as a single polyline, whose full coordinate list is
+    sent to Tcl every frame. The `SegmentRenderer` class instead applies delta messages
+    (see `delta.py`) by drawing the snake as one canvas line per segment, so that each tick
+    only creates the segment at the head and deletes the segment at the tail.
+    The `CellRenderer` class draws the snake as one canvas rectangle per cell, from either delta messages
+    or whole frames, and keeps a pool of hidden rectangles to reuse : each tick usually moves the rectangle
+    of the tail cell to the new head cell, so only those two cells of the canvas are redrawn (i.e. the damaged
+    region), however long the snake is.
+
+    *Note that this module does not import tkinter, it only uses the canvas it is given.*
+    It must still only be used from the thread running the Tkinter event loop.
+"""
+
+from collections import deque
+
+from delta import DeltaDecoder
+
+MAX_ENTERED = 256 # Most Cells Entered Between Two Frames Drawn Incrementally (Otherwise Redrawn)
+
+def cellCenter(cell: tuple, snakeIconWidth: int) -> tuple:
+    """
+        This function returns the pixel coordinates of the center of a cell.
+    """
+    return (cell[0] * snakeIconWidth + snakeIconWidth // 2, cell[1] * snakeIconWidth + snakeIconWidth // 2)
+
+def snakePoints(snakeCoordinates, snakeIconWidth: int, origin: tuple = None) -> list:
+    """
+        This function returns the flattened pixel coordinates of the polyline through the snake cells.
+        The cell coordinates may also be flattened already (i.e. a memoryview of a `SharedBoard`).
+        If an origin is provided, the board is drawn from that pixel instead of the top left corner (e.g. a tile).
+    """
+    half = snakeIconWidth // 2
+    if origin is not None:
+        x, y = origin[0] + half, origin[1] + half
+        if isinstance(snakeCoordinates, memoryview):
+            return [coord * snakeIconWidth + (y if index & 1 else x) for index, coord in enumerate(snakeCoordinates)]
+        return [value for column, row in snakeCoordinates for value in (column * snakeIconWidth + x, row * snakeIconWidth + y)]
+    if isinstance(snakeCoordinates, memoryview):
+        return [coord * snakeIconWidth + half for coord in snakeCoordinates]
+    return [coord * snakeIconWidth + half for point in snakeCoordinates for coord in point]
+
+def preyRectangle(preyCoordinates: tuple, snakeIconWidth: int, preyIconWidth: int, origin: tuple = (0, 0)) -> tuple:
+    """
+        This function returns the pixel rectangle (x0, y0, x1, y1) of the prey on the given cell
+        (of a board drawn from the given origin).
+    """
+    x, y = cellCenter(preyCoordinates, snakeIconWidth)
+    x, y = x + origin[0], y + origin[1]
+    return (x - preyIconWidth // 2, y - preyIconWidth // 2, x + preyIconWidth // 2, y + preyIconWidth // 2)
+
+class SegmentRenderer():
+    '''
+        This class renders delta messages with one canvas item per snake segment.
+    '''
+    def __init__(self, canvas, preyIcon: int, scoreText: int, colour: str, width: int, preyWidth: int):
+        """
+            This initializer takes the canvas along with its existing prey and score items,
+            the colour and width of the snake segments (i.e. the size of a cell) and the width of the prey.
+        """
+        self.canvas = canvas
+        self.preyIcon = preyIcon
+        self.scoreText = scoreText
+        self.colour = colour
+        self.width = width
+        self.preyWidth = preyWidth
+        self.decoder = DeltaDecoder()
+        self.segments = deque() # Canvas Items (From Tail to Head)
+
+    def createSegment(self, start: tuple, end: tuple) -> int:
+        """
+            This method draws a segment of the snake between two cells and returns its canvas item.
+        """
+        return self.canvas.create_line(cellCenter(start, self.width), cellCenter(end, self.width), fill=self.colour,
+            width=self.width, capstyle="projecting")
+
+    def apply(self, message: dict) -> None:
+        """
+            This method applies a delta message to the canvas.
+            A delta creates and deletes at most one segment, while a keyframe redraws the snake.
+        """
+        snakeCoordinates = self.decoder.snakeCoordinates
+        previousHead = snakeCoordinates[-1] if snakeCoordinates else None
+        if not self.decoder.apply(message):
+            return
+        snakeCoordinates = self.decoder.snakeCoordinates
+
+        if "keyframe" in message:
+            self.canvas.delete(*self.segments)
+            self.segments = deque(self.createSegment(start, end)
+                for start, end in zip(message["snake"], message["snake"][1:]))
+        else:
+            if message["tail"]:
+                self.canvas.delete(self.segments.popleft())
+            self.segments.append(self.createSegment(previousHead, snakeCoordinates[-1]))
+
+        if "prey" in message:
+            self.canvas.coords(self.preyIcon, *preyRectangle(message["prey"], self.width, self.preyWidth))
+        if "score" in message:
+            self.canvas.itemconfigure(self.scoreText, text=f"Your Score: {message['score']}")
+
+def cellRectangle(cell: tuple, snakeIconWidth: int) -> tuple:
+    """
+        This function returns the pixel rectangle (x0, y0, x1, y1) covering a cell.
+    """
+    x, y = cell[0] * snakeIconWidth, cell[1] * snakeIconWidth
+    return (x, y, x + snakeIconWidth, y + snakeIconWidth)
+
+class CellRenderer():
+    '''
+        This class renders the snake with a pool of reusable per-cell canvas items,
+        only moving the items of the cells which changed since the previous frame.
+    '''
+    def __init__(self, canvas, preyIcon: int, scoreText: int, colour: str, width: int, preyWidth: int):
+        """
+            This initializer takes the canvas along with its existing prey and score items,
+            the colour and width of the snake cells (i.e. the size of a cell) and the width of the prey.
+        """
+        self.canvas = canvas
+        self.preyIcon = preyIcon
+        self.scoreText = scoreText
+        self.colour = colour
+        self.width = width
+        self.preyWidth = preyWidth
+        self.decoder = DeltaDecoder()
+        self.items = deque() # Canvas Items (From Tail to Head)
+        self.cells = deque() # Cells of the Items Drawn (From Tail to Head)
+        self.pool = [] # Hidden Canvas Items
+
+    def takeItem(self) -> int:
+        """
+            This method returns a hidden item of the pool (made visible), or a new item if the pool is empty.
+        """
+        if self.pool:
+            item = self.pool.pop()
+            self.canvas.itemconfigure(item, state="normal")
+            return item
+        return self.canvas.create_rectangle(0, 0, 0, 0, fill=self.colour, outline="")
+
+    def releaseTail(self) -> None:
+        """
+            This method hides the item of the tail cell, and returns it to the pool.
+        """
+        item = self.items.popleft()
+        self.cells.popleft()
+        self.canvas.itemconfigure(item, state="hidden")
+        self.pool.append(item)
+
+    def invalidate(self) -> None:
+        """
+            This method forgets which cells are drawn, so that the next frame is redrawn
+            (e.g. if it was read from a buffer which was overwritten in the meantime).
+        """
+        self.cells = deque([None] * len(self.items))
+
+    def redraw(self, snakeCells: list) -> None:
+        """
+            This method draws every cell of the snake, reusing the items which are already drawn.
+        """
+        while len(self.items) > len(snakeCells):
+            self.releaseTail()
+        while len(self.items) < len(snakeCells):
+            self.items.append(self.takeItem())
+        for item, cell in zip(self.items, snakeCells):
+            self.canvas.coords(item, *cellRectangle(cell, self.width))
+        self.cells = deque(snakeCells)
+
+    def draw(self, snakeCoordinates) -> None:
+        """
+            This method draws a frame of the whole snake (from tail to head), which may also be flattened
+            (i.e. a memoryview of a `SharedBoard`). Only the cells which the snake entered or left since
+            the previous frame are drawn : the items of the cells it left are moved to the cells it entered
+            (so a tick usually moves a single item), and the remaining ones are added or hidden.
+            Only the last cells of the frame are read, unless the snake is not the one drawn (e.g. after a reset).
+        """
+        if isinstance(snakeCoordinates, memoryview):
+            length = len(snakeCoordinates) // 2
+            cell = lambda index: (snakeCoordinates[2 * index], snakeCoordinates[2 * index + 1])
+            allCells = lambda: list(zip(snakeCoordinates[0::2], snakeCoordinates[1::2]))
+        else:
+            length = len(snakeCoordinates)
+            cell = lambda index: tuple(snakeCoordinates[index])
+            allCells = lambda: [tuple(snakeCell) for snakeCell in snakeCoordinates]
+
+        cells, items = self.cells, self.items
+        entered = None
+        if cells and length:
+            previousHead = cells[-1]
+            for back in range(1, min(length, len(cells), MAX_ENTERED) + 1): # Previous Head Among the Last Cells
+                if cell(length - back) == previousHead:
+                    entered = [cell(index) for index in range(length - back + 1, length)]
+                    break
+        left = len(cells) + len(entered) - length if entered is not None else -1
+        if left < 0: # Not the Snake Drawn (or It Grew More Than It Moved)
+            self.redraw(allCells())
+            return
+
+        for newCell in entered:
+            if left > 0: # Move the Tail Item to the Head
+                item = items.popleft()
+                cells.popleft()
+                left -= 1
+            else:
+                item = self.takeItem()
+            self.canvas.coords(item, *cellRectangle(newCell, self.width))
+            items.append(item)
+            cells.append(newCell)
+        for _ in range(left):
+            self.releaseTail()
+        if cells and cells[0] != cell(0):
+            self.redraw(allCells())
+
+    def apply(self, message: dict) -> None:
+        """
+            This method applies a delta message to the canvas, as the `SegmentRenderer` does.
+            A delta moves (or adds) the item of a single cell, while a keyframe redraws the snake.
+        """
+        if not self.decoder.apply(message):
+            return
+        if "keyframe" in message:
+            self.redraw([tuple(cell) for cell in message["snake"]])
+        else:
+            self.draw(self.decoder.snakeCoordinates)
+
+        if "prey" in message:
+            self.canvas.coords(self.preyIcon, *preyRectangle(message["prey"], self.width, self.preyWidth))
+        if "score" in message:
+            self.canvas.itemconfigure(self.scoreText, text=f"Your Score: {message['score']}")
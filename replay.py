@@ -0,0 +1,226 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the recording and playback of game sessions in a compact binary replay format.
+
+    Since the `Engine` is deterministic for a given seed and sequence of directions, a session is recorded as :
+        A header : magic, version, board dimensions, seed and keyframe interval.
+        Direction records : the tick at which the direction of the snake changed, and the new direction (6 bytes).
+        Keyframe records : the full state of the engine (i.e. snake, prey, score, order of the free cells and
+        random generator state) every keyframeInterval ticks, so that playback can seek to any tick without
+        re-simulating from the start.
+        An end record : the last tick of the session.
+    The file is append-only, and the records are packed and written by a background thread of the `ReplayWriter`,
+    so that the game thread only enqueues them.
+
+    The `ReplayPlayer` memory-maps the file, indexes its records, and re-simulates the session far faster than real
+    time from the nearest keyframe :
+        python replay.py session.replay --seek 1000
+"""
+
+import argparse
+import mmap, queue, struct, threading, time
+
+from engine import Engine
+
+MAGIC = b"SNKR"
+VERSION = 4
+HEADER = struct.Struct("<4sHIIHHQI") # magic, version, width, height, snakeIconWidth, preyIconWidth, seed, keyframeInterval
+SEED_LIMIT = 1 << 64 # Seeds Are Recorded by Magnitude (Which random.Random Uses), in 64 Bits
+DIRECTION_RECORD = struct.Struct("<cIB") # b"D", tick, direction code
+KEYFRAME_RECORD = struct.Struct("<cII") # b"K", tick, payload size
+END_RECORD = struct.Struct("<cI") # b"E", tick
+KEYFRAME_STATE = struct.Struct("<BBIi2iII") # direction code, gameNotOver, score, deathCause code, prey coordinates, snake length, free cells
+RANDOM_STATE = struct.Struct("<I625Id") # random generator version, state, gauss_next (NaN if None)
+
+DIRECTIONS = ("Left", "Right", "Up", "Down")
+DEATH_CAUSES = (None, "wall", "self", "full")
+
+def packKeyframe(state: tuple) -> bytes:
+    """
+        This function packs the state captured by `captureState()` into the payload of a keyframe record.
+    """
+    direction, gameNotOver, score, deathCause, preyCoordinates, snakeCoordinates, free, randomState = state
+    version, internalState, gaussNext = randomState
+    return b"".join((
+        KEYFRAME_STATE.pack(DIRECTIONS.index(direction), gameNotOver, score, DEATH_CAUSES.index(deathCause),
+                            *preyCoordinates, len(snakeCoordinates), len(free)),
+        struct.pack(f"<{2 * len(snakeCoordinates)}i", *[coord for point in snakeCoordinates for coord in point]),
+        struct.pack(f"<{len(free)}I", *free),
+        RANDOM_STATE.pack(version, *internalState, float("nan") if gaussNext is None else gaussNext),
+    ))
+
+def unpackKeyframe(payload) -> tuple:
+    """
+        This function unpacks the payload of a keyframe record into the state restored by `restoreState()`.
+    """
+    direction, gameNotOver, score, deathCause, preyColumn, preyRow, length, freeLength = KEYFRAME_STATE.unpack_from(payload, 0)
+    offset = KEYFRAME_STATE.size
+    coords = struct.unpack_from(f"<{2 * length}i", payload, offset)
+    offset += 8 * length
+    free = struct.unpack_from(f"<{freeLength}I", payload, offset)
+    offset += 4 * freeLength
+    version, *internalState, gaussNext = RANDOM_STATE.unpack_from(payload, offset)
+    return (DIRECTIONS[direction], bool(gameNotOver), score, DEATH_CAUSES[deathCause], (preyColumn, preyRow),
+            list(zip(coords[0::2], coords[1::2])), list(free),
+            (version, tuple(internalState), None if gaussNext != gaussNext else gaussNext))
+
+def captureState(engine: Engine) -> tuple:
+    """
+        This function returns a copy of the state of the engine (at engine.tick).
+        The order of the free cells is part of the state, since it determines where the next prey is created.
+    """
+    return (engine.direction, engine.gameNotOver, engine.score, engine.deathCause, engine.preyCoordinates,
+            list(engine.snakeCoordinates), list(engine.body.free), engine.random.getstate())
+
+def restoreState(engine: Engine, tick: int, state: tuple) -> None:
+    """
+        This function restores a state returned by `captureState()` (or `unpackKeyframe()`) into the engine.
+    """
+    direction, gameNotOver, score, deathCause, preyCoordinates, snakeCoordinates, free, randomState = state
+    engine.reset(snakeCoordinates, direction)
+    engine.body.setFreeOrder(free)
+    engine.gameNotOver = gameNotOver
+    engine.score = score
+    engine.deathCause = deathCause
+    engine.preyCoordinates = preyCoordinates
+    engine.random.setstate(randomState)
+    engine.tick = tick
+
+class ReplayWriter():
+    '''
+        This class records a session into a replay file without blocking the game thread.
+    '''
+    def __init__(self, path: str, engine: Engine, seed: int, keyframeInterval: int = 1000):
+        """
+            This initializer writes the header and the keyframe of the current state of the engine,
+            which must have been created with the given seed. Since `random.Random` only uses the magnitude
+            of an integer seed, the magnitude is recorded, which must be less than SEED_LIMIT.
+        """
+        if abs(seed) >= SEED_LIMIT:
+            raise ValueError(f"Seed Too Large to Record : {seed}")
+        self.keyframeInterval = keyframeInterval
+        self.direction = engine.direction
+        self.pending = queue.SimpleQueue()
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, engine.width, engine.height, engine.snakeIconWidth,
+                                    engine.preyIconWidth, abs(seed), keyframeInterval))
+        self.thread = threading.Thread(target = self.writeRecords, daemon = True)
+        self.thread.start()
+        self.pending.put(("K", engine.tick, captureState(engine)))
+
+    def record(self, engine: Engine) -> None:
+        """
+            This method is called by the game thread after every step of the engine.
+            It enqueues a direction record if the direction changed during the tick,
+            and a keyframe record every keyframeInterval ticks.
+        """
+        if engine.direction != self.direction:
+            self.direction = engine.direction
+            self.pending.put(("D", engine.tick - 1, engine.direction)) # Applied at the Start of the Tick
+        if engine.tick % self.keyframeInterval == 0:
+            self.pending.put(("K", engine.tick, captureState(engine)))
+
+    def close(self, engine: Engine) -> None:
+        """
+            This method enqueues the end record, then waits for every record to be written.
+        """
+        self.pending.put(("E", engine.tick, None))
+        self.pending.put(None)
+        self.thread.join()
+
+    def writeRecords(self) -> None:
+        """
+            This method packs and writes the enqueued records. It is run by the background thread.
+        """
+        while True:
+            record = self.pending.get()
+            if record is None:
+                break
+            kind, tick, value = record
+            if kind == "D":
+                self.file.write(DIRECTION_RECORD.pack(b"D", tick, DIRECTIONS.index(value)))
+            elif kind == "K":
+                payload = packKeyframe(value)
+                self.file.write(KEYFRAME_RECORD.pack(b"K", tick, len(payload)) + payload)
+            else:
+                self.file.write(END_RECORD.pack(b"E", tick))
+            if self.pending.empty():
+                self.file.flush()
+        self.file.close()
+
+class ReplayPlayer():
+    '''
+        This class memory-maps a replay file to re-simulate its session from any tick.
+    '''
+    def __init__(self, path: str):
+        """
+            This initializer maps the file and indexes its direction changes and keyframes.
+            A truncated last record (i.e. from an interrupted session) is ignored.
+        """
+        with open(path, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        (magic, version, self.width, self.height, self.snakeIconWidth, self.preyIconWidth,
+         self.seed, self.keyframeInterval) = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported Replay File : {path}")
+
+        self.directions = {} # Tick -> Direction
+        self.keyframes = [] # (Tick, Offset of Payload, Payload Size)
+        self.lastTick = 0
+        offset = HEADER.size
+        while offset < len(self.buffer):
+            kind = self.buffer[offset:offset + 1]
+            if kind == b"D" and offset + DIRECTION_RECORD.size <= len(self.buffer):
+                _, tick, direction = DIRECTION_RECORD.unpack_from(self.buffer, offset)
+                self.directions[tick] = DIRECTIONS[direction]
+                offset += DIRECTION_RECORD.size
+            elif kind == b"K" and offset + KEYFRAME_RECORD.size <= len(self.buffer):
+                _, tick, size = KEYFRAME_RECORD.unpack_from(self.buffer, offset)
+                if offset + KEYFRAME_RECORD.size + size > len(self.buffer):
+                    break
+                self.keyframes.append((tick, offset + KEYFRAME_RECORD.size, size))
+                offset += KEYFRAME_RECORD.size + size
+            elif kind == b"E" and offset + END_RECORD.size <= len(self.buffer):
+                _, tick = END_RECORD.unpack_from(self.buffer, offset)
+                offset += END_RECORD.size
+            else:
+                break
+            self.lastTick = max(self.lastTick, tick)
+
+    def seek(self, tick: int) -> Engine:
+        """
+            This method returns an engine in the state of the session at the given tick,
+            restored from the nearest keyframe before it and re-simulated from there.
+        """
+        keyframeTick, offset, size = max((keyframe for keyframe in self.keyframes if keyframe[0] <= tick),
+                                         key = lambda keyframe: keyframe[0])
+        engine = Engine(self.width, self.height, self.snakeIconWidth, self.preyIconWidth)
+        restoreState(engine, keyframeTick, unpackKeyframe(self.buffer[offset:offset + size]))
+        directions = self.directions
+        while engine.tick < tick and engine.gameNotOver:
+            engine.step(directions.get(engine.tick))
+        return engine
+
+    def close(self) -> None:
+        """
+            This method unmaps the file.
+        """
+        self.buffer.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Re-simulate a recorded snake game session.")
+    parser.add_argument("path", help = "path of the replay file")
+    parser.add_argument("--seek", type = int, default = None, help = "tick to seek to (default : the end of the session)")
+    args = parser.parse_args()
+
+    player = ReplayPlayer(args.path)
+    tick = player.lastTick if args.seek is None else args.seek
+    start = time.perf_counter()
+    engine = player.seek(tick)
+    elapsed = time.perf_counter() - start
+    print(f"seed {player.seed}, {player.lastTick} ticks, {len(player.directions)} direction changes, {len(player.keyframes)} keyframes")
+    print(f"tick {engine.tick} : score {engine.score}, length {len(engine.snakeCoordinates)}, "
+          f"head {engine.snakeCoordinates[-1]}, game over {not engine.gameNotOver} (seeked in {elapsed * 1e3:.2f} ms)")
+    player.close()
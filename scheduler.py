@@ -0,0 +1,111 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements a fixed-timestep scheduler for the `superloop()` of the game.
+
+    The original loop sleeps for SPEED and then moves the snake, so every tick is delayed by
+    the time spent in `move()` (and waiting for locks), and the game drifts behind wall time.
+    The `Scheduler` class instead computes each deadline from a monotonic clock, i.e.
+    deadline[n + 1] = deadline[n] + period, regardless of how long each tick took.
+
+    When ticks are missed (e.g. CPU contention), the "catchup" policy runs them back to back
+    until the schedule is met again, while the "drop" policy skips them and resumes on the next deadline.
+    The lateness of every tick (i.e. when it started relative to its deadline) is recorded in a histogram.
+    The same schedule can also be awaited on an asyncio event loop (see `runAsync()`).
+"""
+
+import asyncio, time
+
+from metrics import Histogram
+
+POLICIES = ("catchup", "drop")
+
+class Scheduler():
+    '''
+        This class runs a tick function on a drift-free fixed timestep.
+    '''
+    def __init__(self, period: float = 0.15, policy: str = "catchup", maxCatchUp: int = 10):
+        """
+            This initializer sets the period (sec) and the missed tick policy.
+            A period of 0 runs the ticks back to back (i.e. as fast as possible).
+            With the "catchup" policy, at most maxCatchUp ticks are run back to back
+            before the schedule is reset (i.e. after a very long stall).
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown Scheduler Policy : {policy}")
+        self.period = period
+        self.policy = policy
+        self.maxCatchUp = maxCatchUp
+        self.lateness = Histogram("lateness")
+        self.ticks = 0
+        self.dropped = 0
+        self.deadline = None # Deadline of the Current Tick (time.monotonic())
+
+    def run(self, tick, isRunning) -> None:
+        """
+            This method calls tick() on every deadline, as long as isRunning() is true.
+        """
+        clock = time.monotonic
+        deadline = clock() + self.period
+        while isRunning():
+            now = clock()
+            if now < deadline:
+                time.sleep(deadline - now)
+                now = clock()
+            self.lateness.record(max(now - deadline, 0.0))
+            self.deadline = deadline
+            tick()
+            self.ticks += 1
+            deadline = self.nextDeadline(deadline)
+
+    async def runAsync(self, tick, isRunning) -> None:
+        """
+            This coroutine calls tick() on every deadline, as long as isRunning() is true, as `run()` does,
+            but it awaits the deadlines on the running asyncio event loop, so that other coroutines run meanwhile.
+        """
+        clock = time.monotonic
+        deadline = clock() + self.period
+        while isRunning():
+            now = clock()
+            if now < deadline:
+                await asyncio.sleep(deadline - now)
+                now = clock()
+            else:
+                await asyncio.sleep(0) # Let the Other Coroutines Run (Even When Late)
+            self.lateness.record(max(now - deadline, 0.0))
+            self.deadline = deadline
+            tick()
+            self.ticks += 1
+            deadline = self.nextDeadline(deadline)
+
+    def nextDeadline(self, deadline: float) -> float:
+        """
+            This method returns the deadline which follows the given one, applying the missed tick policy.
+            With the "drop" policy, every deadline which already passed is skipped, so the next tick runs on time.
+        """
+        now = time.monotonic()
+        period = self.period
+        deadline += period
+        if period <= 0 or now <= deadline:
+            return deadline
+        missed = int((now - deadline) // period) # Number of Deadlines Passed After the Next One
+        if self.policy == "drop":
+            self.dropped += missed + 1
+            deadline += (missed + 1) * period # First Deadline Still Ahead
+        elif missed > self.maxCatchUp:
+            self.dropped += missed
+            deadline = now # Reset Schedule (Too Far Behind)
+        return deadline
+
+    def toDict(self) -> dict:
+        """
+            This method returns the scheduler metrics which can be serialized as JSON.
+        """
+        return {
+            "period": self.period,
+            "policy": self.policy,
+            "ticks": self.ticks,
+            "dropped": self.dropped,
+            "lateness": self.lateness.toDict(),
+        }
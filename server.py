@@ -0,0 +1,268 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This program implements a server which hosts many headless games (i.e. sessions) at once.
+
+    Every client connection plays its own session (i.e. its own `Engine`), and all of the sessions are stepped by
+    a single tick function on the shared fixed timestep of a `Scheduler` (see `Scheduler.runAsync()`), on one
+    asyncio event loop. The protocol is made of JSON lines over a local socket (TCP on localhost, or a Unix socket) :
+        On connection, the server sends : {"session": id, "columns": c, "rows": r, "period": p}
+        The client sends its direction changes : {"direction": "Up"}, which are applied on the next tick.
+        After every tick, the server sends the delta frame of the session (see `delta.py`), starting with a keyframe.
+        When the game is over, the server sends {"game_over": true, "score": s} and closes the connection, unless
+        it restarts the sessions, in which case the next frame is a keyframe of the new game.
+        The client can also request the metrics of the server with {"stats": true} (and "reset": true to start
+        a new window of metrics), which are sent back as {"stats": {...}}.
+
+    A slow client does not hold up the others : while its socket buffer is full, its frames are dropped, and the
+    next frame it is sent is a keyframe, so that its `DeltaDecoder` resynchronizes.
+    A tick misses its deadline when it is not complete by the deadline of the next tick (i.e. the next tick is late).
+
+    Running this module directly serves sessions until it is interrupted :
+        python server.py --port 8765 --restart
+    See `loadtest.py` for a load-test client.
+"""
+
+import argparse
+import asyncio, json, time
+
+from delta import DeltaEncoder
+from engine import Engine, OPPOSITE_DIRECTIONS, WINDOW_WIDTH, WINDOW_HEIGHT, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH
+from metrics import Histogram
+from scheduler import POLICIES, Scheduler
+
+MAX_LINE = 1024 # Longest Message Accepted From a Client (Bytes)
+MAX_BUFFERED = 64 * 1024 # Pending Bytes of a Client Above Which Its Frames Are Dropped
+
+def encodeLine(message: dict) -> bytes:
+    """
+        This function encodes a message as a JSON line.
+    """
+    return json.dumps(message, separators = (",", ":")).encode() + b"\n"
+
+class ClientSession(asyncio.Protocol):
+    '''
+        This class implements the session of a single client connection.
+    '''
+    def __init__(self, server: "GameServer"):
+        """
+            This initializer takes the server which hosts the session. The session starts once connected.
+        """
+        self.server = server
+        self.transport = None
+        self.id = None
+        self.engine = None
+        self.encoder = DeltaEncoder(server.keyframes)
+        self.buffer = b""
+        self.direction = None
+        self.turnedAt = None # Time of the First Direction Change Not Sent Yet
+        self.resync = False # Whether the Next Frame Must Be a Keyframe
+        self.dropped = 0
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        """
+            This method creates the engine of the session, and sends its parameters to the client.
+        """
+        self.transport = transport
+        self.id, self.engine = self.server.connect(self)
+        if self.engine is None:
+            transport.close() # Server Full
+            return
+        self.direction = self.engine.direction
+        transport.write(encodeLine({"session": self.id, "columns": self.engine.columns, "rows": self.engine.rows,
+                                    "period": self.server.scheduler.period}))
+
+    def connection_lost(self, exc: Exception) -> None:
+        """
+            This method removes the session from the server.
+        """
+        self.server.disconnect(self)
+
+    def data_received(self, data: bytes) -> None:
+        """
+            This method handles the complete lines received from the client.
+        """
+        *lines, self.buffer = (self.buffer + data).split(b"\n")
+        if len(self.buffer) > MAX_LINE:
+            self.transport.close() # Not a Client of This Protocol
+            return
+        for line in lines:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            if "direction" in message:
+                self.turn(message["direction"])
+            if "stats" in message:
+                self.transport.write(encodeLine({"stats": self.server.stats(bool(message.get("reset")))}))
+
+    def turn(self, direction: str) -> None:
+        """
+            This method sets the movement direction for the next tick, unless it would reverse the snake.
+        """
+        if direction in OPPOSITE_DIRECTIONS and direction != OPPOSITE_DIRECTIONS[self.engine.direction]:
+            self.direction = direction
+            if self.turnedAt is None:
+                self.turnedAt = time.perf_counter()
+
+    def tick(self) -> None:
+        """
+            This method steps the engine of the session, then sends the frame of the tick, unless the
+            socket buffer of the client is full (in which case the frame is dropped without being encoded).
+            When the game is over, the engine is reset if the server restarts the sessions,
+            otherwise the client is told and disconnected.
+        """
+        engine = self.engine
+        if not engine.step(self.direction) and self.server.restart:
+            engine.reset()
+            self.resync = True
+        self.direction = engine.direction
+        if self.transport.get_write_buffer_size() > MAX_BUFFERED:
+            self.dropped += 1
+            self.server.framesDropped += 1
+            self.resync = True
+        else:
+            self.transport.write(encodeLine(self.encoder.encode(engine, self.resync)))
+            self.resync = False
+            self.server.framesSent += 1
+            if self.turnedAt is not None:
+                self.server.inputLatency.record(time.perf_counter() - self.turnedAt)
+                self.turnedAt = None
+        if not engine.gameNotOver:
+            self.transport.write(encodeLine({"game_over": True, "score": engine.score}))
+            self.transport.close()
+
+class GameServer():
+    '''
+        This class hosts the sessions of the clients on a shared tick scheduler.
+    '''
+    def __init__(self, period: float = 0.15, policy: str = "catchup", width: int = WINDOW_WIDTH,
+                 height: int = WINDOW_HEIGHT, keyframes: int = 100, restart: bool = False,
+                 maxSessions: int = 10000, seed: int = None):
+        """
+            This initializer sets the period (sec) and missed tick policy of the shared scheduler, the board
+            dimensions of the sessions (pixels), the number of ticks between their keyframes, whether
+            they restart when their game is over, and the maximum number of sessions.
+            If a seed is provided, the prey generator of each session is seeded with seed + its id.
+        """
+        self.scheduler = Scheduler(period, policy)
+        self.width = width
+        self.height = height
+        self.keyframes = keyframes
+        self.restart = restart
+        self.maxSessions = maxSessions
+        self.seed = seed
+        self.sessions = {} # Id -> ClientSession
+        self.nextId = 0
+        self.address = None
+        self.resetMetrics()
+
+    def resetMetrics(self) -> None:
+        """
+            This method starts a new window of metrics.
+        """
+        self.windowStart = time.time()
+        self.windowTicks = 0
+        self.windowDropped = self.scheduler.dropped
+        self.missed = 0
+        self.framesSent = 0
+        self.framesDropped = 0
+        self.tickDuration = Histogram("tick")
+        self.inputLatency = Histogram("direction to frame")
+        self.scheduler.lateness = Histogram("lateness")
+
+    def connect(self, session: ClientSession) -> tuple:
+        """
+            This method registers a new session, and returns its id and engine (None if the server is full).
+        """
+        if len(self.sessions) >= self.maxSessions:
+            return None, None
+        sessionId = self.nextId
+        self.nextId += 1
+        self.sessions[sessionId] = session
+        return sessionId, Engine(self.width, self.height, SNAKE_ICON_WIDTH, PREY_ICON_WIDTH,
+                                 self.seed + sessionId if self.seed is not None else None)
+
+    def disconnect(self, session: ClientSession) -> None:
+        """
+            This method removes a session (once its client is disconnected).
+        """
+        self.sessions.pop(session.id, None)
+
+    def tick(self) -> None:
+        """
+            This method steps every session, and counts the tick as missed if it
+            is not complete by the deadline of the next tick.
+        """
+        start = time.monotonic()
+        for session in list(self.sessions.values()): # Sessions May Disconnect While Ticking
+            if not session.transport.is_closing():
+                session.tick()
+        end = time.monotonic()
+        self.tickDuration.record(end - start)
+        if end > self.scheduler.deadline + self.scheduler.period:
+            self.missed += 1
+        self.windowTicks += 1
+
+    def stats(self, reset: bool = False) -> dict:
+        """
+            This method returns the metrics of the current window, then starts a new window if requested.
+        """
+        summary = self.toDict()
+        if reset:
+            self.resetMetrics()
+        return summary
+
+    def toDict(self) -> dict:
+        """
+            This method returns the metrics of the current window, which can be serialized as JSON.
+        """
+        return {"time": time.time(), "window_sec": time.time() - self.windowStart, "sessions": len(self.sessions),
+                "ticks": self.windowTicks, "missed": self.missed, "dropped": self.scheduler.dropped - self.windowDropped,
+                "framesSent": self.framesSent, "framesDropped": self.framesDropped,
+                "tick": self.tickDuration.toDict(), "lateness": self.scheduler.lateness.toDict(),
+                "input": self.inputLatency.toDict()}
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0, path: str = None, ready = None) -> None:
+        """
+            This coroutine listens on the given TCP address (or Unix socket path), and ticks
+            the sessions forever. The optional ready function is called with the bound address.
+        """
+        loop = asyncio.get_running_loop()
+        if path is not None:
+            listener = await loop.create_unix_server(lambda: ClientSession(self), path, backlog = 1024)
+        else:
+            listener = await loop.create_server(lambda: ClientSession(self), host, port, backlog = 1024)
+        self.address = listener.sockets[0].getsockname()
+        if ready is not None:
+            ready(self.address)
+        async with listener:
+            await self.scheduler.runAsync(self.tick, lambda: True)
+
+def runServer(host: str, port: int, path: str, period: float, policy: str, restart: bool, seed: int,
+              ready = None) -> None:
+    """
+        This function runs a server until it is interrupted, e.g. in a child process of the load test.
+    """
+    server = GameServer(period, policy, restart = restart, seed = seed)
+    try:
+        asyncio.run(server.serve(host, port, path, ready))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Host headless snake game sessions over a local socket.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "address to listen on")
+    parser.add_argument("--port", type = int, default = 8765, help = "TCP port to listen on")
+    parser.add_argument("--unix", default = None, metavar = "PATH", help = "listen on a Unix socket instead of TCP")
+    parser.add_argument("--speed", type = float, default = 0.15, help = "period of the shared ticks (sec)")
+    parser.add_argument("--scheduler", choices = POLICIES, default = "catchup", help = "missed tick policy of the server")
+    parser.add_argument("--restart", action = "store_true", help = "restart the sessions whose game is over")
+    parser.add_argument("--seed", type = int, default = None, help = "seed of the prey generators (plus the session id)")
+    args = parser.parse_args()
+
+    runServer(args.host, args.port, args.unix, args.speed, args.scheduler, args.restart, args.seed,
+              lambda address: print(f"serving on {address}", flush = True))
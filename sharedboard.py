@@ -0,0 +1,171 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements a ring buffer of frames in shared memory, so that the game and the gui can run in
+    separate processes (i.e. without sharing the GIL).
+
+    A `SharedBoard` has the same interface as the `SnapshotBuffer` (see `snapshot.py`), but its frames are stored in
+    a `multiprocessing.shared_memory` block, which is laid out as fixed-size structures :
+        A header : magic, board dimensions, number of slots, slot size, sequence number of the latest frame,
+        and the counters of the key ring (i.e. arrow keys pushed by the gui, popped by the game, and dropped).
+        The key ring : up to KEY_SLOTS arrow keys pressed in the gui and not read by the game process yet, with the
+        time they were pressed, so that the game process applies every key press (see `inputs.py`), even several
+        within the same tick. As in an `InputRing`, each counter is only written by one side, a slot is only
+        overwritten once it has been read, and a key pressed while the ring is full is dropped (and counted).
+        The slots : the sequence number, snake length, prey, score, game over status and time of a frame,
+        followed by the cell coordinates of the snake (from tail to head) as signed 16-bit integers, since the
+        head is off the board on the tick the snake hits a wall (which is why a slot has room for one more cell than the board).
+    The writer (i.e. game process) stores frame seq in slot seq % slots, clearing the sequence number of the slot
+    first and setting it last, then publishes seq in the header. The reader (i.e. gui process) reads the latest
+    sequence number, then the slot : the snake coordinates are returned as a memoryview of the shared block, so they
+    are rendered without being copied. Since the writer may lap the reader, the reader checks that the slot still
+    holds the same frame (see `isCurrent()`) before using what it has read, as with a sequence lock.
+"""
+
+import struct
+from multiprocessing import shared_memory
+
+from snapshot import Frame
+
+MAGIC = b"SNKB"
+HEADER = struct.Struct("<4sHHIIQIII4x") # magic, columns, rows, slots, slot size, seq, keys pushed, popped, dropped
+SLOT = struct.Struct("<QIiiIB7xd") # seq, snake length, prey coordinates, score, gameOver, time
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 16 # Offset of the Sequence Number in the Header
+KEY_OFFSET = 24 # Offset of the Key Counters in the Header
+KEY_COUNTER = struct.Struct("<I")
+PUSHED_OFFSET, POPPED_OFFSET, DROPPED_OFFSET = KEY_OFFSET, KEY_OFFSET + 4, KEY_OFFSET + 8
+KEY_EVENT = struct.Struct("<dI4x") # time pressed, key code
+KEY_SLOTS = 8
+SLOTS_OFFSET = HEADER.size + KEY_SLOTS * KEY_EVENT.size
+
+DIRECTIONS = ("Left", "Right", "Up", "Down")
+
+class SharedBoard():
+    '''
+        This class implements a single-writer, lock-free ring buffer of frames in shared memory.
+    '''
+    def __init__(self, memory: shared_memory.SharedMemory):
+        """
+            This initializer maps the frames of a shared memory block which was laid out by `create()`.
+            Use `create()` or `attach()` instead.
+        """
+        self.memory = memory
+        self.buffer = memory.buf
+        magic, self.columns, self.rows, self.slots, self.slotSize, *_ = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a Shared Board : {memory.name}")
+        self.seq = SEQ.unpack_from(self.buffer, SEQ_OFFSET)[0]
+
+    @classmethod
+    def create(cls, columns: int, rows: int, slots: int = 16) -> "SharedBoard":
+        """
+            This method creates a shared board for a board of columns x rows cells (i.e. the longest snake).
+            The creator must call `unlink()` once every process is done with it.
+        """
+        slotSize = (SLOT.size + 4 * (columns * rows + 1) + 7) // 8 * 8 # Sequence Numbers Aligned on 8 Bytes
+        memory = shared_memory.SharedMemory(create = True, size = SLOTS_OFFSET + slots * slotSize)
+        HEADER.pack_into(memory.buf, 0, MAGIC, columns, rows, slots, slotSize, 0, 0, 0, 0)
+        return cls(memory)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedBoard":
+        """
+            This method maps the shared board of the given name, which was created by the parent process
+            (whose resource tracker is shared, so the block is still only unlinked by its creator).
+        """
+        return cls(shared_memory.SharedMemory(name = name))
+
+    @property
+    def name(self) -> str:
+        """
+            The name of the shared memory block, which is passed to `attach()`.
+        """
+        return self.memory.name
+
+    def publish(self, snakeCoordinates: tuple, preyCoordinates: tuple, score: int, gameOver: bool, time: float) -> None:
+        """
+            This method publishes a new frame. It must only be called by a single process.
+        """
+        seq = self.seq + 1
+        offset = SLOTS_OFFSET + (seq % self.slots) * self.slotSize
+        SEQ.pack_into(self.buffer, offset, 0) # Slot Being Written
+        cells = [coord for point in snakeCoordinates for coord in point]
+        self.buffer[offset + SLOT.size:offset + SLOT.size + 2 * len(cells)] = struct.pack(f"<{len(cells)}h", *cells)
+        SLOT.pack_into(self.buffer, offset, seq, len(snakeCoordinates), *preyCoordinates, score, gameOver, time)
+        SEQ.pack_into(self.buffer, SEQ_OFFSET, seq) # Publish (After the Slot Is Complete)
+        self.seq = seq
+
+    def latest(self, lastSeq: int = 0) -> Frame:
+        """
+            This method returns the latest frame if it is newer than lastSeq, or None otherwise.
+            Its snake coordinates are a memoryview of the flattened cell coordinates in the shared block,
+            which is only valid as long as `isCurrent()` is true.
+        """
+        while True:
+            seq = SEQ.unpack_from(self.buffer, SEQ_OFFSET)[0]
+            if seq <= lastSeq:
+                return None
+            offset = SLOTS_OFFSET + (seq % self.slots) * self.slotSize
+            slotSeq, length, preyColumn, preyRow, score, gameOver, time = SLOT.unpack_from(self.buffer, offset)
+            if slotSeq == seq: # Otherwise the Writer Has Lapped the Reader (Try the Newer Frame)
+                cells = self.buffer[offset + SLOT.size:offset + SLOT.size + 4 * length].cast("h")
+                return Frame(seq, cells, (preyColumn, preyRow), score, bool(gameOver), time)
+
+    def isCurrent(self, frame: Frame) -> bool:
+        """
+            This method checks that the slot of the frame was not overwritten since it was returned by `latest()`,
+            i.e. that what was read from it is consistent.
+        """
+        offset = SLOTS_OFFSET + (frame.seq % self.slots) * self.slotSize
+        return SEQ.unpack_from(self.buffer, offset)[0] == frame.seq
+
+    @property
+    def keysDropped(self) -> int:
+        """
+            The number of arrow keys dropped because the key ring was full.
+        """
+        return KEY_COUNTER.unpack_from(self.buffer, DROPPED_OFFSET)[0]
+
+    def pressKey(self, direction: str, pressedAt: float) -> bool:
+        """
+            This method queues an arrow key pressed in the gui process (at time.perf_counter(), which is the same
+            clock in every process), for the game process. It must only be called by a single process.
+            It returns False if the key ring is full, in which case the key press is dropped.
+        """
+        pushed = KEY_COUNTER.unpack_from(self.buffer, PUSHED_OFFSET)[0]
+        if pushed - KEY_COUNTER.unpack_from(self.buffer, POPPED_OFFSET)[0] >= KEY_SLOTS:
+            KEY_COUNTER.pack_into(self.buffer, DROPPED_OFFSET, self.keysDropped + 1)
+            return False
+        KEY_EVENT.pack_into(self.buffer, HEADER.size + (pushed % KEY_SLOTS) * KEY_EVENT.size,
+                            pressedAt, DIRECTIONS.index(direction))
+        KEY_COUNTER.pack_into(self.buffer, PUSHED_OFFSET, pushed + 1) # Publish (After the Key Event Is Complete)
+        return True
+
+    def pressedKeys(self) -> list:
+        """
+            This method returns the arrow keys pressed in the gui process and not read yet, as (direction, time pressed),
+            from the oldest, then releases their slots. It must only be called by a single process.
+        """
+        pushed = KEY_COUNTER.unpack_from(self.buffer, PUSHED_OFFSET)[0]
+        popped = KEY_COUNTER.unpack_from(self.buffer, POPPED_OFFSET)[0]
+        keys = []
+        for seq in range(popped, pushed):
+            pressedAt, code = KEY_EVENT.unpack_from(self.buffer, HEADER.size + (seq % KEY_SLOTS) * KEY_EVENT.size)
+            keys.append((DIRECTIONS[code], pressedAt))
+        KEY_COUNTER.pack_into(self.buffer, POPPED_OFFSET, pushed) # Release the Slots (After They Are Read)
+        return keys
+
+    def close(self) -> None:
+        """
+            This method unmaps the shared block from this process (once no frame of it is referenced).
+        """
+        self.buffer = None
+        self.memory.close()
+
+    def unlink(self) -> None:
+        """
+            This method destroys the shared block (once every process has closed it).
+        """
+        self.memory.unlink()
@@ -0,0 +1,56 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements a double-buffered, sequence-numbered snapshot of the game state.
+
+    In `alternative.py`, the "move", "prey" and "score" data fields are protected by separate locks and signaled by
+    counting semaphores, so the gui may read the snake, prey and score from different ticks, and the count of the
+    "full" semaphores grows whenever the gui misses a poll. Instead, the game can publish one immutable `Frame`
+    per tick into a `SnapshotBuffer`, which works as a sequence lock with two buffers :
+        The writer (i.e. game thread) stores the frame in the buffer which is not the latest, then increments the sequence number.
+        The reader (i.e. gui thread) reads the sequence number, then the frame of the corresponding buffer.
+    Since the frame is stored before the sequence number is incremented, the buffer always holds a frame at least as
+    recent as the sequence number which was read, and since frames are immutable, the reader never sees a partial update.
+    Neither side ever blocks, and the sequence number doubles as the single "new frame" flag of the reader.
+"""
+
+from collections import namedtuple
+
+Frame = namedtuple("Frame", ["seq", "snakeCoordinates", "preyCoordinates", "score", "gameOver", "time"])
+
+class SnapshotBuffer():
+    '''
+        This class implements a single-writer, lock-free double buffer of frames.
+    '''
+    def __init__(self):
+        """
+            This initializer creates the empty buffers.
+            The sequence number is 0 until the first frame is published.
+        """
+        self.buffers = [None, None]
+        self.seq = 0
+
+    def publish(self, snakeCoordinates: tuple, preyCoordinates: tuple, score: int, gameOver: bool, time: float) -> None:
+        """
+            This method publishes a new frame. It must only be called by a single thread.
+        """
+        seq = self.seq + 1
+        self.buffers[seq & 1] = Frame(seq, snakeCoordinates, preyCoordinates, score, gameOver, time)
+        self.seq = seq # Publish (After the Frame Is Complete)
+
+    def latest(self, lastSeq: int = 0) -> Frame:
+        """
+            This method returns the latest frame if it is newer than lastSeq, or None otherwise.
+        """
+        seq = self.seq
+        if seq <= lastSeq:
+            return None
+        return self.buffers[seq & 1] # Frame of seq (or Newer, If the Writer Has Since Lapped the Reader)
+
+    def isCurrent(self, frame: Frame) -> bool:
+        """
+            This method checks that what was read from the frame is consistent, which is always
+            the case since frames are immutable (unlike the frames of a `SharedBoard`).
+        """
+        return True
@@ -0,0 +1,285 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements a persistent (i.e. immutable) game state, which can be forked cheaply for lookahead search.
+
+    A `GameState` follows the same rules as the `Engine` class (see `engine.py`), but `step()` returns a new state
+    instead of updating it in place. The states share their structure, so neither forking nor stepping copies the snake :
+        The board is a 32-way trie of tuples, whose leaves hold, for every cell, the next cell of the snake towards
+        its head (HEAD for the head, FREE if the cell is not occupied). Updating a cell only copies the path from
+        the root to its leaf (i.e. 2 tuples of 32 entries for the default board), the other nodes are shared.
+        Each node also counts the free cells where a prey can be created, so a prey is picked uniformly at random
+        by descending the trie.
+        The tail and head cells are kept in the state, so the tail retracts by following the board from the tail.
+    Since the `random.Random` state is too large to fork, the prey generator is a splitmix64 integer state.
+    Forks therefore do not predict the exact prey of the `Engine`, which is unknown to a bot anyway.
+
+    Every state has a stable 64-bit Zobrist hash (i.e. the same in every process, unlike `hash()` of strings),
+    updated incrementally with the cells entering and leaving the snake, for use in transposition tables.
+"""
+
+import functools, random
+
+from engine import OPPOSITE_DIRECTIONS, PREY_MARGIN
+
+DIRECTIONS = ("Left", "Right", "Up", "Down")
+DIRECTION_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+BITS = 5
+BRANCHES = 1 << BITS # Children per Trie Node
+MASK = BRANCHES - 1
+MASK64 = (1 << 64) - 1
+
+FREE = -2 # Cell Not Occupied
+HEAD = -1 # Cell of the Head
+
+@functools.lru_cache(maxsize = 16)
+def boardLayout(columns: int, rows: int, margin: int = PREY_MARGIN) -> tuple:
+    """
+        This function returns the layout shared by every state of a board : the trie depth (as the shift of its root),
+        the eligibility of each cell (i.e. whether a prey can be created in it, as in `Body`), and the Zobrist keys
+        of the snake cells, prey cells, directions and score.
+    """
+    cells = columns * rows
+    shift = 0
+    while BRANCHES << shift < cells:
+        shift += BITS
+    eligible = bytearray(BRANCHES << shift) # Padding Cells Are Not Eligible
+    for row in range(margin, rows - margin):
+        for column in range(margin, columns - margin):
+            eligible[row * columns + column] = 1
+    generator = random.Random(f"zobrist {columns}x{rows}") # Stable Seed
+    snakeKeys = tuple(generator.getrandbits(64) for _ in range(cells))
+    preyKeys = tuple(generator.getrandbits(64) for _ in range(cells))
+    directionKeys = tuple(generator.getrandbits(64) for _ in DIRECTIONS)
+    scoreKey = generator.getrandbits(64) | 1
+    return shift, bytes(eligible), snakeKeys, preyKeys, directionKeys, scoreKey
+
+def buildTrie(values: list, eligible: bytes, shift: int) -> tuple:
+    """
+        This function builds a trie node (i.e. a (free eligible count, children) tuple) over the given cell values.
+    """
+    if shift == 0:
+        children = tuple(values)
+        return (sum(1 for cell, value in enumerate(children) if value == FREE and eligible[cell]), children)
+    size = len(values) // BRANCHES
+    children = tuple(buildTrie(values[start:start + size], eligible[start:start + size], shift - BITS)
+                     for start in range(0, len(values), size))
+    return (sum(child[0] for child in children), children)
+
+def updateTrie(node: tuple, shift: int, cell: int, value: int, delta: int) -> tuple:
+    """
+        This function returns a copy of the node with the value of the cell replaced, and the free
+        eligible count of its path adjusted by delta. Only the path to the cell is copied.
+    """
+    count, children = node
+    index = (cell >> shift) & MASK
+    child = value if shift == 0 else updateTrie(children[index], shift - BITS, cell, value, delta)
+    return (count + delta, children[:index] + (child,) + children[index + 1:])
+
+def splitmix64(seed: int) -> tuple:
+    """
+        This function returns the next state of a splitmix64 generator and its output.
+    """
+    seed = (seed + 0x9E3779B97F4A7C15) & MASK64
+    output = seed
+    output = ((output ^ (output >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    output = ((output ^ (output >> 27)) * 0x94D049BB133111EB) & MASK64
+    return seed, output ^ (output >> 31)
+
+class GameState():
+    '''
+        This class implements an immutable game state, whose forks share their structure.
+    '''
+    __slots__ = ("columns", "rows", "board", "tail", "head", "length", "directionCode", "prey", "score", "tick",
+                 "gameNotOver", "deathCause", "preyCaptured", "seed", "stateHash")
+
+    @classmethod
+    def fromEngine(cls, engine, seed: int = 0) -> "GameState":
+        """
+            This method returns the state of an engine whose game is not over, with the given seed for the prey
+            generator. The snake coordinates must be contiguous cells, as they are for any engine state.
+        """
+        columns, rows = engine.columns, engine.rows
+        shift, eligible, snakeKeys, preyKeys, directionKeys, scoreKey = boardLayout(columns, rows)
+        values = [FREE] * len(eligible)
+        cells = [row * columns + column for column, row in engine.snakeCoordinates]
+        for cell, nextCell in zip(cells, cells[1:]):
+            values[cell] = nextCell
+        values[cells[-1]] = HEAD
+
+        state = cls.__new__(cls)
+        state.columns, state.rows = columns, rows
+        state.board = buildTrie(values, eligible, shift)
+        state.tail, state.head, state.length = cells[0], cells[-1], len(cells)
+        state.directionCode = DIRECTIONS.index(engine.direction)
+        state.prey = engine.preyCoordinates[1] * columns + engine.preyCoordinates[0]
+        state.score, state.tick = engine.score, engine.tick
+        state.gameNotOver, state.deathCause, state.preyCaptured = engine.gameNotOver, engine.deathCause, engine.preyCaptured
+        state.seed = seed & MASK64
+        bodyHash = 0
+        for cell in cells:
+            bodyHash ^= snakeKeys[cell]
+        state.stateHash = state.hashOf(bodyHash)
+        return state
+
+    def hashOf(self, bodyHash: int) -> int:
+        """
+            This method combines the Zobrist hash of the snake cells with the prey, direction and score.
+        """
+        _, _, _, preyKeys, directionKeys, scoreKey = boardLayout(self.columns, self.rows)
+        preyKey = preyKeys[self.prey] if self.prey >= 0 else 0
+        return bodyHash ^ preyKey ^ directionKeys[self.directionCode] ^ ((self.score * scoreKey) & MASK64)
+
+    def clone(self) -> "GameState":
+        """
+            This method returns a fork of the state. Since states are immutable, it is the state itself,
+            and any number of forks can be stepped independently.
+        """
+        return self
+
+    def cellValue(self, cell: int) -> int:
+        """
+            This method returns the value of a cell of the board (i.e. the next cell towards the head, HEAD or FREE).
+        """
+        node = self.board
+        shift = boardLayout(self.columns, self.rows)[0]
+        while shift > 0:
+            node = node[1][(cell >> shift) & MASK]
+            shift -= BITS
+        return node[1][cell & MASK]
+
+    def isOccupied(self, coordinates: tuple) -> bool:
+        """
+            This method checks if any part of the snake is at the given cell coordinates (which must be on the board).
+        """
+        return self.cellValue(coordinates[1] * self.columns + coordinates[0]) != FREE
+
+    def step(self, direction: str = None) -> "GameState":
+        """
+            This method returns the state after a single tick (see `Engine.step()`), without changing this state.
+            If the game is over, the state itself is returned. Unlike the engine, a fatal head is not appended.
+        """
+        if not self.gameNotOver:
+            return self
+        shift, eligible, snakeKeys, _, _, _ = boardLayout(self.columns, self.rows)
+        directionCode = self.directionCode
+        if direction is not None and direction != OPPOSITE_DIRECTIONS[DIRECTIONS[directionCode]]:
+            directionCode = DIRECTIONS.index(direction)
+
+        state = GameState.__new__(GameState)
+        state.columns, state.rows = self.columns, self.rows
+        state.directionCode = directionCode
+        state.tick = self.tick + 1
+        state.seed = self.seed
+        state.gameNotOver, state.deathCause = True, None
+        board, tail, length, score, prey = self.board, self.tail, self.length, self.score, self.prey
+        bodyHash = self.stateHash ^ self.hashOf(0) # Remove the Prey, Direction and Score Keys
+
+        #calculate the new head coordinates
+        row, column = divmod(self.head, self.columns)
+        stepColumn, stepRow = DIRECTION_STEPS[directionCode]
+        column, row = column + stepColumn, row + stepRow
+        newHead = row * self.columns + column
+        onBoard = 0 <= column < self.columns and 0 <= row < self.rows
+
+        state.preyCaptured = onBoard and newHead == prey
+        if state.preyCaptured:
+            score += 1
+        else: # Move Snake
+            nextTail = self.cellValue(tail)
+            board = updateTrie(board, shift, tail, FREE, eligible[tail])
+            bodyHash ^= snakeKeys[tail]
+            tail = nextTail
+            length -= 1
+
+        #check if the game is over (wall or bite), in which case the fatal head is not appended
+        if not onBoard:
+            state.gameNotOver, state.deathCause = False, "wall"
+        else:
+            node = board
+            for level in range(shift, 0, -BITS):
+                node = node[1][(newHead >> level) & MASK]
+            if node[1][newHead & MASK] != FREE:
+                state.gameNotOver, state.deathCause = False, "self"
+
+        if state.gameNotOver: # Append New Snake Head
+            board = updateTrie(board, shift, self.head, newHead, 0)
+            board = updateTrie(board, shift, newHead, HEAD, -eligible[newHead])
+            bodyHash ^= snakeKeys[newHead]
+            length += 1
+            state.head = newHead
+        else:
+            state.head = self.head
+        state.board, state.tail, state.length, state.score = board, tail, length, score
+
+        state.prey = prey
+        if state.preyCaptured and state.gameNotOver:
+            state.createNewPrey()
+        state.stateHash = state.hashOf(bodyHash)
+        return state
+
+    def createNewPrey(self) -> None:
+        """
+            This method picks a free eligible cell uniformly at random as the prey of a state being built,
+            by descending the trie with the free counts. If there is none, the game is over.
+        """
+        count = self.board[0]
+        if count == 0:
+            self.gameNotOver, self.deathCause, self.prey = False, "full", -1
+            return
+        self.seed, output = splitmix64(self.seed)
+        rank = output % count
+        shift, eligible = boardLayout(self.columns, self.rows)[:2]
+        node, base = self.board, 0
+        while shift > 0:
+            for index, child in enumerate(node[1]):
+                if rank < child[0]:
+                    node = child
+                    base += index << shift
+                    break
+                rank -= child[0]
+            shift -= BITS
+        for index, value in enumerate(node[1]):
+            if value == FREE and eligible[base + index]:
+                if rank == 0:
+                    self.prey = base + index
+                    return
+                rank -= 1
+
+    @property
+    def direction(self) -> str:
+        """
+            The movement direction, as in `Engine.direction`.
+        """
+        return DIRECTIONS[self.directionCode]
+
+    @property
+    def preyCoordinates(self) -> tuple:
+        """
+            The cell coordinates of the prey, as in `Engine.preyCoordinates`.
+        """
+        return (self.prey % self.columns, self.prey // self.columns) if self.prey >= 0 else (-1, -1)
+
+    @property
+    def snakeCoordinates(self) -> list:
+        """
+            The cell coordinates of the snake (from tail to head), as in `Engine.snakeCoordinates`.
+            Listing them takes linear time, so they are meant for rendering or debugging, not for the search.
+        """
+        coordinates = []
+        cell = self.tail
+        for _ in range(self.length):
+            coordinates.append((cell % self.columns, cell // self.columns))
+            cell = self.cellValue(cell)
+        return coordinates
+
+    def __hash__(self) -> int:
+        return self.stateHash
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, GameState) and self.stateHash == other.stateHash and
+                (self.head, self.length, self.prey, self.directionCode, self.score) ==
+                (other.head, other.length, other.prey, other.directionCode, other.score) and
+                self.snakeCoordinates == other.snakeCoordinates)
@@ -0,0 +1,48 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    Tests of the distance field and the planning budget of the autopilot.
+"""
+
+from collections import deque
+
+from controllers import AutopilotController
+from distance import INFINITY, neighbours
+from engine import Engine
+
+def breadthFirstDistances(engine, target: int) -> list:
+    """
+        This function returns the distances to the target computed from scratch.
+    """
+    distances = [INFINITY] * (engine.columns * engine.rows)
+    distances[target] = 0
+    queue = deque([target])
+    while queue:
+        cell = queue.popleft()
+        for neighbour in neighbours(cell, engine.columns, engine.rows):
+            if distances[neighbour] == INFINITY and not engine.body.occupied[neighbour]:
+                distances[neighbour] = distances[cell] + 1
+                queue.append(neighbour)
+    return distances
+
+def testFieldStaysExactAcrossTargetsAndGames():
+    engine, autopilot = Engine(seed = 1), AutopilotController(0, 10 ** 9)
+    for _ in range(1500):
+        direction = autopilot(engine)
+        field = autopilot.field
+        field.update()
+        expected = breadthFirstDistances(engine, field.target)
+        assert all(field.distance(cell) == expected[cell]
+                   for cell in range(engine.columns * engine.rows) if not engine.body.occupied[cell])
+        if not engine.step(direction):
+            engine.reset()
+
+def testBudgetIsMetOnLargeBoard():
+    budget, ticks = 1000, 400
+    engine, autopilot = Engine(300 * 15, 300 * 15, 15, seed = 0), AutopilotController(0, budget)
+    for _ in range(ticks):
+        if not engine.step(autopilot(engine)):
+            engine.reset()
+    assert autopilot.cutShort > 0 # The Field of This Board Cannot Be Completed Within a Single Budget
+    assert autopilot.overBudget <= ticks // 10 # Only a Stall of the Host Can Overrun the Budget
@@ -0,0 +1,33 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    Tests of the recovery of a delta stream from the tasks dropped by a `CoalescingChannel`.
+"""
+
+import pytest
+
+from channel import CoalescingChannel
+from delta import DeltaDecoder, DeltaEncoder
+from original import Game
+
+def drain(channel: CoalescingChannel, decoder: DeltaDecoder) -> None:
+    """
+        This function applies every pending "delta" task, as the queue handler does.
+    """
+    while not channel.empty():
+        task = channel.get_nowait()
+        if "delta" in task:
+            decoder.apply(task["delta"])
+
+@pytest.mark.parametrize("policy", ["drop_oldest", "drop_newest"])
+def testDroppedDeltaIsFollowedByKeyframe(policy):
+    channel = CoalescingChannel(4, policy)
+    game, decoder = Game(DeltaEncoder(keyframeInterval = 1000), gameQueue = channel, seed = 0), DeltaDecoder()
+    for _ in range(10): # The Gui Stalls
+        game.move()
+    assert channel.stats()["dropped"] > 0
+    drain(channel, decoder)
+    game.move()
+    drain(channel, decoder)
+    assert list(decoder.snakeCoordinates) == list(game.snakeCoordinates)
@@ -0,0 +1,23 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    Tests of the arrow keys of a `Session`, which are applied at the tick boundaries.
+"""
+
+from types import SimpleNamespace
+
+from cooperative import Session
+from engine import Engine
+
+def testTwoKeysInOneTickAreBothApplied():
+    session = Session(Engine(seed = 0))
+    session.direction = "Right" # Moving Right, Away From Its Body
+    session.engine.reset([(20, 5), (21, 5), (22, 5)], "Right")
+    for key in ("Up", "Left"): # Within the Same Tick
+        session.whenAnArrowKeyIsPressed(SimpleNamespace(keysym = key))
+    session.tick()
+    assert session.engine.direction == "Up"
+    session.tick()
+    assert session.engine.direction == "Left"
+    assert session.inputLatency.count == 2
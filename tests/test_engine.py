@@ -0,0 +1,31 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    Tests of the starting location of the snake on boards of any size.
+"""
+
+import pytest
+
+from batch import BatchEngine
+from engine import Engine, MIN_COLUMNS, MIN_ROWS, STARTING_CELLS, SNAKE_ICON_WIDTH, startingCells
+
+def testDefaultBoardKeepsStartingCells():
+    assert list(Engine().snakeCoordinates) == STARTING_CELLS
+
+@pytest.mark.parametrize("width, height", [(150, 150), (120, 90), (MIN_COLUMNS * SNAKE_ICON_WIDTH, MIN_ROWS * SNAKE_ICON_WIDTH)])
+def testSmallBoardSurvivesFirstTicks(width, height):
+    engine = Engine(width, height, seed = 0)
+    columns, rows = engine.columns, engine.rows
+    assert min(column for column, _ in engine.snakeCoordinates) > 0
+    assert all(0 <= column < columns and 0 < row < rows - 1 for column, row in engine.snakeCoordinates)
+    assert engine.step() and engine.step("Up") # Left, Then Towards the Top Wall
+    assert engine.deathCause is None
+
+@pytest.mark.parametrize("width, height", [(150, 150), (120, 90)])
+def testBatchEngineStartsOnSmallBoard(width, height):
+    batch = BatchEngine(4, width, height, seed = 0)
+    cells = startingCells(batch.columns, batch.rows)
+    assert sorted(batch.startingCells.tolist()) == sorted(row * batch.columns + column for column, row in cells)
+    _, gameOver = batch.step()
+    assert not gameOver.any()
@@ -0,0 +1,37 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    Tests of the seeds recorded into the header of a replay file.
+"""
+
+import pytest
+
+from controllers import GreedyController
+from engine import Engine
+from replay import SEED_LIMIT, ReplayPlayer, ReplayWriter
+
+@pytest.mark.parametrize("seed", [0, 2 ** 63 - 1, 2 ** 63, SEED_LIMIT - 1, -(SEED_LIMIT - 1)])
+def testSeedIsRecordedAcrossItsRange(tmp_path, seed):
+    path = str(tmp_path / "session.replay")
+    engine, controller = Engine(seed = seed), GreedyController(0)
+    recorder = ReplayWriter(path, engine, seed)
+    for _ in range(200):
+        engine.step(controller(engine))
+        recorder.record(engine)
+        if not engine.gameNotOver:
+            break
+    recorder.close(engine)
+
+    player = ReplayPlayer(path)
+    assert player.seed == abs(seed)
+    replayed = Engine(seed = player.seed) # From the Header Alone (i.e. Without Keyframes)
+    while replayed.tick < player.lastTick and replayed.gameNotOver:
+        replayed.step(player.directions.get(replayed.tick))
+    assert list(replayed.snakeCoordinates) == list(engine.snakeCoordinates) and replayed.score == engine.score
+    player.close()
+
+@pytest.mark.parametrize("seed", [SEED_LIMIT, -SEED_LIMIT])
+def testSeedTooLargeIsRejected(tmp_path, seed):
+    with pytest.raises(ValueError):
+        ReplayWriter(str(tmp_path / "session.replay"), Engine(seed = seed), seed)
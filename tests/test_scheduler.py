@@ -0,0 +1,24 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    Tests of the missed tick policies of the `Scheduler`.
+"""
+
+import time
+
+from scheduler import Scheduler
+
+def testDropPolicyResumesOnNextFutureDeadline():
+    period = 0.05
+    scheduler = Scheduler(period, "drop")
+    starts = []
+
+    def tick() -> None:
+        starts.append(time.monotonic() - scheduler.deadline)
+        if len(starts) == 2:
+            time.sleep(3.5 * period) # Stall
+
+    scheduler.run(tick, lambda: len(starts) < 3)
+    assert scheduler.dropped == 3
+    assert starts[2] < period / 4 # The Tick After the Stall Is Not Late
@@ -0,0 +1,324 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This program implements a multi-board variety of the snake
+    game (https://en.wikipedia.org/wiki/Snake_(video_game_genre)), e.g. for a kiosk.
+
+    Many games are tiled on a single canvas (of a single window), instead of a window and a `superloop()` thread per game :
+        Every board is a `Game` of `alternative.py` in snapshot mode (i.e. it publishes one frame per tick),
+        played by a bot (see `controllers.py`) or by the gamer, whose arrow keys steer the board selected by a click.
+        A single clock thread runs the ticks of all the boards on the drift-free fixed timestep of a `Scheduler`.
+        Every tick, the boards are stepped by a small fixed pool of worker threads (each of which steps its share
+        of the boards), and the tick is complete once all of them are stepped.
+        A board whose game is over is restarted with a new game a few ticks later.
+    The gui draws all of the boards in a single render pass per frame : it reads the latest frame of each board
+    (without any lock, see `SnapshotBuffer`), and sends the canvas updates of all the boards which changed to Tcl
+    as one batched script, instead of one Tkinter call per item, so that the canvas is redrawn once per frame.
+
+    Note that the workers share the GIL : the pool bounds the number of threads whatever the number of boards,
+    rather than stepping the boards in parallel.
+"""
+
+import argparse
+import math, random, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from tkinter import Tk, Canvas
+
+from alternative import Game
+from controllers import AutopilotController, GreedyController
+from engine import WINDOW_WIDTH, WINDOW_HEIGHT, SNAKE_ICON_WIDTH
+from metrics import Histogram
+from renderer import preyRectangle, snakePoints
+from scheduler import POLICIES, Scheduler
+from snapshot import SnapshotBuffer
+
+#some constants for our GUI
+BACKGROUND_COLOUR = "black" # you may change this colour if you wish
+ICON_COLOUR = "blue"        # you may change this colour if you wish
+TEXT_COLOUR = "white"
+FOCUS_COLOUR = "white"      # Outline of the Board Steered by the Arrow Keys
+HUMAN_COLOUR = "gray40"     # Outline of the Other Boards Played by the Gamer
+
+TILE_MARGIN = 4 # Pixels Between the Tiles
+RESTART_TICKS = 20 # Number of Ticks a Game Over Is Displayed Before the Board Restarts
+FRAME_INTERVAL = 33 # Period of the Render Pass (ms)
+
+class Board():
+    '''
+        This class implements a tile of the canvas, i.e. the game currently played on it and its position.
+    '''
+    def __init__(self, index: int, origin: tuple, seed: int = None, bot = None):
+        """
+            This initializer takes the index of the board, the pixel origin of its tile, the seed
+            of its games, and its bot (i.e. a controller, see `controllers.py`), if it is not played by the gamer.
+        """
+        self.index = index
+        self.origin = origin
+        self.random = random.Random(seed)
+        self.bot = bot
+        self.games = 0
+        self.overTicks = 0
+        self.game = self.newGame()
+
+    def newGame(self) -> Game:
+        """
+            This method creates the next game of the board, which publishes its frames into its own snapshot buffer.
+        """
+        self.games += 1
+        return Game(snapshots = SnapshotBuffer(), seed = self.random.getrandbits(32), autopilot = self.bot)
+
+    def step(self) -> None:
+        """
+            This method moves the snake of the board, or restarts the board
+            RESTART_TICKS ticks after its game is over.
+        """
+        if self.game.gameNotOver:
+            self.game.move()
+            return
+        self.overTicks += 1
+        if self.overTicks >= RESTART_TICKS:
+            self.overTicks = 0
+            self.game = self.newGame() # Picked Up by the Next Render Pass
+
+class TiledGames():
+    '''
+        This class steps all of the boards on a shared clock, with a fixed pool of worker threads.
+    '''
+    def __init__(self, boards: int, humans: int = 0, columns: int = None, cell: int = 4, workers: int = 2,
+                 speed: float = 0.15, policy: str = "catchup", autopilot: float = None, seed: int = None):
+        """
+            This initializer lays the boards out in rows of the given number of columns (by default, a square grid),
+            with the given size of their cells (pixels). The first humans boards are played by the gamer, and the
+            others by greedy bots (or by autopilots with the given planning budget per tick, in us).
+            The ticks have the given period (sec) and missed tick policy, and are stepped by the given number of workers.
+        """
+        self.boardColumns, self.boardRows = WINDOW_WIDTH // SNAKE_ICON_WIDTH, WINDOW_HEIGHT // SNAKE_ICON_WIDTH # As the Engine
+        self.cell = cell
+        self.columns = columns or math.ceil(math.sqrt(boards))
+        self.rows = math.ceil(boards / self.columns)
+        self.tileWidth = self.boardColumns * cell + TILE_MARGIN
+        self.tileHeight = self.boardRows * cell + TILE_MARGIN
+        self.width = self.columns * self.tileWidth + TILE_MARGIN
+        self.height = self.rows * self.tileHeight + TILE_MARGIN
+
+        generator = random.Random(seed)
+        self.boards = []
+        for index in range(boards):
+            botSeed = generator.getrandbits(32)
+            if index < humans:
+                bot = None
+            elif autopilot is not None:
+                bot = AutopilotController(botSeed, autopilot)
+            else:
+                bot = GreedyController(botSeed)
+            origin = (TILE_MARGIN + index % self.columns * self.tileWidth, TILE_MARGIN + index // self.columns * self.tileHeight)
+            self.boards.append(Board(index, origin, generator.getrandbits(32), bot))
+
+        self.workers = max(1, min(workers, boards))
+        self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix = "board")
+        self.shares = [self.boards[worker::self.workers] for worker in range(self.workers)]
+        self.scheduler = Scheduler(speed, policy)
+        self.tickTime = Histogram("tick")
+        self.missed = 0
+        self.running = True
+
+    @staticmethod
+    def stepShare(share: list) -> None:
+        """
+            This method steps a share of the boards (in a worker thread).
+        """
+        for board in share:
+            board.step()
+
+    def tick(self) -> None:
+        """
+            This method steps every board with the worker pool, and waits for all of the shares to be stepped.
+            The tick is counted as missed if it is not complete by the deadline of the next tick.
+        """
+        start = time.monotonic()
+        for _ in self.pool.map(self.stepShare, self.shares):
+            pass
+        end = time.monotonic()
+        self.tickTime.record(end - start)
+        if end > self.scheduler.deadline + self.scheduler.period:
+            self.missed += 1
+
+    def run(self) -> None:
+        """
+            This method ticks the boards until stopped (i.e. in the clock thread), then shuts the worker pool down.
+        """
+        try:
+            self.scheduler.run(self.tick, lambda: self.running)
+        finally:
+            self.pool.shutdown()
+
+    def boardAt(self, x: int, y: int) -> Board:
+        """
+            This method returns the board whose tile contains the given pixel, or None.
+        """
+        column, row = (x - TILE_MARGIN) // self.tileWidth, (y - TILE_MARGIN) // self.tileHeight
+        index = row * self.columns + column
+        if 0 <= column < self.columns and 0 <= index < len(self.boards):
+            return self.boards[index]
+        return None
+
+class TileRenderer():
+    '''
+        This class draws all of the boards in a single batched render pass.
+    '''
+    def __init__(self, tk, canvasPath: str, tiles: TiledGames):
+        """
+            This initializer takes the Tcl interpreter and the path of the canvas widget, and creates the items of every tile.
+        """
+        self.tk = tk
+        self.path = canvasPath
+        self.tiles = tiles
+        self.frameTime = Histogram("render pass")
+        self.commands = 0
+        self.states = []
+        cell = tiles.cell
+        for board in tiles.boards:
+            x, y = board.origin
+            width, height = tiles.boardColumns * cell, tiles.boardRows * cell
+            outline = HUMAN_COLOUR if board.bot is None else ""
+            self.states.append({
+                "game": None, "seq": 0, "prey": None, "score": None, "over": False,
+                "frame": self.create("rectangle", x - 1, y - 1, x + width, y + height, "-outline", outline),
+                "snake": self.create("line", 0, 0, 0, 0, "-fill", ICON_COLOUR, "-width", cell),
+                "preyIcon": self.create("rectangle", 0, 0, 0, 0, "-fill", ICON_COLOUR, "-outline", ICON_COLOUR),
+                "scoreText": self.create("text", x + 2, y + 1, "-anchor", "nw", "-fill", TEXT_COLOUR,
+                                         "-text", "0", "-font", "Helvetica 7"),
+                "overText": self.create("text", x + width // 2, y + height // 2, "-fill", TEXT_COLOUR,
+                                        "-text", "Game Over!", "-font", "Helvetica 8 bold", "-state", "hidden"),
+            })
+        self.focus = None
+
+    def create(self, kind: str, *options) -> int:
+        """
+            This method creates a canvas item, and returns its id.
+        """
+        return self.tk.getint(self.tk.call(self.path, "create", kind, *options))
+
+    def setFocus(self, board: Board) -> None:
+        """
+            This method outlines the board steered by the arrow keys (which must be played by the gamer).
+        """
+        if self.focus is not None:
+            self.tk.call(self.path, "itemconfigure", self.states[self.focus.index]["frame"], "-outline", HUMAN_COLOUR)
+        self.focus = board
+        self.tk.call(self.path, "itemconfigure", self.states[board.index]["frame"], "-outline", FOCUS_COLOUR)
+
+    def render(self) -> int:
+        """
+            This method sends the updates of every board with a new frame to Tcl as a single script,
+            and returns the number of canvas commands in it.
+        """
+        start = time.perf_counter()
+        path, cell = self.path, self.tiles.cell
+        commands = []
+        for board, state in zip(self.tiles.boards, self.states):
+            game = board.game
+            if game is not state["game"]: # New Game (or First Frame)
+                state.update(game = game, seq = 0, prey = None, score = None)
+                if state["over"]:
+                    state["over"] = False
+                    commands.append(f"{path} itemconfigure {state['overText']} -state hidden")
+            frame = game.snapshots.latest(state["seq"])
+            if frame is None:
+                continue
+            state["seq"] = frame.seq
+            commands.append(f"{path} coords {state['snake']} {' '.join(map(str, snakePoints(frame.snakeCoordinates, cell, board.origin)))}")
+            if frame.preyCoordinates != state["prey"]:
+                state["prey"] = frame.preyCoordinates
+                x0, y0, x1, y1 = preyRectangle(frame.preyCoordinates, cell, max(cell * 2 // 3, 1), board.origin)
+                commands.append(f"{path} coords {state['preyIcon']} {x0} {y0} {x1} {y1}")
+            if frame.score != state["score"]:
+                state["score"] = frame.score
+                commands.append(f"{path} itemconfigure {state['scoreText']} -text {frame.score}")
+            if frame.gameOver and not state["over"]:
+                state["over"] = True
+                commands.append(f"{path} itemconfigure {state['overText']} -state normal")
+        if commands:
+            self.tk.eval("\n".join(commands)) # Single Round Trip to Tcl
+        self.commands += len(commands)
+        self.frameTime.record(time.perf_counter() - start)
+        return len(commands)
+
+class Gui():
+    """
+        This class takes care of the game's graphic user interface (gui)
+        creation and termination, and renders all of the boards.
+    """
+    def __init__(self, tiles: TiledGames):
+        """
+            The initializer instantiates the main window with a canvas large enough for all
+            of the tiles, binds the arrow keys to the focused board, and a click to the focus.
+        """
+        self.tiles = tiles
+        self.root = Tk()
+        self.root.title(f"Snake : {len(tiles.boards)} boards")
+        self.canvas = Canvas(self.root, width = tiles.width,
+            height = tiles.height, bg = BACKGROUND_COLOUR, highlightthickness = 0)
+        self.canvas.pack()
+        self.renderer = TileRenderer(self.root.tk, str(self.canvas), tiles)
+        humans = [board for board in tiles.boards if board.bot is None]
+        if humans:
+            self.renderer.setFocus(humans[0])
+        #binding the arrow keys to be able to control the focused snake
+        for key in ("Left", "Right", "Up", "Down"):
+            self.root.bind(f"<Key-{key}>", self.whenAnArrowKeyIsPressed)
+        self.canvas.bind("<Button-1>", self.whenATileIsClicked)
+        self.update()
+
+    def whenAnArrowKeyIsPressed(self, e) -> None:
+        """
+            This method passes the arrow keys on to the game of the focused board (if any).
+        """
+        if self.renderer.focus is not None:
+            self.renderer.focus.game.whenAnArrowKeyIsPressed(e)
+
+    def whenATileIsClicked(self, e) -> None:
+        """
+            This method focuses the clicked board, if it is played by the gamer.
+        """
+        board = self.tiles.boardAt(e.x, e.y)
+        if board is not None and board.bot is None:
+            self.renderer.setFocus(board)
+
+    def update(self) -> None:
+        """
+            This method runs a render pass of all the boards every FRAME_INTERVAL.
+        """
+        self.renderer.render()
+        self.root.after(FRAME_INTERVAL, self.update)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Play many snake games tiled in a single window.")
+    parser.add_argument("--boards", type = int, default = 64, help = "number of boards")
+    parser.add_argument("--humans", type = int, default = 1, help = "number of boards played by the gamer (click one to steer it)")
+    parser.add_argument("--columns", type = int, default = None, help = "number of tiles per row (default : a square grid)")
+    parser.add_argument("--cell", type = int, default = 4, help = "size of the cells of the tiles (pixels)")
+    parser.add_argument("--workers", type = int, default = 2, help = "number of worker threads stepping the boards")
+    parser.add_argument("--scheduler", choices = POLICIES, default = "catchup", help = "missed tick policy of the shared clock")
+    parser.add_argument("--speed", type = float, default = 0.15, help = "period of the game ticks (sec)")
+    parser.add_argument("--seed", type = int, default = None, help = "seed of the prey generators and of the bots")
+    parser.add_argument("--autopilot", type = float, nargs = "?", const = 1000, default = None, metavar = "BUDGET",
+        help = "let autopilots play the bot boards, with the given planning budget per tick (us, default : 1000)")
+    parser.add_argument("--metrics", action = "store_true", help = "print the collected metrics on exit")
+    args = parser.parse_args()
+
+    tiles = TiledGames(args.boards, args.humans, args.columns, args.cell, args.workers, args.speed,
+                       args.scheduler, args.autopilot, args.seed)
+    gui = Gui(tiles)
+    clock = threading.Thread(target = tiles.run, daemon = True)
+    clock.start()
+    gui.root.mainloop()
+    tiles.running = False
+    clock.join() # Once Its Current Tick Is Complete
+
+    if args.metrics:
+        print(tiles.scheduler.lateness)
+        print(f"{tiles.tickTime} ({tiles.missed} ticks missed, {tiles.workers} workers)")
+        print(f"{gui.renderer.frameTime} ({gui.renderer.commands} canvas commands)")
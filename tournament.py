@@ -0,0 +1,123 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements a tournament runner which plays seeded headless games across a process pool.
+
+    Every game is identified by its seed, which seeds the prey generator of the `Engine`, and from which a separate
+    seed of the controller is derived (so that its tie-breaks are not correlated with the prey placement), so any game
+    can be reproduced exactly. The seeds are sharded across the worker processes of a `multiprocessing.Pool`,
+    and the result of each game (i.e. seed, score, length, ticks and death cause) is streamed back to the parent,
+    which appends it as a JSON line to the results file as soon as it is received.
+
+    Since the games are independent, the throughput scales with the number of processes. An interrupted batch is
+    resumed by running the same command again : the games which already have a result in the file (i.e. for the same
+    seed, controller, maximum number of ticks and board size) are skipped, and a partially written last line is
+    discarded first, so that the file can also be shared by different runs.
+        python tournament.py --controller greedy --games 10000 --results greedy.jsonl
+"""
+
+import argparse
+import hashlib, json, os, time
+from multiprocessing import Pool
+
+from controllers import CONTROLLERS
+from engine import Engine, WINDOW_WIDTH, WINDOW_HEIGHT
+
+def controllerSeed(seed: int) -> int:
+    """
+        This function derives the seed of the controller of a game from the seed of the game.
+    """
+    return int.from_bytes(hashlib.sha256(f"{seed}:controller".encode()).digest()[:8], "little")
+
+def playGame(task: tuple) -> dict:
+    """
+        This function plays a single game until it is over (or maxTicks is reached)
+        and returns its result. It is run by the worker processes.
+    """
+    seed, controllerName, maxTicks, width, height = task
+    engine = Engine(width, height, seed = seed)
+    controller = CONTROLLERS[controllerName](controllerSeed(seed))
+    while engine.gameNotOver and engine.tick < maxTicks:
+        engine.step(controller(engine))
+    return {"seed": seed, "controller": controllerName, "maxTicks": maxTicks, "width": width, "height": height,
+            "score": engine.score,
+            "length": len(engine.snakeCoordinates), "ticks": engine.tick,
+            "deathCause": engine.deathCause if not engine.gameNotOver else "timeout"}
+
+def completedSeeds(path: str, controllerName: str, maxTicks: int, width: int, height: int) -> set:
+    """
+        This function returns the seeds which already have a result in the file (if it exists)
+        for the given controller, maximum number of ticks and board size.
+        A partially written last line (i.e. from an interrupted run) is ignored.
+    """
+    seeds = set()
+    if os.path.exists(path):
+        with open(path) as results:
+            for line in results:
+                try:
+                    result = json.loads(line)
+                    if (result["controller"], result["maxTicks"], result["width"], result["height"]) == (controllerName, maxTicks, width, height):
+                        seeds.add(result["seed"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+    return seeds
+
+def dropPartialLine(path: str) -> None:
+    """
+        This function truncates the file (if it exists) after its last complete line, so that a line partially
+        written by an interrupted run is not joined to the next result appended to it.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as results:
+        end = results.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(end - 4096, 0)
+            results.seek(start)
+            newline = results.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                results.truncate(start + newline + 1)
+                return
+            end = start
+        results.truncate(0) # No Complete Line
+
+def runTournament(controllerName: str, seeds: range, path: str, processes: int = None,
+                  maxTicks: int = 100000, width: int = WINDOW_WIDTH, height: int = WINDOW_HEIGHT,
+                  chunksize: int = 64) -> dict:
+    """
+        This function plays a game for every seed which has no result in the file yet,
+        appending the results to it, and returns a summary of the new games.
+    """
+    done = completedSeeds(path, controllerName, maxTicks, width, height)
+    dropPartialLine(path)
+    tasks = [(seed, controllerName, maxTicks, width, height) for seed in seeds if seed not in done]
+
+    summary = {"games": 0, "skipped": len(seeds) - len(tasks), "totalScore": 0, "totalTicks": 0, "deathCauses": {}}
+    start = time.perf_counter()
+    with open(path, "a") as results, Pool(processes) as pool:
+        for result in pool.imap_unordered(playGame, tasks, chunksize = chunksize):
+            results.write(json.dumps(result) + "\n")
+            results.flush() # Completed Games Survive an Interruption
+            summary["games"] += 1
+            summary["totalScore"] += result["score"]
+            summary["totalTicks"] += result["ticks"]
+            summary["deathCauses"][result["deathCause"]] = summary["deathCauses"].get(result["deathCause"], 0) + 1
+    summary["elapsed"] = time.perf_counter() - start
+    summary["gamesPerSec"] = summary["games"] / summary["elapsed"] if summary["elapsed"] else 0.0
+    summary["meanScore"] = summary["totalScore"] / summary["games"] if summary["games"] else 0.0
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Play a tournament of seeded headless games across a process pool.")
+    parser.add_argument("--controller", choices = sorted(CONTROLLERS), default = "greedy", help = "controller steering the snake")
+    parser.add_argument("--games", type = int, default = 10000, help = "number of games (i.e. seeds) to play")
+    parser.add_argument("--first-seed", type = int, default = 0, help = "seed of the first game")
+    parser.add_argument("--processes", type = int, default = None, help = "number of worker processes (default : all cores)")
+    parser.add_argument("--max-ticks", type = int, default = 100000, help = "number of ticks after which a game is stopped")
+    parser.add_argument("--results", default = "results.jsonl", help = "path of the JSON lines results file (appended to)")
+    args = parser.parse_args()
+
+    summary = runTournament(args.controller, range(args.first_seed, args.first_seed + args.games),
+                            args.results, args.processes, args.max_ticks)
+    print(json.dumps(summary, indent = 2))
@@ -0,0 +1,78 @@
+# Group#: G6
+# Student Names: Muntakim Rahman, Tomaz Zlindra
+
+"""
+    This module implements the event-driven wakeup of the gui by the game thread.
+
+    Both implementations poll for new data every 100 ms with the `Tk.after(...)` method, which adds up to 100 ms
+    of latency between a move and its display, and wakes the Tkinter thread even when nothing changed.
+    Instead, the `Notifier` class lets the game thread generate a virtual event in the Tkinter event loop
+    as soon as new data is produced. Since `tkinter` marshals calls from other threads to the thread
+    running the event loop (when Tcl is built with threads), `event_generate` is safe to call from the game thread.
+
+    If a notification fails (e.g. while the gui is being destroyed), it is retried by the next one, and a lost
+    notification is handled by a fallback check every FALLBACK_INTERVAL, so that the gui cannot freeze. The notifier
+    only gives up once its root is destroyed.
+
+    **IMPORTANT** The call blocks until the Tkinter thread processes it, so `notify()` must never be called
+    while holding a lock which the Tkinter thread may acquire (e.g. `locks["move"]` in `alternative.py`).
+"""
+
+import threading
+
+from tkinter import TclError
+
+FALLBACK_INTERVAL = 100 # Period of the Check for Lost Notifications (ms), as the Polling It Replaces
+
+class Notifier():
+    '''
+        This class wakes up the Tkinter event loop when the game produces new data.
+    '''
+    def __init__(self, sequence: str = "<<GameUpdate>>"):
+        """
+            This initializer sets the name of the virtual event. Notifications are
+            ignored until the notifier is attached to a Tkinter root.
+        """
+        self.sequence = sequence
+        self.root = None
+        self.pending = threading.Event()
+        self.lost = threading.Event() # Set When a Notification Failed
+
+    def attach(self, root, callback) -> None:
+        """
+            This method binds the callback (i.e. the gui update) to the virtual event of the root,
+            and schedules the fallback check, which calls it if a notification was lost.
+        """
+        def handle(event) -> None:
+            self.pending.clear() # Allow Notifications While Handling
+            callback()
+
+        def recover() -> None:
+            if self.lost.is_set():
+                self.lost.clear()
+                callback()
+            root.after(FALLBACK_INTERVAL, recover)
+
+        def destroyed(event) -> None:
+            if event.widget is root:
+                self.root = None
+
+        root.bind(self.sequence, handle)
+        root.bind("<Destroy>", destroyed, add = "+")
+        root.after(FALLBACK_INTERVAL, recover)
+        self.root = root
+
+    def notify(self) -> None:
+        """
+            This method is called by the game thread when new data is produced.
+            At most one event is pending at a time, so a stalled gui is only woken once.
+        """
+        root = self.root
+        if root is None or self.pending.is_set():
+            return
+        self.pending.set()
+        try:
+            root.event_generate(self.sequence, when="tail")
+        except (RuntimeError, TclError): # e.g. Racing the Destruction of the Gui
+            self.pending.clear() # Retried by the Next Notification
+            self.lost.set() # Handled by the Fallback Check (Unless the Gui Is Destroyed)